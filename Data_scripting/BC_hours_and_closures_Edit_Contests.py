@@ -14,26 +14,42 @@ DESIGN NOTES (mirrors matching_and_brand_tagging.py):
     - Straight-line orchestration from details → versions → filter → version selection → scrape → todos.
     - Use explicit waits where the UI is known to render (tabs, labels, ids).
     - Keep parsing lightweight and robust to minor UI variations.
+    - Helpers go through the ApolloPage interface (page_interface.py), so playwright_backend.py
+      runs this same flow on Playwright; reads are one in-page snapshot each.
 
 TUNABLES:
     - PATH points to the "release" details page so we land directly on the POI console.
     - THRESHOLD picks the latest version strictly prior to this date, else we fall back to earliest.
+
+FLAGS:
+    - --fetch reads the ToDos title via in-page fetch (page_fetch.py) before the click path (Safari only).
+      Off by default: the ToDos route may only return the app shell, which costs a miss per POI
+      until page_fetch switches the kind off.
+
+LOGGING:
+    - The terminal shows one live status line (rows, rows/min, error rate, p95 latency, ETA).
+    - Per-row results go to <output>.log.jsonl; step markers appear with --log-level debug.
 """
 
-import csv
 import sys
-import json
 import re
 import time
 import traceback
 from datetime import datetime
 from selenium import webdriver
 from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import html
+from selenium.common.exceptions import TimeoutException
+
+from page_interface import SeleniumPage, as_page
+from page_ready import wait_details_rendered, wait_versions_settled
+from page_fetch import fetch_parsed, parse_todo_title_html, tab_url
+from parquet_sink import BC_COLUMNS, ParquetSink, parquet_path, require_pyarrow
+from retry_queue import RetryQueue
+import scrape_log
+from scrape_log import ProgressLine, RowLog, row_log_path
+from sharding import ShardOutput
+from version_fingerprint import FingerprintStore, fingerprint_key, probe_versions
+from work_manifest import cli_option, iter_place_ids, parse_shard
 
 # ---- Console colors for easy scanning in Terminal output
 RED = "\033[91m"    # errors
@@ -42,39 +58,30 @@ YELLOW = "\033[93m" # warnings / non-fatal issues
 MAGENTA = "\033[95m"# debug or step markers
 RESET = "\033[0m"
 
+# ---- Logging goes through scrape_log (levels via --log-level / SCRAPE_LOG_LEVEL)
 def _dbg(msg):
-    """Minimal timestamped logger for ad-hoc debugging."""
-    ts = datetime.now().strftime("%H:%M:%S")
-    print(f"{MAGENTA}[{ts}] {msg}{RESET}")
+    """Debug-level step marker (hidden unless the log level is debug)."""
+    scrape_log.debug(msg)
 
 def _dbe(msg, e=None):
     """Error logger with exception class & message."""
-    ts = datetime.now().strftime("%H:%M:%S")
-    if e is None:
-        print(f"{RED}[{ts}] {msg}{RESET}")
-    else:
-        et = type(e).__name__
-        print(f"{RED}[{ts}] {msg} | {et}: {e}{RESET}")
+    scrape_log.error(msg, e)
 
 def _snap(driver, note=""):
-    """Quick context snapshot: current URL and readyState."""
-    try:
-        url = driver.current_url
-    except Exception:
-        url = "<no current_url>"
-    try:
-        rs = driver.execute_script("return document.readyState")
-    except Exception:
-        rs = "<no readyState>"
-    _dbg(f"SNAP {note} → url={url} readyState={rs}")
+    """Context snapshot (URL + readyState); skips the WebDriver calls unless debugging."""
+    scrape_log.snap(driver, note)
 
 # ---- Paths & constants
 PATH = "https://apollo.geo.apple.com/p/release/"
 INPUT_CSV = "BC_Hours_and_Closures_Edit_Contests.csv"
 OUTPUT_CSV = "BC_hours_&_closures_output.csv"
+FINGERPRINTS_JSON = "BC_hours_fingerprints.json"  # --incremental: last run's version fingerprints
 
 TIMEOUT = 30
 THRESHOLD = datetime(2025, 7, 25)  # pick version strictly prior to this date
+USE_FETCH = "--fetch" in sys.argv  # opt-in: ToDos title via in-page fetch (page_fetch.py)
+OUTPUT_FIELDS = ["place_id", "contested_field", "edited_at", "version_header", "present_badge",
+                 "show_client_edited_badge", "todo_source_lvl_2", "rca_indicator"]
 
 
 # =============================================================================
@@ -128,143 +135,164 @@ def start_driver():
     return driver
 
 
+# Selectors (CSS, or XPath with "xpath="; see page_interface.py)
+VERSIONS_TAB = "xpath=//a[contains(@class,'nav-link') and normalize-space()='Versions']"
+TODOS_TAB = ("xpath=//a[contains(@class,'nav-link') and (normalize-space()='ToDos' "
+             "or normalize-space()='Todos' or normalize-space()='To-Do')]")
+TODOS_READY = ("[data-test-id='todo-summary__todo-title'], [data-test-id='todo-summary_todo-title'], "
+               ".todo-summary, [data-test-id='thread-item'], .thread__item")
+TODO_TITLE_SELECTORS = ("[data-test-id='todo-summary__todo-title']",
+                        "[data-test-id='todo-summary_todo-title']",
+                        ".todo-summary .section-header",
+                        ".todo-summary h1",
+                        ".todo-summary h2")
+
+# In-page snapshots (arrow functions; one call each, same JS on every backend)
+VERSIONS_ACTIVE_JS = """() => Array.from(document.querySelectorAll("a.nav-link.active"))
+  .some((a) => (a.textContent || "").trim() === "Versions")"""
+
+TODO_TITLE_JS = """(sels) => {
+  for (const sel of sels) {
+    const el = document.querySelector(sel);
+    const t = el ? (el.innerText || "").trim() : "";
+    if (t) { return t; }
+  }
+  return "";
+}"""
+
+CLICK_FIRST_THREAD_JS = """() => {
+  for (const sel of [".view-place-todos__todo-list [data-test-id='thread-item']",
+                     ".view-place-todos__todo-list .thread__item",
+                     "[data-test-id='thread-item']", ".thread__item"]) {
+    const rows = Array.from(document.querySelectorAll(sel)).filter((r) => r.offsetParent !== null);
+    if (rows.length) { rows[0].scrollIntoView({block: "center"}); rows[0].click(); return true; }
+  }
+  return false;
+}"""
+
+# Same lookup as page_ready.badge_text(field_value(driver, title)), in one call.
+BADGE_JS = """(title) => {
+  const label = document.querySelector(`div[title="${title}"]`);
+  let panel = label && label.nextElementSibling;
+  while (panel && panel.tagName !== "DIV") { panel = panel.nextElementSibling; }
+  const b = panel && (panel.querySelector(".audit-badge") || panel.querySelector("span[class*='badge']"));
+  return b ? (b.innerText || "").trim() : "";
+}"""
+
+VERSIONS_LIST_JS = """() => Array.from(document.querySelectorAll("a[id^='entry-']"), (a) => {
+  const s = a.querySelector("span");
+  return [a.id, s ? (s.innerText || "").trim() : ""];
+})"""
+
+HEADER_JS = """() => {
+  const row = document.querySelector("tr.selected-row");
+  if (!row) { return []; }
+  return Array.from(row.querySelectorAll("td.collapsed-column"))
+    .filter((td) => !td.querySelector("input"))
+    .map((td) => (td.innerText || "").trim())
+    .filter(Boolean);
+}"""
+
+
 # =============================================================================
 # Tab navigation helpers
 # =============================================================================
+# Helpers take a WebDriver or an ApolloPage (page_interface.py); the same code
+# runs on Safari here and on Playwright in playwright_backend.py.
 def click_versions_tab(driver):
     """
     Click the 'Versions' tab on the details page.
     Also scrolls to top for consistent viewport and waits for
     either version rows or the Choices dropdown to appear.
     """
-    WebDriverWait(driver, TIMEOUT).until(
-        EC.element_to_be_clickable(
-            (
-                By.XPATH,
-                "//a[contains(@class,'nav-link') and normalize-space()='Versions']",
-            )
-        )
-    ).click()
+    page = as_page(driver)
+    page.click(VERSIONS_TAB)
     try:
-        driver.execute_script("window.scrollTo(0,0);")
+        page.evaluate("() => window.scrollTo(0, 0)")
     except Exception:
         pass
-    wait_versions_ui(driver)
+    wait_versions_ui(page)
 
 def wait_versions_ui(driver):
     """
     Wait until either the Versions list (entry rows) or the field filter control
     is present. This is a coarse 'ready' signal for the Versions subview.
     """
-    try:
-        WebDriverWait(driver, TIMEOUT).until(
-            lambda d: d.find_elements(By.CSS_SELECTOR, "a[id^='entry-']") or
-                      d.find_elements(By.CSS_SELECTOR, ".choices__inner, .choices")
-        )
-    except Exception:
-        pass
+    as_page(driver).wait_for("a[id^='entry-'], .choices__inner, .choices")
 
 def ensure_versions_open(driver):
     """
     Idempotent opener: if the 'Versions' tab is already active, only wait for the
     subview to render; otherwise click into it.
     """
+    page = as_page(driver)
     try:
-        active = driver.find_elements(
-            By.XPATH,
-            "//a[contains(@class,'nav-link') and contains(@class,'active') and normalize-space()='Versions']",
-        )
-        if active:
-            wait_versions_ui(driver)
+        if page.evaluate(VERSIONS_ACTIVE_JS):
+            wait_versions_ui(page)
             return
     except Exception:
         pass
-    click_versions_tab(driver)
+    click_versions_tab(page)
 
 def click_todos_tab(driver):
     """
     Click the 'ToDos' tab (robust to minor label variants), then wait until either a
     summary title or at least one thread item is visible.
     """
-    WebDriverWait(driver, TIMEOUT).until(
-        EC.element_to_be_clickable(
-            (By.XPATH, "//a[contains(@class,'nav-link') and (normalize-space()='ToDos' or normalize-space()='Todos' or normalize-space()='To-Do')]")
-        )
-    ).click()
-    WebDriverWait(driver, TIMEOUT).until(
-        EC.presence_of_element_located(
-            (By.CSS_SELECTOR, "[data-test-id='todo-summary__todo-title'], [data-test-id='todo-summary_todo-title'], .todo-summary, [data-test-id='thread-item'], .thread__item")
-        )
-    )
+    page = as_page(driver)
+    page.click(TODOS_TAB)
+    if not page.wait_for(TODOS_READY):
+        raise TimeoutException("ToDos tab did not render")
 
 
 # =============================================================================
 # ToDos helpers
 # =============================================================================
+def _title_to_lvl2(title_txt: str) -> str:
+    """'POI Change Details (Unspecified) – ...' → 'POI Change Details (Unspecified)'."""
+    if not title_txt:
+        return ""
+    first_chunk = re.split(r"\s+[–-]\s+", title_txt, maxsplit=1)[0]
+    m = re.search(r".+?\([^)]*\)", first_chunk)
+    return m.group(0).strip() if m else first_chunk.strip()
+
 def todo_source_lvl_2(driver) -> str:
     """
     Extract the leading 'str (str)' portion from the ToDo details title.
 
     Strategy:
+        0) With --fetch (Selenium only): fetch the ToDos resource from inside the page
+           (no tab click / render) and parse it.
         1) If a details title is already visible, read it directly.
         2) Otherwise click the first visible thread item, then read the title.
         3) Return only the 'Level 2' prefix such as: "POI Change Details (Unspecified)".
     """
-    def _title_to_lvl2(title_txt: str) -> str:
-        if not title_txt:
-            return ""
-        first_chunk = re.split(r"\s+[–-]\s+", title_txt, maxsplit=1)[0]
-        m = re.search(r".+?\([^)]*\)", first_chunk)
-        return m.group(0).strip() if m else first_chunk.strip()
+    page = as_page(driver)
+    if USE_FETCH and isinstance(page, SeleniumPage):
+        title = fetch_parsed(page.driver, "todos", tab_url(page.driver, ("ToDos", "Todos", "To-Do"), "todos"),
+                             parse_todo_title_html)
+        if title:
+            return _title_to_lvl2(title)
 
     try:
-        click_todos_tab(driver)
+        click_todos_tab(page)
     except Exception:
         return ""
 
     # 1) Try existing summary title
-    for sel in ("[data-test-id='todo-summary__todo-title']",
-                "[data-test-id='todo-summary_todo-title']",
-                ".todo-summary .section-header",
-                ".todo-summary h1",
-                ".todo-summary h2"):
-        try:
-            t = driver.find_element(By.CSS_SELECTOR, sel).text.strip()
-            if t:
-                return _title_to_lvl2(t)
-        except NoSuchElementException:
-            continue
+    title = page.evaluate(TODO_TITLE_JS, list(TODO_TITLE_SELECTORS))
+    if title:
+        return _title_to_lvl2(title)
 
     # 2) Click first visible thread item
-    for sel in (".view-place-todos__todo-list [data-test-id='thread-item']",
-                ".view-place-todos__todo-list .thread__item",
-                "[data-test-id='thread-item']",
-                ".thread__item"):
-        rows = driver.find_elements(By.CSS_SELECTOR, sel)
-        rows = [r for r in rows if r.is_displayed()]
-        if rows:
-            try:
-                WebDriverWait(driver, 5).until(EC.element_to_be_clickable(rows[0])).click()
-            except Exception:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", rows[0])
-                    driver.execute_script("arguments[0].click();", rows[0])
-                except Exception:
-                    pass
-            break
+    page.evaluate(CLICK_FIRST_THREAD_JS)
 
     # 3) Re-try reading a title after click
-    for sel in ("[data-test-id='todo-summary__todo-title']",
-                "[data-test-id='todo-summary_todo-title']",
-                ".todo-summary .section-header",
-                ".todo-summary h1",
-                ".todo-summary h2"):
-        try:
-            t = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, sel))).text.strip()
-            if t:
-                return _title_to_lvl2(t)
-        except Exception:
-            continue
+    for sel in TODO_TITLE_SELECTORS:
+        if page.wait_for(sel, timeout=5):
+            title = page.evaluate(TODO_TITLE_JS, [sel])
+            if title:
+                return _title_to_lvl2(title)
 
     return ""
 
@@ -280,17 +308,8 @@ def get_present_badge(driver, contested_field=None) -> str:
     want_hours = (contested_field or "").strip().lower() == "hours"
     label_title = "Hours" if want_hours else "Show In Client"
     try:
-        label = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.XPATH, f"//div[@title='{label_title}']"))
-        )
-        panel = label.find_element(By.XPATH, "following-sibling::div")
-        try:
-            return panel.find_element(By.CSS_SELECTOR, ".audit-badge").text.strip()
-        except NoSuchElementException:
-            try:
-                return panel.find_element(By.XPATH, ".//span[contains(@class,'badge')]").text.strip()
-            except NoSuchElementException:
-                return ""
+        # Zero-wait read: the caller ran wait_details_rendered(), so absent means absent
+        return as_page(driver).evaluate(BADGE_JS, label_title) or ""
     except Exception:
         return ""
 
@@ -302,18 +321,8 @@ def hours_or_show_client_badge(driver, contested_field=None) -> dict:
     want_hours = (contested_field or "").strip().lower() == "hours"
     title = "Hours" if want_hours else "Show In Client"
     try:
-        label = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.XPATH, f"//div[@title='{title}']"))
-        )
-        panel = label.find_element(By.XPATH, "following-sibling::div")
-        badge = ""
-        try:
-            badge = panel.find_element(By.CSS_SELECTOR, ".audit-badge").text.strip()
-        except NoSuchElementException:
-            try:
-                badge = panel.find_element(By.XPATH, ".//span[contains(@class,'badge')]").text.strip()
-            except NoSuchElementException:
-                badge = ""
+        # Zero-wait read after the page-ready barrier (see page_ready.py)
+        badge = as_page(driver).evaluate(BADGE_JS, title) or ""
         return {"mode": "Hours", "hours_edit_badge": badge} if want_hours else {"mode": "Closures", "sic_edit_badge": badge}
     except Exception:
         return {"mode": "Hours" if want_hours else "Closures", "hours_edit_badge" if want_hours else "sic_edit_badge": ""}
@@ -322,34 +331,30 @@ def hours_or_show_client_badge(driver, contested_field=None) -> dict:
 # --- Added: Extract Brand Applier Version Header
 def extract_brand_applier_vheader(driver):
     """What Applied Brand (Version Header) - Returns only the relevant header texts."""
+    page = as_page(driver)
     try:
-        selected_row = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "tr.selected-row"))
-        )
-        tds = selected_row.find_elements(By.CSS_SELECTOR, "td.collapsed-column")
-        header_texts = []
-        for td in tds:
-            if td.find_elements(By.TAG_NAME, "input"):
-                continue
-            text = td.text.strip()
-            if text:
-                header_texts.append(text)
-        filtered = [
-            t
-            for t in header_texts
-            if not any(s in t for s in ["AM", "PM", "CDT", "UTC", "GMT"])
-            and not t.replace(".", "")
-            .replace("-", "")
-            .replace("(", "")
-            .replace(")", "")
-            .replace(" ", "")
-            .isdigit()
-        ]
-        return filtered
+        if not page.wait_for("tr.selected-row"):
+            return []
+        return filter_vheader(page.evaluate(HEADER_JS) or [])
     except Exception:
         return []
 
 
+def filter_vheader(header_texts):
+    """Drop timestamp and purely numeric cells from a version header row."""
+    return [
+        t
+        for t in header_texts
+        if not any(s in t for s in ["AM", "PM", "CDT", "UTC", "GMT"])
+        and not t.replace(".", "")
+        .replace("-", "")
+        .replace("(", "")
+        .replace(")", "")
+        .replace(" ", "")
+        .isdigit()
+    ]
+
+
 def choose_field(driver, filter_key: str) -> bool:
     """
     Select the Versions subview filter (Choices.js) by its data-value.
@@ -359,24 +364,21 @@ def choose_field(driver, filter_key: str) -> bool:
     Returns:
         True on success, False if the control could not be clicked (non-fatal).
     """
+    page = as_page(driver)
     dropdown_trigger_xpath = "//div[contains(@class,'choices__item--selectable') and @data-value='none']"
     try:
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.element_to_be_clickable((By.XPATH, dropdown_trigger_xpath))
-        ).click()
+        page.click("xpath=" + dropdown_trigger_xpath)
     except TimeoutException:
-        print(f"{YELLOW}[filter] Trigger not clickable; continuing without filter{RESET}")
+        scrape_log.warn("[filter] Trigger not clickable; continuing without filter")
         return False
 
     try:
         opt_xpath = f"//div[contains(@class,'choices__item') and @data-value='{filter_key}']"
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.element_to_be_clickable((By.XPATH, opt_xpath))
-        ).click()
-        print(f"{GREEN}[filter] Selected {filter_key}{RESET}")
+        page.click("xpath=" + opt_xpath)
+        _dbg(f"[filter] Selected {filter_key}")
         return True
     except TimeoutException:
-        print(f"{YELLOW}[filter] Option {filter_key} not found/clickable; continuing without filter{RESET}")
+        scrape_log.warn(f"[filter] Option {filter_key} not found/clickable; continuing without filter")
         return False
 
 
@@ -385,18 +387,14 @@ def collect_versions(driver):
     Return all version entries as (datetime, entry_id), sorted ascending (oldest → newest).
     The date text is assumed to be like: 'YYYY-MM-DD hh:mm AM/PM TZ'
     """
-    wait = WebDriverWait(driver, TIMEOUT)
-    try:
-        wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[id^='entry-']")))
-    except TimeoutException:
+    page = as_page(driver)
+    if not page.wait_for("a[id^='entry-']"):
         return []
-    raw = driver.find_elements(By.CSS_SELECTOR, "a[id^='entry-']")
     entries = []
-    for e in raw:
+    for entry_id, txt in page.evaluate(VERSIONS_LIST_JS) or []:  # "YYYY-MM-DD 01:23 PM CDT"
         try:
-            txt = e.find_element(By.TAG_NAME, "span").text  # "YYYY-MM-DD 01:23 PM CDT"
             dt = datetime.strptime(txt.rsplit(" ", 1)[0], "%Y-%m-%d %I:%M %p")
-            entries.append((dt, e.get_attribute("id")))
+            entries.append((dt, entry_id))
         except Exception:
             continue
     return sorted(entries, key=lambda x: x[0])
@@ -404,18 +402,21 @@ def collect_versions(driver):
 def click_version(driver, entry_id):
     """
     Select a version row by its anchor id (e.g., 'entry-...').
-    After clicking, we wait for both 'Show In Client' and 'Hours' blocks to render.
+    After clicking, we wait for both 'Show In Client' and 'Hours' blocks to render,
+    then for the whole panel to settle so field reads can be zero-wait lookups.
     """
-    wait = WebDriverWait(driver, TIMEOUT)
-    wait.until(EC.element_to_be_clickable((By.ID, entry_id))).click()
-    wait.until(EC.presence_of_element_located((By.XPATH, "//div[@title='Show In Client']")))
-    wait.until(EC.presence_of_element_located((By.XPATH, "//div[@title='Hours']")))
+    page = as_page(driver)
+    page.click(f"[id='{entry_id}']")
+    for title in ("Show In Client", "Hours"):
+        if not page.wait_for(f"xpath=//div[@title='{title}']"):
+            raise TimeoutException(f"'{title}' block did not render for {entry_id}")
+    wait_details_rendered(page)
 
 
 # =============================================================================
 # Orchestrator
 # =============================================================================
-def find_change_version(place_id, driver, contested_field=None):
+def find_change_version(place_id, driver, contested_field=None, fingerprints=None):
     """
     Main single-POI routine:
         1) Load details
@@ -424,44 +425,69 @@ def find_change_version(place_id, driver, contested_field=None):
         4) Collect versions and pick latest strictly before THRESHOLD (else earliest)
         5) Open that version and read its edited badge
         6) Switch to ToDos and read "source level 2" title prefix
+    With `fingerprints` (a FingerprintStore), steps 4-5 are skipped when the
+    Versions list fingerprint matches the previous run; the cached version fields are reused.
+    `driver` is a WebDriver or an ApolloPage (playwright_backend.py runs this flow on Playwright).
     Returns a result dict ready for CSV.
     """
-    print(f"🔄 Processing place_id={place_id}")
+    page = as_page(driver)
+    contested_field = (contested_field or "").strip()
+    _dbg(f"Processing place_id={place_id}")
     _dbg(f"contested_field={contested_field!r}")
 
     # 1) go to details page, wait for the shell (Versions tab link) to be present
     try:
-        driver.get(PATH + place_id)
-        _snap(driver, "after GET details")
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.XPATH, "//a[contains(@class,'nav-link') and normalize-space()='Versions']"))
-        )
+        page.goto(PATH + place_id)
+        _snap(page, "after GET details")
+        if not page.wait_for(VERSIONS_TAB):
+            raise TimeoutException("Versions tab did not render")
         _dbg("details shell present (Versions tab visible)")
     except Exception as e:
         _dbe("failed to load details shell", e)
         raise
 
-    # 2) present badge on details page (fast read)
-    present_badge = get_present_badge(driver, contested_field) or ""
+    # 2) present badge on details page (fast read once the panel has rendered)
+    wait_details_rendered(page)
+    present_badge = get_present_badge(page, contested_field) or ""
     _dbg(f"present_badge={present_badge!r}")
 
     # 3) Versions + filter selection
-    click_versions_tab(driver)
-    _snap(driver, "after click Versions")
-    norm_cf = (contested_field or "").strip().lower()
-    filter_key = "hours_period" if norm_cf == "hours" else "presence_period"
-    bool_res = choose_field(driver, filter_key)
+    click_versions_tab(page)
+    _snap(page, "after click Versions")
+    filter_key = "hours_period" if contested_field.lower() == "hours" else "presence_period"
+    unfiltered = probe_versions(page)
+    bool_res = choose_field(page, filter_key)
     if not bool_res:
-        print(f"{YELLOW}[filter] continuing without filter{RESET}")
+        _dbg("[filter] continuing without filter")
+    else:
+        # the filtered list re-renders after the click; don't probe/collect the old one
+        wait_versions_settled(page, unfiltered)
     _dbg(f"filter_key={filter_key} (applied={bool_res})")
 
+    # 3b) incremental: unchanged version history → reuse last run's version fields
+    fp_key = fingerprint_key(place_id, filter_key, THRESHOLD)
+    fp = probe_versions(page) if fingerprints is not None else None
+    cached = fingerprints.get(fp_key, fp) if fingerprints is not None else None
+    if cached is not None:
+        _dbg(f"fingerprint unchanged {fp} → skipping version walk")
+        source_lvl_2 = todo_source_lvl_2(page) or ""
+        return {
+            "place_id": place_id,
+            "contested_field": contested_field,
+            "edited_at": cached.get("edited_at", ""),
+            "version_header": cached.get("version_header", ""),
+            "present_badge": present_badge,
+            "show_client_edited_badge": cached.get("show_client_edited_badge", ""),
+            "todo_source_lvl_2": source_lvl_2,
+            "rca_indicator": "",
+        }
+
     # 4) all versions (ascending) → pick the one < THRESHOLD (else earliest)
-    versions = collect_versions(driver)
+    versions = collect_versions(page)
     _dbg(f"versions_count={len(versions)}")
     if not versions:
         _dbe("no versions found on Versions tab")
-        return {"place_id": place_id, "edited_at": "", "present_badge": present_badge,
-                "show_client_edited_badge": "", "todo_source_lvl_2": "", "rca_indicator": ""}
+        return dict(_empty_result(place_id, contested_field), present_badge=present_badge)
 
     chosen = None
     for dt, vid in versions:
@@ -473,11 +499,11 @@ def find_change_version(place_id, driver, contested_field=None):
     _dbg(f"chosen_version id={prior_id} dt={prior_dt}")
 
     # 5) open chosen version and read the edited badge under the relevant block
-    click_version(driver, prior_id)
-    _snap(driver, "after click chosen version")
+    click_version(page, prior_id)
+    _snap(page, "after click chosen version")
     # Extract the Version Header from the chosen (pre-threshold) version
-    version_header = extract_brand_applier_vheader(driver)
-    scraped = hours_or_show_client_badge(driver, contested_field)
+    version_header = extract_brand_applier_vheader(page)
+    scraped = hours_or_show_client_badge(page, contested_field)
     mode = scraped.get("mode")
     edited_badge = scraped.get("hours_edit_badge", "") if mode == "Hours" else scraped.get("sic_edit_badge", "")
 
@@ -488,8 +514,12 @@ def find_change_version(place_id, driver, contested_field=None):
     _dbg(f"edited_badge={edited_badge!r}")
     _dbg(f"edited_at={edited_at_str}")
 
+    if fingerprints is not None:
+        fingerprints.put(fp_key, fp, {"edited_at": edited_at_str, "version_header": version_header,
+                                      "show_client_edited_badge": edited_badge})
+
     # 6) ToDos → read L2 source title prefix
-    source_lvl_2 = todo_source_lvl_2(driver) or ""
+    source_lvl_2 = todo_source_lvl_2(page) or ""
     _dbg(f"todo_source_lvl_2={source_lvl_2!r}")
 
     # RCA intentionally disabled here (keep fast). See edited_json_notes.py for focused notes scraping.
@@ -497,6 +527,7 @@ def find_change_version(place_id, driver, contested_field=None):
 
     return {
         "place_id": place_id,
+        "contested_field": contested_field,
         "edited_at": edited_at_str,
         "version_header": version_header,
         "present_badge": present_badge,
@@ -509,52 +540,89 @@ def find_change_version(place_id, driver, contested_field=None):
 # =============================================================================
 # Entry point
 # =============================================================================
+def _contested_field(row) -> str:
+    # The sheet may call this "Contested Field" or "Contested Field Column"
+    return (row.get("Contested Field", "") or row.get("Contested Field Column", "") or "").strip()
+
+
+def _empty_result(place_id, contested_field=""):
+    """Row written when a POI still fails after the deferred retries."""
+    return {"place_id": place_id, "contested_field": contested_field, "edited_at": "", "present_badge": "", "show_client_edited_badge": "",
+            "todo_source_lvl_2": "", "rca_indicator": ""}
+
+
 if __name__ == "__main__":
+    # Optional: --manifest jobs.csv (see work_manifest.py) to scrape each Place ID once
+    manifest = cli_option("--manifest")
+    # Optional: --shard i/N to split the sweep across machines (merge with sharding.py)
+    shard = parse_shard(cli_option("--shard"))
+    # Optional: --incremental to skip the version walk for POIs whose Versions list is unchanged
+    fingerprints = FingerprintStore(FINGERPRINTS_JSON) if "--incremental" in sys.argv else None
+    # Optional: --parquet to also write a typed <output>.parquet (see parquet_sink.py)
+    write_parquet = "--parquet" in sys.argv
+    if write_parquet:
+        require_pyarrow()
     driver = start_driver()
+    retries = RetryQueue()
+
+    # Per-shard output + journal when --shard i/N is given (see sharding.py)
+    with ShardOutput(
+        OUTPUT_CSV,
+        OUTPUT_FIELDS,
+        shard,
+        key_fields=["contested_field"],  # one job per Place ID + contested field
+    ) as writer:
+        # Rows come from the source CSV (per-row cleanup) or a deduplicated work manifest
+        jobs = [(pid, row) for pid, row in iter_place_ids(INPUT_CSV, "Place ID", manifest=manifest, shard=shard)
+                if (pid, _contested_field(row)) not in writer.done]  # resumed shard: skip jobs already written
+        # One live status line on the terminal; per-row detail → <output>.log.jsonl
+        progress = ProgressLine(total=len(jobs), row_log=RowLog(row_log_path(writer.path)))
+        # Rebuilt from the CSV on a resumed shard; closed in finally so the file always gets its footer
+        sink = ParquetSink(parquet_path(writer.path), BC_COLUMNS, resume_from=writer.path if writer.done else None) if write_parquet else None
+
+        def _write(result, seconds=None):
+            writer.writerow(result)
+            if sink is not None:
+                sink.write(result)
+            progress.done(result["place_id"], seconds, result=result)
+
+        def _give_up(key, item):
+            writer.writerow(_empty_result(*key), status="failed")
+            if sink is not None:
+                sink.write(_empty_result(*key))
+            progress.failed(key[0], error=item.failure, final=True)
 
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as out_f:
-        writer = csv.DictWriter(
-            out_f,
-            fieldnames=[
-                "place_id",
-                "edited_at",
-                "version_header",
-                "present_badge",
-                "show_client_edited_badge",
-                "todo_source_lvl_2",
-                "rca_indicator",
-            ],
-        )
-        writer.writeheader()
-
-        with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
-            reader = csv.DictReader(in_f)
-            # Normalize possible BOM + whitespace in header names
-            reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-            for row in reader:
-                # ---- Robust Place ID cleanup (handles "<br>" and HTML entities)
-                pid_raw = (row.get("Place ID", "") or "").strip()
-                pid_unescaped = html.unescape(pid_raw)
-                pid_no_tags = re.sub(r"<[^>]*>", "", pid_unescaped).strip()
-                m = re.search(r"\d+", pid_no_tags)
-                pid = m.group(0) if m else ""
-                _dbg(f"row Place ID raw={pid_raw!r} → parsed pid={pid!r}")
-                if not pid:
-                    print("❗ Missing Place ID; skipping.")
-                    continue
-
-                # The sheet may call this "Contested Field" or "Contested Field Column"
-                contested_field = (row.get("Contested Field", "") or row.get("Contested Field Column", "") or "").strip()
-                print(f"\n=== Processing {pid} ===")
+        try:
+            for pid, row in jobs:
+                contested_field = _contested_field(row)
+                _dbg(f"=== Processing {pid} ===")
+                t0 = time.perf_counter()
                 try:
-                    result = find_change_version(pid, driver, contested_field=contested_field)
+                    result = find_change_version(pid, driver, contested_field=contested_field, fingerprints=fingerprints)
                 except Exception as e:
+                    # Don't retry inline; classify and retry after the main pass
                     _dbe("Error in find_change_version", e)
-                    import traceback as _tb
-                    print(_tb.format_exc())
-                    result = {"place_id": pid, "edited_at": "", "present_badge": "", "show_client_edited_badge": "", "todo_source_lvl_2": "", "rca_indicator": ""}
-                print(f"→ Result: {json.dumps(result)}")
-                writer.writerow(result)
-
-    driver.quit()
+                    failure = retries.defer((pid, contested_field), e, driver)
+                    progress.failed(pid, time.perf_counter() - t0, error=failure)
+                    continue
+                _write(result, time.perf_counter() - t0)
+
+            # Deferred pass: fresh session + per-class backoff for the rows that failed above
+            driver = retries.drain(
+                lambda d, key: find_change_version(key[0], d, contested_field=key[1], fingerprints=fingerprints),
+                start_driver,
+                driver,
+                on_result=_write,
+                on_giveup=_give_up,
+            )
+            progress.finish()
+        finally:
+            if sink is not None:
+                sink.close()
+
+    if fingerprints is not None:
+        fingerprints.save()
+        scrape_log.info(fingerprints.report())
+    if driver is not None:
+        driver.quit()
     print("✅ All done.")
@@ -6,24 +6,27 @@ Scraping from the POI/Gemini Tab
     Modern Category
     URLs
 
+Helpers go through the ApolloPage interface (page_interface.py), so
+playwright_backend.py runs this same scrape on Playwright.
 """
 
-import csv
 import sys
 import json
-import re
 import time
 import traceback
-from datetime import datetime
 from selenium import webdriver
 from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import html
+from selenium.common.exceptions import TimeoutException
 from urllib.parse import urlparse
 
+from page_interface import as_page
+from page_ready import badge_text, field_value, wait_details_rendered
+from retry_queue import RetryQueue
+import scrape_log
+from scrape_log import ProgressLine, RowLog, row_log_path
+from sharding import ShardOutput
+from work_manifest import cli_option, iter_place_ids, parse_shard
+
 # ---- Console colors for easy scanning in Terminal output
 RED = "\033[91m"    # errors
 GREEN = "\033[92m"  # notes
@@ -31,112 +34,120 @@ YELLOW = "\033[93m" # warnings / non-fatal issues
 MAGENTA = "\033[95m"# debug or step markers
 RESET = "\033[0m"
 
-# ---- Minimal loggers for debug and error output
+# ---- Minimal loggers for debug and error output (levels via --log-level / SCRAPE_LOG_LEVEL)
 def _dbg(msg):
-    ts = datetime.now().strftime("%H:%M:%S")
-    print(f"{MAGENTA}[{ts}] {msg}{RESET}")
+    scrape_log.debug(msg)
 
 def _dbe(msg, e=None):
-    ts = datetime.now().strftime("%H:%M:%S")
-    if e is None:
-        print(f"{RED}[{ts}] {msg}{RESET}")
-    else:
-        et = type(e).__name__
-        print(f"{RED}[{ts}] {msg} | {et}: {e}{RESET}")
+    scrape_log.error(msg, e)
 
 
 # ---- Paths & constants
 PATH = "https://apollo.geo.apple.com/p/release/"
 INPUT_CSV = "csv_files/Jacaranda - Family Services Review - Data.csv"
 OUTPUT_CSV = "csv_files/Jacaranda.csv"
+OUTPUT_FIELDS = ["place_id", "Show In Client", "Vendors", "Modern Category", "URLs"]
 
 TIMEOUT = 30
 
 # ---------------- Gemini helpers ----------------
+# Helpers take a WebDriver or an ApolloPage (page_interface.py); the same code
+# runs on Safari here and on Playwright in playwright_backend.py.
+GEMINI_TAB = "xpath=//a[contains(@class,'nav-link') and normalize-space()='Gemini']"
+GEMINI_ACTIVE_JS = """() => Array.from(document.querySelectorAll("a.nav-link.active"))
+  .some((a) => (a.textContent || "").trim() === "Gemini")"""
+
+# Shared prelude for the Gemini snapshots below. `panel(title)` supports two DOM patterns:
+#   1) <div title="Label">...</div><div class="col-value">...</div>
+#   2) <div class="col-label"><div class="col-label__label">Label</div>...</div>
+#      <div class="col-value">...</div>
+# and returns the 'col-value' div, or null if not found.
+_PANEL_JS = """
+  const norm = (s) => (s || "").replace(/\\u00a0/g, " ").split(/\\s+/).filter(Boolean).join(" ");
+  const nextValue = (el) => {
+    let n = el && el.nextElementSibling;
+    while (n && !(n.tagName === "DIV" && (n.className || "").includes("col-value"))) { n = n.nextElementSibling; }
+    return n;
+  };
+  const labelDiv = (title) => Array.from(document.querySelectorAll("div.col-label__label"))
+    .find((d) => norm(d.textContent) === title);
+  const panel = (title) => {
+    const byTitle = document.querySelector(`div[title="${title}"]`);
+    const v = byTitle && nextValue(byTitle);
+    if (v) { return v; }
+    const lbl = labelDiv(title);
+    const col = lbl && lbl.closest("div.col-label");
+    return col ? nextValue(col) : null;
+  };
+  const texts = (els) => Array.from(els, (e) => (e.innerText || "").trim()).filter(Boolean);
+"""
+
+SHOW_IN_CLIENT_JS = "() => {" + _PANEL_JS + """
+  const p = panel("Show In Client");
+  const v = p && p.querySelector("div[class*='col-value']");
+  return v ? norm(v.innerText) : "";
+}"""
+
+# Preferred: the code-like muted span, e.g. 'health_care.mental_health_service'; fallback: anchor text(s)
+MODERN_CATEGORY_JS = "() => {" + _PANEL_JS + """
+  const p = panel("Modern Category");
+  if (!p) { return []; }
+  const spans = texts(p.querySelectorAll("span.text-muted, span.font-weight-normal, span"));
+  return spans.length ? spans : texts(p.querySelectorAll("a"));
+}"""
+
+URL_HREFS_JS = "() => {" + _PANEL_JS + """
+  const p = panel("URL");
+  return p ? Array.from(p.querySelectorAll("a"), (a) => (a.href || "").trim()).filter(Boolean) : [];
+}"""
+
+# Second-td cells under the 'Vendor Contributions' row; any vendor table when the label is absent.
+VENDOR_CELLS_JS = "() => {" + _PANEL_JS + """
+  const lbl = labelDiv("Vendor Contributions");
+  const row = lbl && lbl.closest("div[class*='row-details']");
+  let cells;
+  if (row) {
+    cells = row.querySelectorAll(":scope > div[class*='col-value'] table.vendor-contributions-table tbody tr > td:nth-child(2)");
+    if (!cells.length) { cells = row.querySelectorAll(":scope > div[class*='col-value'] table tbody tr > td:nth-child(2)"); }
+  } else {
+    cells = document.querySelectorAll("table.vendor-contributions-table tbody tr > td:nth-child(2)");
+  }
+  return Array.from(cells, (td) => norm(td.innerText)).filter(Boolean);
+}"""
+
+
+def _dedupe(values) -> list:
+    """Drop empty and repeated values, preserving order."""
+    seen = set()
+    return [v for v in values if v and not (v in seen or seen.add(v))]
+
 def ensure_gemini_open(driver):
     """
     Idempotently open the 'Gemini' tab on the details page.
     Waits until the Gemini shell renders (we detect either the 'Vendor Contributions'
     title, or any Gemini section header such as 'URL' or 'Modern Category').
     """
+    page = as_page(driver)
     try:
         # If already on Gemini, do nothing
-        active = driver.find_elements(
-            By.XPATH,
-            "//a[contains(@class,'nav-link') and contains(@class,'active') and normalize-space()='Gemini']",
-        )
-        if not active:
-            WebDriverWait(driver, TIMEOUT).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//a[contains(@class,'nav-link') and normalize-space()='Gemini']")
-                )
-            ).click()
+        if not page.evaluate(GEMINI_ACTIVE_JS):
+            page.click(GEMINI_TAB)
         # Wait for a Gemini section to exist
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@title='Vendor Contributions' or @title='URL' or @title='Show In Client' or @title='Modern Category']")
-            )
-        )
+        if not page.wait_for(
+            "xpath=//div[@title='Vendor Contributions' or @title='URL' or @title='Show In Client' or @title='Modern Category']"
+        ):
+            raise TimeoutException("Gemini sections did not render")
     except Exception as e:
         _dbe("Failed to open Gemini tab", e)
         raise
 
-def _panel_after_title(driver, title_text: str):
-    """
-    Locate the value panel that corresponds to a Gemini row label.
-    Supports two DOM patterns:
-      1) <div title="Label">...</div><div class="col-value">...</div>
-      2) <div class="col-label"><div class="col-label__label">Label</div>...</div>
-         <div class="col-value">...</div>
-    Returns the 'col-value' div WebElement, or None if not found.
-    """
-    # Pattern 1: title attribute on the label container
-    try:
-        label = WebDriverWait(driver, 2).until(
-            EC.presence_of_element_located((By.XPATH, f"//div[@title='{title_text}']"))
-        )
-        return label.find_element(By.XPATH, "following-sibling::div[contains(@class,'col-value')]")
-    except Exception:
-        pass
-    # Pattern 2: label text inside .col-label__label block
-    try:
-        label2 = WebDriverWait(driver, 2).until(
-            EC.presence_of_element_located((
-                By.XPATH,
-                "//div[contains(@class,'col-label__label') and normalize-space()=$t]",
-            )),
-        )
-    except Exception:
-        label2 = None
-    if label2 is None:
-        # Retry with string substitution since Selenium does not support XPATH variables
-        try:
-            label2 = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((
-                    By.XPATH,
-                    f"//div[contains(@class,'col-label__label') and normalize-space()='{title_text}']"
-                ))
-            )
-        except Exception:
-            return None
-    try:
-        col_label = label2.find_element(By.XPATH, "ancestor::div[contains(@class,'col-label')]")
-        return col_label.find_element(By.XPATH, "following-sibling::div[contains(@class,'col-value')]")
-    except Exception:
-        return None
-
 def scrape_show_in_client(driver) -> str:
     """
     Read the current Show In Client value, e.g., 'Yes (Open)' or 'No (Closed)'.
     """
-    panel = _panel_after_title(driver, "Show In Client")
-    if not panel:
-        return ""
-    # Prefer any visible value container under the panel
     try:
-        val = panel.find_element(By.XPATH, ".//div[contains(@class,'col-value')]").text.strip()
-        return " ".join(val.split())
-    except NoSuchElementException:
+        return as_page(driver).evaluate(SHOW_IN_CLIENT_JS) or ""
+    except Exception:
         return ""
 
 def scrape_modern_category(driver) -> str:
@@ -144,158 +155,87 @@ def scrape_modern_category(driver) -> str:
     Collect modern categories shown in Gemini as a comma-separated list.
     Uses any visible muted span text if available; falls back to link text.
     """
-    panel = _panel_after_title(driver, "Modern Category")
-    if not panel:
-        return ""
-    texts = []
     try:
-        # Preferred: the code-like muted span, e.g., 'health_care.mental_health_service'
-        for el in panel.find_elements(By.CSS_SELECTOR, "span.text-muted, span.font-weight-normal, span"):
-            t = el.text.strip()
-            if t:
-                texts.append(t)
-        # Fallback: anchor text(s)
-        if not texts:
-            for a in panel.find_elements(By.TAG_NAME, "a"):
-                t = a.text.strip()
-                if t:
-                    texts.append(t)
+        texts = as_page(driver).evaluate(MODERN_CATEGORY_JS) or []
     except Exception:
-        pass
-    # De-duplicate while preserving order
-    seen = set()
-    ordered = []
-    for t in texts:
-        if t not in seen:
-            ordered.append(t)
-            seen.add(t)
-    return ", ".join(ordered)
+        texts = []
+    return ", ".join(_dedupe(texts))
 
 def scrape_urls(driver) -> str:
     """
     Collect all visible URLs in the Gemini 'URL' section as a comma-separated list of hrefs.
     """
-    panel = _panel_after_title(driver, "URL")
-    if not panel:
-        return ""
-    hrefs = []
     try:
-        for a in panel.find_elements(By.TAG_NAME, "a"):
-            href = (a.get_attribute("href") or "").strip()
-            if not href:
-                continue
-            # Only accept http(s) URLs
-            if not (href.startswith("http://") or href.startswith("https://")):
-                continue
-            # Exclude Apollo or other Apple internal links
-            try:
-                netloc = urlparse(href).netloc.lower()
-            except Exception:
-                netloc = ""
-            if "apollo.geo.apple.com" in netloc or netloc.endswith(".apple.com"):
-                continue
-            hrefs.append(href)
+        links = as_page(driver).evaluate(URL_HREFS_JS) or []
     except Exception:
-        pass
-    # De-duplicate while preserving order
-    seen = set()
-    ordered = []
-    for u in hrefs:
-        if u not in seen:
-            ordered.append(u)
-            seen.add(u)
-    return ", ".join(ordered)
+        links = []
+    hrefs = []
+    for href in links:
+        # Only accept http(s) URLs
+        if not (href.startswith("http://") or href.startswith("https://")):
+            continue
+        # Exclude Apollo or other Apple internal links
+        try:
+            netloc = urlparse(href).netloc.lower()
+        except Exception:
+            netloc = ""
+        if "apollo.geo.apple.com" in netloc or netloc.endswith(".apple.com"):
+            continue
+        hrefs.append(href)
+    return ", ".join(_dedupe(hrefs))
 
 def scrape_vendor_contributions(driver) -> str:
     """
     Extract vendor names from the Gemini 'Vendor Contributions' table and return
     a comma-separated string, e.g., "Localeze, Yelp, Facebook".
     """
-    # Locate vendor cells by anchoring on the visible "Vendor Contributions" label,
-    # then walking to its sibling value column and into the table body.
-    vendors = []
+    page = as_page(driver)
     try:
         # Ensure Gemini is visible enough
         try:
-            driver.execute_script("window.scrollBy(0, -200);")
+            page.evaluate("() => window.scrollBy(0, -200)")
         except Exception:
             pass
-        # Wait for any Vendor Contributions label to appear
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((
-                By.XPATH,
-                "//div[contains(@class,'col-label__label') and normalize-space()='Vendor Contributions']"
-            ))
-        )
-        # Collect all second-td cells under any Vendor Contributions section
-        xpath_cells = (
-            "//div[contains(@class,'col-label__label') and normalize-space()='Vendor Contributions']"
-            "/ancestor::div[contains(@class,'row-details') or contains(@class,'row-details-separated-when-compact')]"
-            "/div[contains(@class,'col-value')]"
-            "//table[contains(@class,'vendor-contributions-table')]//tbody//tr/td[2]"
+        # Give the Vendor Contributions label a moment to appear; the snapshot falls back
+        # to any vendor-contributions table in the document when it does not
+        page.wait_for(
+            "xpath=//div[contains(@class,'col-label__label') and normalize-space()='Vendor Contributions']",
+            timeout=10,
         )
-        cells = driver.find_elements(By.XPATH, xpath_cells)
-        if not cells:
-            # Fallback: accept any table under that value node
-            xpath_cells = (
-                "//div[contains(@class,'col-label__label') and normalize-space()='Vendor Contributions']"
-                "/ancestor::div[contains(@class,'row-details') or contains(@class,'row-details-separated-when-compact')]"
-                "/div[contains(@class,'col-value')]"
-                "//table//tbody//tr/td[2]"
-            )
-            cells = driver.find_elements(By.XPATH, xpath_cells)
-        for td in cells:
-            txt = (td.get_attribute('innerText') or td.text or '').strip()
-            txt = ' '.join(txt.replace('\u00a0', ' ').split())
-            if txt:
-                vendors.append(txt)
+        vendors = page.evaluate(VENDOR_CELLS_JS) or []
     except Exception:
-        # Last resort: query any vendor-contributions table in document
-        try:
-            cells = driver.find_elements(By.XPATH, "//table[contains(@class,'vendor-contributions-table')]//tbody//tr/td[2]")
-            for td in cells:
-                txt = (td.get_attribute('innerText') or td.text or '').strip()
-                txt = ' '.join(txt.replace('\u00a0', ' ').split())
-                if txt:
-                    vendors.append(txt)
-        except Exception:
-            return ""
-
-    # De-duplicate while preserving order
-    seen = set()
-    ordered = []
-    for v in vendors:
-        if v and v not in seen:
-            ordered.append(v)
-            seen.add(v)
-
-    return ", ".join(ordered)
+        return ""
+    return ", ".join(_dedupe(vendors))
 
 # ---------------- Orchestrator for scraping Gemini ----------------
+def empty_result(place_id: str) -> dict:
+    """Row written when a POI still fails after the deferred retries."""
+    return {"place_id": place_id, "Show In Client": "", "Vendors": "", "Modern Category": "", "URLs": ""}
+
 def scrape_gemini(place_id: str, driver) -> dict:
     """
     Load the details page for the given place_id, open the Gemini tab,
     and return a dict with all requested fields.
+    `driver` is a WebDriver or an ApolloPage (playwright_backend.py runs this flow on Playwright).
     """
+    page = as_page(driver)
     _dbg(f"Navigating to details for {place_id}")
-    driver.get(PATH + place_id)
-    try:
-        WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.XPATH, "//a[contains(@class,'nav-link') and normalize-space()='Gemini']"))
-        )
-    except Exception as e:
+    page.goto(PATH + place_id)
+    if not page.wait_for(GEMINI_TAB):
+        e = TimeoutException("Gemini tab did not render")
         _dbe("Details shell did not render as expected", e)
-        raise
-    ensure_gemini_open(driver)
+        raise e
+    ensure_gemini_open(page)
 
     result = {
         "place_id": place_id,
-        "Show In Client": scrape_show_in_client(driver),
-        "Vendors": scrape_vendor_contributions(driver),
-        "Modern Category": scrape_modern_category(driver),
-        "URLs": scrape_urls(driver),
+        "Show In Client": scrape_show_in_client(page),
+        "Vendors": scrape_vendor_contributions(page),
+        "Modern Category": scrape_modern_category(page),
+        "URLs": scrape_urls(page),
     }
-    _dbg(f"scraped: {json.dumps(result)}")
+    if scrape_log.enabled(scrape_log.DEBUG):
+        _dbg(f"scraped: {json.dumps(result)}")
     return result
 
 
@@ -355,65 +295,60 @@ def hours_or_show_client_badge(driver, contested_field=None) -> dict:
     want_hours = (contested_field or "").strip().lower() == "hours"
     title = "Hours" if want_hours else "Show In Client"
     try:
-        label = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located((By.XPATH, f"//div[@title='{title}']"))
-        )
-        panel = label.find_element(By.XPATH, "following-sibling::div")
-        badge = ""
-        try:
-            badge = panel.find_element(By.CSS_SELECTOR, ".audit-badge").text.strip()
-        except NoSuchElementException:
-            try:
-                badge = panel.find_element(By.XPATH, ".//span[contains(@class,'badge')]").text.strip()
-            except NoSuchElementException:
-                badge = ""
+        wait_details_rendered(driver)  # one barrier, then a zero-wait read
+        badge = badge_text(field_value(driver, title))
         return {"mode": "Hours", "hours_edit_badge": badge} if want_hours else {"mode": "Closures", "sic_edit_badge": badge}
     except Exception:
         return {"mode": "Hours" if want_hours else "Closures", "hours_edit_badge" if want_hours else "sic_edit_badge": ""}
     
 
 if __name__ == "__main__":
+    # Optional: --manifest jobs.csv (see work_manifest.py) to scrape each Place ID once
+    manifest = cli_option("--manifest")
+    # Optional: --shard i/N to split the sweep across machines (merge with sharding.py)
+    shard = parse_shard(cli_option("--shard"))
     driver = start_driver()
+    retries = RetryQueue()
+
+    # Per-shard output + journal when --shard i/N is given (see sharding.py)
+    with ShardOutput(OUTPUT_CSV, OUTPUT_FIELDS, shard) as writer:
+        # Rows come from the source CSV (per-row cleanup) or a deduplicated work manifest
+        jobs = [pid for pid, _ in iter_place_ids(INPUT_CSV, "Place ID", manifest=manifest, shard=shard)
+                if pid not in writer.done]  # resumed shard: skip rows already written
+        # One live status line on the terminal; per-row detail → <output>.log.jsonl
+        progress = ProgressLine(total=len(jobs), row_log=RowLog(row_log_path(writer.path)))
+
+        def _write(result, seconds=None):
+            writer.writerow(result)
+            progress.done(result["place_id"], seconds, result=result)
+
+        def _give_up(pid, item):
+            writer.writerow(empty_result(pid), status="failed")
+            progress.failed(pid, error=item.failure, final=True)
 
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as out_f:
-        writer = csv.DictWriter(
-            out_f,
-            fieldnames=[
-                "place_id",
-                "Show In Client",
-                "Vendors",
-                "Modern Category",
-                "URLs",
-            ],
+        for pid in jobs:
+            _dbg(f"=== Processing {pid} ===")
+            t0 = time.perf_counter()
+            try:
+                result = scrape_gemini(pid, driver)
+            except Exception as e:
+                # Don't retry inline; classify and retry after the main pass
+                _dbe("Error in scrape_gemini", e)
+                failure = retries.defer(pid, e, driver)
+                progress.failed(pid, time.perf_counter() - t0, error=failure)
+                continue
+            _write(result, time.perf_counter() - t0)
+
+        # Deferred pass: fresh session + per-class backoff for the rows that failed above
+        driver = retries.drain(
+            lambda d, pid: scrape_gemini(pid, d),
+            start_driver,
+            driver,
+            on_result=_write,
+            on_giveup=_give_up,
         )
-        writer.writeheader()
-
-        with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
-            reader = csv.DictReader(in_f)
-            # Normalize possible BOM + whitespace in header names
-            reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-            for row in reader:
-                # ---- Robust Place ID cleanup (handles "<br>" and HTML entities)
-                pid_raw = (row.get("Place ID", "") or "").strip()
-                pid_unescaped = html.unescape(pid_raw)
-                pid_no_tags = re.sub(r"<[^>]*>", "", pid_unescaped).strip()
-                m = re.search(r"\d+", pid_no_tags)
-                pid = m.group(0) if m else ""
-                _dbg(f"row Place ID raw={pid_raw!r} → parsed pid={pid!r}")
-                if not pid:
-                    print("❗ Missing Place ID; skipping.")
-                    continue
-
-                print(f"\n=== Processing {pid} ===")
-                try:
-                    result = scrape_gemini(pid, driver)
-                except Exception as e:
-                    _dbe("Error in scrape_gemini", e)
-                    import traceback as _tb
-                    print(_tb.format_exc())
-                    result = {"place_id": pid, "Show In Client": "", "Vendors": "", "Modern Category": "", "URLs": ""}
-                print(f"→ Result: {json.dumps(result)}")
-                writer.writerow(result)
-
-    driver.quit()
+        progress.finish()
+
+    if driver is not None:
+        driver.quit()
     print("✅ All done.")
\ No newline at end of file
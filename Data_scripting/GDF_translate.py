@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import csv
+import os
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Union, Tuple, Optional
 
 # ---------- Tokenization ----------
@@ -195,81 +197,140 @@ def evaluate_weekly(node: Node) -> dict:
         return _subtract_sched(evaluate_weekly(node.left), evaluate_weekly(node.right))
     return defaultdict(list)
 
+# ---- Bitmap engine: the week as one int, bit (t-1)*1440 + minute set when open ----
+# Union / intersect / subtract are single |, &, &~ on the whole week; ranges are
+# recovered by run-length scanning only once, when formatting.
+DAY_MINUTES = 24 * 60
+DAY_MASK = (1 << DAY_MINUTES) - 1
+
+def _span_bits(start_min: int, end_min: int) -> int:
+    return ((1 << (end_min - start_min)) - 1) << start_min if end_min > start_min else 0
+
+def _eval_atom_bits(a: Atom) -> int:
+    start = _start_minutes_from_quals(a.qualifiers)
+    dur = _duration_minutes(a.duration)
+    if start is None or dur <= 0:
+        return 0
+    day = _span_bits(start, min(start + dur, DAY_MINUTES))
+    bits = 0
+    for t in _weekday_list_from_quals(a.qualifiers, a.duration):
+        bits |= day << ((t - 1) * DAY_MINUTES)
+    return bits
+
+def evaluate_weekly_bits(node: Node) -> int:
+    if isinstance(node, Atom):
+        return _eval_atom_bits(node)
+    if isinstance(node, UnionNode):
+        bits = 0
+        for p in node.parts:
+            bits |= evaluate_weekly_bits(p)
+        return bits
+    if isinstance(node, IntersectNode):
+        return evaluate_weekly_bits(node.left) & evaluate_weekly_bits(node.right)
+    if isinstance(node, SubtractNode):
+        return evaluate_weekly_bits(node.left) & ~evaluate_weekly_bits(node.right)
+    return 0
+
+def day_ranges_from_bits(day_bits: int) -> List[tuple]:
+    """Run-length decode one day's 1440 bits into merged (start_min, end_min) ranges."""
+    out = []
+    base = 0
+    while day_bits:
+        low = (day_bits & -day_bits).bit_length() - 1   # first open minute
+        day_bits >>= low
+        run = (day_bits ^ (day_bits + 1)).bit_length() - 1  # trailing ones
+        out.append((base + low, base + low + run))
+        day_bits >>= run
+        base += low + run
+    return out
+
+def bits_to_sched(bits: int) -> dict:
+    """Bitmap → the range engine's dict[weekday] -> [(start, end)] (merged, sorted)."""
+    sched = defaultdict(list)
+    for t in range(1, 8):
+        ranges = day_ranges_from_bits((bits >> ((t - 1) * DAY_MINUTES)) & DAY_MASK)
+        if ranges:
+            sched[t] = ranges
+    return sched
+
 # ---------- Parsing for [(...){...}] ----------
-def parse_atom(s: str, i: int) -> Tuple[Atom, int]:
-    if s[i:i+2] != '[(':
+# Parsing works on offsets into the original string: no substring copies, and a
+# group's closing ']' comes from one bracket-matching pass instead of a rescan per level.
+WS_PAT = re.compile(r'\s*')
+
+def _bracket_pairs(s: str) -> dict:
+    """Lexer pass: position of every '[' → position of its matching ']'."""
+    pairs, stack = {}, []
+    for m in re.finditer(r'[\[\]]', s):
+        if m.group() == '[':
+            stack.append(m.start())
+        elif stack:
+            pairs[stack.pop()] = m.start()
+    return pairs
+
+def parse_atom(s: str, i: int, end: Optional[int] = None) -> Tuple[Atom, int]:
+    end = len(s) if end is None else end
+    if not s.startswith('[(', i, end):
         raise ValueError(f"Expected '[(' at {i}")
     i += 2
-    end_paren = s.index(')', i)
-    inner = s[i:end_paren]
-    flat_quals = [m.group(0) for m in QUAL_PAT.finditer(inner)]
+    end_paren = s.index(')', i, end)
+    flat_quals = [m.group(0) for m in QUAL_PAT.finditer(s, i, end_paren)]
     j = end_paren + 1
     durs = []
-    if j < len(s) and s[j] == '{':
+    if j < end and s[j] == '{':
         j += 1
-        end_brace = s.index('}', j)
-        dur_str = s[j:end_brace]
-        durs = [m.group(0) for m in DUR_PAT.finditer(dur_str)]
+        end_brace = s.index('}', j, end)
+        durs = [m.group(0) for m in DUR_PAT.finditer(s, j, end_brace)]
         k = end_brace + 1
-        if s[k] != ']':
-            raise ValueError(f"Expected ']' at {k}")
-        k += 1
     else:
         # No explicit duration; require closing ']' immediately
-        if s[j] != ']':
-            raise ValueError(f"Expected ']' at {j}")
-        k = j + 1
-    return Atom(flat_quals, durs), k
+        k = j
+    if k >= end or s[k] != ']':
+        raise ValueError(f"Expected ']' at {k}")
+    return Atom(flat_quals, durs), k + 1
 
-def skip_ws(s: str, i: int) -> int:
-    while i < len(s) and s[i].isspace():
-        i += 1
-    return i
+def skip_ws(s: str, i: int, end: Optional[int] = None) -> int:
+    end = len(s) if end is None else end
+    return WS_PAT.match(s, i, end).end() if i < end else i
 
 def parse_expression(s: str, i: int = 0) -> Tuple[Node, int]:
-    def parse_factor(s, i):
-        i = skip_ws(s, i)
-        if s[i:i+2] == '[(':
-            return parse_atom(s, i)
-        if s[i] == '[':
-            # group like [[...]]
-            depth = 0
-            start = i + 1
-            j = start
-            while j < len(s):
-                if s[j] == '[': depth += 1
-                elif s[j] == ']':
-                    if depth == 0: break
-                    depth -= 1
-                j += 1
-            inner = s[start:j]
-            node, _ = parse_expression(inner, 0)
+    return _parse_expression(s, i, len(s), _bracket_pairs(s))
+
+def _parse_expression(s: str, i: int, end: int, pairs: dict) -> Tuple[Node, int]:
+    def parse_factor(i):
+        i = skip_ws(s, i, end)
+        if s.startswith('[(', i, end):
+            return parse_atom(s, i, end)
+        if i < end and s[i] == '[':
+            # group like [[...]]; an unclosed group runs to the end of the enclosing span
+            j = min(pairs.get(i, end), end)
+            node, _ = _parse_expression(s, i + 1, j, pairs)
             return node, j + 1
-        raise ValueError(f"Unexpected at pos {i}: {s[i:i+10]}")
+        raise ValueError(f"Unexpected at pos {i}: {s[i:min(i+10, end)]}")
 
-    def parse_term(s, i):
-        node, i = parse_factor(s, i)
+    def parse_term(i):
+        node, i = parse_factor(i)
         while True:
-            i = skip_ws(s, i)
-            if i >= len(s) or s[i] in ']+':
+            i = skip_ws(s, i, end)
+            if i >= end or s[i] in ']+':
                 break
             if s[i] == '*':
-                rhs, i = parse_factor(s, i+1)
+                rhs, i = parse_factor(i+1)
                 node = IntersectNode(node, rhs)
             elif s[i] == '-':
-                rhs, i = parse_factor(s, i+1)
+                rhs, i = parse_factor(i+1)
                 node = SubtractNode(node, rhs)
             else:
                 break
         return node, i
 
-    node, i = parse_term(s, i)
+    node, i = parse_term(i)
     while True:
-        i = skip_ws(s, i)
-        if i >= len(s) or s[i] == ']':
+        i = skip_ws(s, i, end)
+        if i >= end or s[i] == ']':
             break
         if s[i] == '+':
-            rhs, i = parse_term(s, i+1)
+            rhs, i = parse_term(i+1)
             if isinstance(node, UnionNode):
                 node.parts.append(rhs)
             else:
@@ -450,10 +511,45 @@ def extract_full_gdf_expression(text: str) -> Optional[str]:
         i += 1
     return None
 
+# ---- Caches: exports repeat the same few hundred expressions across many rows ----
+CELL_CACHE_SIZE = 8192
+EXPR_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=EXPR_CACHE_SIZE)
+def compile_expression(expr: str) -> Optional[int]:
+    """Parse + evaluate one GDF expression to its week bitmap; None if it does not parse."""
+    try:
+        node, _ = parse_expression(expr)
+    except Exception:
+        return None
+    return evaluate_weekly_bits(node)
+
+def cache_stats() -> dict:
+    return {"cells": _translate_text.cache_info(), "expressions": compile_expression.cache_info()}
+
+def cache_clear() -> None:
+    _translate_text.cache_clear()
+    compile_expression.cache_clear()
+
+def _cache_counts() -> dict:
+    return {name: (info.hits, info.misses) for name, info in cache_stats().items()}
+
+def _cache_report(counts: Optional[dict] = None) -> str:
+    parts = []
+    for name, (hits, misses) in (counts or _cache_counts()).items():
+        total = hits + misses
+        rate = 100.0 * hits / total if total else 0.0
+        parts.append(f"{name} {hits} hit(s) / {misses} miss(es) ({rate:.0f}%)")
+    return "Cache: " + " · ".join(parts)
+
 def translate_cell(cell_text: str) -> str:
     cell_text = (cell_text or '').strip()
     if not cell_text:
         return ''
+    return _translate_text(cell_text)
+
+@lru_cache(maxsize=CELL_CACHE_SIZE)
+def _translate_text(cell_text: str) -> str:
     # 1) Permanent closure wins
     m = SPECIAL_PAT.search(cell_text)
     if m and m.group(1) == 'PERM_CLOSED':
@@ -469,37 +565,73 @@ def translate_cell(cell_text: str) -> str:
 
     # 2) Try full expression; otherwise gather snippets
     expr = extract_full_gdf_expression(cell_text)
-    nodes = []
+    compiled = []
     if expr:
-        try:
-            n,_ = parse_expression(expr)
-            nodes.append(n)
-        except Exception:
-            pass
-    if not nodes:
+        b = compile_expression(expr)
+        if b is not None:
+            compiled.append(b)
+    if not compiled:
         for snip in SNIPPET_PAT.findall(cell_text):
-            try:
-                n,_ = parse_expression(snip)
-                nodes.append(n)
-            except Exception:
-                continue
-    # Evaluate combined union of all found nodes
-    from collections import defaultdict
-    sched = defaultdict(list)
-    for n in nodes:
-        sched = _union_sched(sched, evaluate_weekly(n))
+            b = compile_expression(snip)
+            if b is not None:
+                compiled.append(b)
+    # Combined union of all found expressions (bitmap engine; same result as evaluate_weekly)
+    bits = 0
+    for b in compiled:
+        bits |= b
 
     # Format 7-day block; if a day has multiple ranges, join by ", "
     lines = []
     for t in [1,2,3,4,5,6,7]:
         lines.append(WEEKDAY_MAP[t])
-        ranges = _merge_ranges(sched.get(t, []))
+        ranges = day_ranges_from_bits((bits >> ((t - 1) * DAY_MINUTES)) & DAY_MASK)
         if not ranges:
             lines.append("Closed")
         else:
             lines.append(", ".join(_fmt_range(s,e) for s,e in ranges))
     return "\n".join(lines)
 
+# ---------- DataFrame / Arrow columns ----------
+# Hours columns have few distinct values, so each column is factorized and only
+# the uniques are translated; results are broadcast back through the codes.
+
+def _describe_value(raw) -> str:
+    text = str(raw).strip()
+    if not text:
+        return ''
+    try:
+        return translate_gdf(text)
+    except Exception as e:
+        return f"[parse error] {e}"
+
+def _map_unique(values, fn):
+    """fn over the distinct values of a pandas Series / Arrow array; missing → ''.
+    A ChunkedArray is combined first and comes back as a one-chunk ChunkedArray."""
+    if hasattr(values, "dictionary_encode"):  # pyarrow Array / ChunkedArray
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        chunked = isinstance(values, pa.ChunkedArray)
+        if chunked:
+            values = values.combine_chunks()
+        encoded = values.dictionary_encode()
+        uniques = pa.array([fn(v) for v in encoded.dictionary.to_pylist()], type=pa.string())
+        result = pc.fill_null(uniques.take(encoded.indices), "")
+        return pa.chunked_array([result]) if chunked else result
+    import numpy as np
+    import pandas as pd
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(series)  # missing → code -1 → the trailing ''
+    out = np.array([fn(u) for u in uniques] + [''], dtype=object)
+    return pd.Series(out[codes], index=series.index, name=series.name)
+
+def translate_series(values):
+    """translate_cell over a pandas Series or Arrow string array (same type back)."""
+    return _map_unique(values, lambda v: _translate_value(str(v).strip()))
+
+def describe_series(values):
+    """translate_gdf (one-line description) over a pandas Series or Arrow string array."""
+    return _map_unique(values, _describe_value)
+
 # ---------- CSV helper ----------
 
 def _normalize_header(name: str) -> str:
@@ -528,28 +660,86 @@ def _resolve_column_name(requested: str, fieldnames: List[str]) -> str:
     pretty = ", ".join(fieldnames)
     raise ValueError(f"Column '{requested}' not found. Available headers: {pretty}")
 
-def translate_csv(in_path: str, out_path: str, column: str, output_column: str = "translated"):
+BATCH_SIZE = 1000
+
+def _translate_value(raw: str) -> str:
+    try:
+        return translate_cell(raw)
+    except Exception as e:
+        return f"[parse error] {e}"
+
+def _translate_chunk(cells: List[str]) -> Tuple[int, List[str], dict]:
+    """Pool worker: translations for one batch plus this process's running cache counts."""
+    return os.getpid(), [_translate_value(c) for c in cells], _cache_counts()
+
+def _translated_batches(batches, workers: int):
+    """Yield (rows, translations) per batch, in input order.
+    workers > 1: batches go to a process pool (each worker keeps its own caches);
+    at most 2 × workers batches are in flight so memory stays bounded."""
+    if workers <= 1:
+        for rows, cells in batches:
+            yield rows, [_translate_value(c) for c in cells]
+        print(_cache_report())
+        return
+    import multiprocessing
+    from collections import deque
+    counts = {}
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+        for rows, cells in batches:
+            pending.append((rows, pool.apply_async(_translate_chunk, (cells,))))
+            if len(pending) >= 2 * workers:
+                rows, res = pending.popleft()
+                pid, out, counts[pid] = res.get()
+                yield rows, out
+        while pending:
+            rows, res = pending.popleft()
+            pid, out, counts[pid] = res.get()
+            yield rows, out
+    total = {}
+    for per_worker in counts.values():
+        for name, (hits, misses) in per_worker.items():
+            h, m = total.get(name, (0, 0))
+            total[name] = (h + hits, m + misses)
+    print(_cache_report(total) + f" across {len(counts)} worker(s)")
+
+def translate_csv(in_path: str, out_path: str, column: str, output_column: str = "translated",
+                  batch_size: int = BATCH_SIZE, workers: int = 1):
+    """Stream in_path → out_path, `batch_size` rows at a time (flushed per batch, so
+    memory stays flat and an interrupted run leaves every finished batch on disk).
+    workers > 1 translates batches in a process pool; output keeps input row order."""
+    batch_size = max(1, int(batch_size))
+    n = 0
     with open(in_path, newline='', encoding='utf-8') as f_in:
         reader = csv.DictReader(f_in)
         fieldnames_in = reader.fieldnames or []
-        # Resolve the requested column against actual headers
+        # Resolve the requested column against actual headers (before touching out_path)
         resolved_col = _resolve_column_name(column, fieldnames_in)
-        rows = []
-        for row in reader:
-            raw = (row.get(resolved_col) or "").strip()
-            try:
-                row[output_column] = translate_cell(raw)
-            except Exception as e:
-                row[output_column] = f"[parse error] {e}"
-            rows.append(row)
-    # Preserve original header order and append output column if needed
-    fieldnames_out = fieldnames_in.copy()
-    if output_column not in fieldnames_out:
-        fieldnames_out.append(output_column)
-    with open(out_path, 'w', newline='', encoding='utf-8') as f_out:
-        writer = csv.DictWriter(f_out, fieldnames=fieldnames_out)
-        writer.writeheader()
-        writer.writerows(rows)
+        # Preserve original header order and append output column if needed
+        fieldnames_out = fieldnames_in.copy()
+        if output_column not in fieldnames_out:
+            fieldnames_out.append(output_column)
+
+        def batches():
+            rows = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    yield rows, [(r.get(resolved_col) or "").strip() for r in rows]
+                    rows = []
+            if rows:
+                yield rows, [(r.get(resolved_col) or "").strip() for r in rows]
+
+        with open(out_path, 'w', newline='', encoding='utf-8') as f_out:
+            writer = csv.DictWriter(f_out, fieldnames=fieldnames_out)
+            writer.writeheader()
+            for rows, translated in _translated_batches(batches(), workers):
+                for row, text in zip(rows, translated):
+                    row[output_column] = text
+                writer.writerows(rows)
+                f_out.flush()
+                n += len(rows)
+    print(f"{n} row(s) → {out_path}")
 
 if __name__ == "__main__":
     import argparse
@@ -558,7 +748,11 @@ if __name__ == "__main__":
     p.add_argument("column", nargs="+", help="Column name containing GDF expressions (can include spaces)")
     p.add_argument("-o", "--output-csv", default="translated.csv", help="Where to write output CSV")
     p.add_argument("--out-col", default="translated", help="Name of the new translated column")
+    p.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows translated and written per batch")
+    p.add_argument("--workers", type=int, default=1, help="Translate in N processes (0 = all cores)")
     args = p.parse_args()
     # Allow column names with spaces passed without shell quotes
     args.column = " ".join(args.column)
-    translate_csv(args.input_csv, args.output_csv, args.column, args.out_col)
\ No newline at end of file
+    if args.workers <= 0:
+        args.workers = os.cpu_count() or 1
+    translate_csv(args.input_csv, args.output_csv, args.column, args.out_col, args.batch_size, args.workers)
\ No newline at end of file
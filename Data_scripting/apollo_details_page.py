@@ -0,0 +1,146 @@
+"""
+apollo_details_page.py
+
+Purpose
+-------
+Page object for the Apollo POI details view that locates each field row at
+most once per view state.
+
+Helpers used to re-locate the same row for every value they read (the Brand
+row twice per version in matching_and_brand_tagging.py: once for the brand
+name, once for its badge). `ApolloDetailsPage` keeps two caches for the
+current view:
+
+  • rows   — title → value container (`div[@title=...]/following-sibling::div`)
+  • values — any parsed value, memoized under a key via `page.cached(key, fn)`
+
+Both are dropped automatically by `goto()` and `click_version()` (the two ways
+the view changes) and when a cached element has gone stale, so a value is
+never served from a previous POI or version.
+
+`get_place_name(driver)` is the single copy of the POI-name heuristic that
+place_name.py, editors_tab.py and edited_json_notes.py used to duplicate.
+
+Usage
+-----
+    from apollo_details_page import ApolloDetailsPage
+
+    page = ApolloDetailsPage(driver)
+    page.goto(PATH + place_id)
+    page.click_version(entry_id, "Modern Category", "Hours")
+    brand = page.row("Brand")                          # located once per version
+    name = page.place_name()                           # memoized until the view changes
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from page_ready import field_value, first, wait_details_rendered
+from rate_limit import limited_get
+
+TIMEOUT = 30
+
+NAME_CSS = (
+    "[data-test-id='place-header__title']",
+    "[data-test-id='place__title']",
+    "[data-test-id='place-title']",
+)
+NAME_XPATHS = (
+    "//header//h1",
+    "//header//h2",
+    "//div[contains(@class,'place-header')]//h1",
+    "//div[contains(@class,'place-header')]//h2",
+)
+
+
+def get_place_name(driver) -> str:
+    """Best-effort extraction of the POI's display name.
+
+    Priority order:
+      1) Details row value next to the label div[@title='Name'] (first non-empty span, else its text)
+      2) Common header/title fallbacks
+    """
+    try:
+        container = field_value(driver, "Name")
+        if container is not None:
+            span = first(container, By.XPATH, ".//span[normalize-space()]")
+            if span is not None and span.text.strip():
+                return span.text.strip()
+            if container.text.strip():
+                return container.text.strip()
+        for sel in NAME_CSS:
+            el = first(driver, By.CSS_SELECTOR, sel)
+            if el is not None and el.text.strip():
+                return el.text.strip()
+        for xp in NAME_XPATHS + ("//h1",):
+            for el in driver.find_elements(By.XPATH, xp):
+                t = el.text.strip()
+                if t:
+                    return t
+    except Exception:
+        pass
+    return ""
+
+
+_MISSING = object()
+
+
+class ApolloDetailsPage:
+    """Details view of one POI with per-state row and value caches."""
+
+    def __init__(self, driver, timeout: float = TIMEOUT):
+        self.driver = driver
+        self.timeout = timeout
+        self.state = 0  # bumped on every view change
+        self._rows: Dict[str, Any] = {}
+        self._values: Dict[str, Any] = {}
+
+    # -- view changes
+    def invalidate(self) -> None:
+        self.state += 1
+        self._rows.clear()
+        self._values.clear()
+
+    def goto(self, url: str) -> None:
+        self.invalidate()
+        limited_get(self.driver, url)
+
+    def click_version(self, entry_id: str, *wait_titles: str) -> None:
+        """Select a version row, wait for `wait_titles` labels and the render barrier."""
+        wait = WebDriverWait(self.driver, self.timeout)
+        wait.until(EC.element_to_be_clickable((By.ID, entry_id))).click()
+        self.invalidate()
+        for title in wait_titles:
+            wait.until(EC.presence_of_element_located((By.XPATH, f"//div[@title='{title}']")))
+        wait_details_rendered(self.driver, self.timeout)
+
+    # -- cached reads
+    def row(self, title: str):
+        """Value container for the field labelled `title`, or None if absent (zero-wait)."""
+        if title not in self._rows:
+            self._rows[title] = field_value(self.driver, title)
+        return self._rows[title]
+
+    def cached(self, key: str, compute: Callable[["ApolloDetailsPage"], Any]) -> Any:
+        """
+        `compute(self)` once per view state. A stale element means the DOM was
+        re-rendered under us: drop the caches and compute again (once).
+        """
+        hit = self._values.get(key, _MISSING)
+        if hit is not _MISSING:
+            return hit
+        try:
+            value = compute(self)
+        except StaleElementReferenceException:
+            self.invalidate()
+            value = compute(self)
+        self._values[key] = value
+        return value
+
+    def place_name(self) -> str:
+        return self.cached("place_name", lambda p: get_place_name(p.driver))
@@ -22,13 +22,28 @@ def clean_list_string(s, sep=", "):
 
 
 def find_latest_report(directory="csv_files/"):
-    """find latest csv outside of config and output report"""
+    """find latest csv (or typed parquet, see parquet_sink.py) outside of config and output report"""
     excluded = {"report_config.csv", "Analytics_Report.csv"}
-    files = glob.glob(os.path.join(directory, "*.csv"))
+    files = glob.glob(os.path.join(directory, "*.csv")) + glob.glob(os.path.join(directory, "*.parquet"))
     files = [f for f in files if os.path.basename(f) not in excluded]
     return max(files, key=os.path.getmtime) if files else None
 
 
+def load_report(path):
+    """Load a scraper output. Parquet list columns arrive typed, so they are joined
+    directly (same result as clean_list_string) instead of re-parsing Python reprs."""
+    if not path.endswith(".parquet"):
+        return pd.read_csv(path)
+    df = pd.read_parquet(path)
+    for col in df.columns:
+        sample = df[col].dropna()
+        if len(sample) and not isinstance(sample.iloc[0], str) and hasattr(sample.iloc[0], "__len__"):
+            df[col] = df[col].apply(
+                lambda v: ", ".join(str(i).strip() for i in v if str(i).strip()) if v is not None else ""
+            )
+    return df
+
+
 def load_config_file(config_path):
     """Loads report_config, entries start at row 2"""
     if not os.path.exists(config_path):
@@ -283,5 +298,5 @@ if __name__ == "__main__":
         raise FileNotFoundError("No valid report_config found.")
     print(f"📄 Using report: {latest}")
     cfg = load_config_file(f"{report_dir}report_config.csv")
-    df = pd.read_csv(latest)
+    df = load_report(latest)
     generate_dynamic_report(df, cfg, output_path=f"{report_dir}Analytics_Report.csv")
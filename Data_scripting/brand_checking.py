@@ -26,6 +26,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from rate_limit import limited_get
+
 RED = "\033[91m"  # errors
 GREEN = "\033[92m"  # notes
 YELLOW = "\033[93m"  # warnings
@@ -243,7 +245,7 @@ def click_version(driver, entry_id):
 
 def scrape_badge(hyperlink, driver):
     print(f"🔄 Processing POI={hyperlink}")
-    driver.get(hyperlink)
+    limited_get(driver, hyperlink)
     try:
         click_versions_tab(driver)
         # filtering for brand
@@ -0,0 +1,202 @@
+"""
+crawl_planner.py
+
+Purpose
+-------
+Estimate a sweep before launching it. `plan` scrapes a random sample of jobs
+(input rows: one per Place ID + Contested Field, each a page load) with the
+BC hours/closures flow, times every step with `scrape_log.tracer`, counts
+versions per POI, then projects the wall-clock time for every job and recommends how many sessions / shards to run to
+finish by a target time.
+
+Steps timed per sampled POI (same calls as find_change_version):
+    details     page load until the panel has rendered
+    versions    Versions tab + field filter
+    list        reading the version list (version count)
+    version     opening the chosen version
+    todos       ToDos tab + title
+
+Version histories drive cost (the list and version steps grow with them), so
+POIs whose history is over `--huge` versions are flagged to be scheduled
+first. `--costs` writes the per-POI measurements (place_id, versions,
+seconds) for the scheduler.
+
+Sessions
+--------
+Safari allows one automation session per machine, so a "session" is one
+machine running `--shard i/N` (sharding.py). The shared rate limit
+(rate_limit.py, APOLLO_RPS) caps the total no matter how many sessions run;
+the plan reports that floor too.
+
+Usage
+-----
+    python crawl_planner.py plan --input BC_Hours_and_Closures_Edit_Contests.csv \\
+        --sample 20 --target-hours 8 --costs plan_costs.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from BC_hours_and_closures_Edit_Contests import (
+    INPUT_CSV,
+    PATH,
+    THRESHOLD,
+    TIMEOUT,
+    choose_field,
+    click_version,
+    click_versions_tab,
+    collect_versions,
+    start_driver,
+    todo_source_lvl_2,
+)
+from page_ready import wait_details_rendered, wait_versions_settled
+from rate_limit import limited_get, limiter
+import scrape_log
+from scrape_log import percentile, tracer
+from version_fingerprint import probe_versions
+from work_manifest import iter_place_ids
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+SAMPLE = 20
+TARGET_HOURS = 8.0
+HUGE_VERSIONS = 150
+STEPS = ("details", "versions", "list", "version", "todos")
+REQUESTS_PER_POI = 1  # page loads per POI; tabs are client-side
+
+
+def measure_poi(driver, place_id: str, contested_field: str = "") -> dict:
+    """One BC-style pass over a POI with every step under a tracer span."""
+    t0 = time.perf_counter()
+    with tracer.span("details"):
+        limited_get(driver, PATH + place_id)
+        WebDriverWait(driver, TIMEOUT).until(
+            EC.presence_of_element_located((By.XPATH, "//a[contains(@class,'nav-link') and normalize-space()='Versions']"))
+        )
+        wait_details_rendered(driver)
+    with tracer.span("versions"):
+        click_versions_tab(driver)
+        want_hours = contested_field.strip().lower() == "hours"
+        unfiltered = probe_versions(driver)
+        if choose_field(driver, "hours_period" if want_hours else "presence_period"):
+            wait_versions_settled(driver, unfiltered)
+    with tracer.span("list"):
+        versions = collect_versions(driver)
+    if versions:
+        prior = [v for v in versions if v[0] < THRESHOLD]
+        with tracer.span("version"):
+            click_version(driver, (prior[-1] if prior else versions[0])[1])
+    with tracer.span("todos"):
+        todo_source_lvl_2(driver)
+    return {"place_id": place_id, "versions": len(versions), "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def project(n_jobs: int, samples: List[dict], target_hours: float) -> Dict[str, float]:
+    """Serial hours, sessions needed for `target_hours`, and the rate-limit floor."""
+    secs = [s["seconds"] for s in samples]
+    mean = sum(secs) / len(secs)
+    serial_h = n_jobs * mean / 3600.0
+    sessions = max(1, math.ceil(serial_h / target_hours)) if target_hours > 0 else 1
+    floor_h = (n_jobs * REQUESTS_PER_POI / limiter.rps / 3600.0) if limiter.enabled else 0.0
+    return {
+        "mean_s": mean,
+        "p95_s": percentile(secs, 95),
+        "serial_h": serial_h,
+        "sessions": sessions,
+        "wall_h": max(serial_h / sessions, floor_h),
+        "floor_h": floor_h,
+    }
+
+
+def plan(input_csv: str, id_column: str, sample: int, target_hours: float, huge: int,
+         seed: Optional[int] = None, costs_csv: Optional[str] = None, manifest: Optional[str] = None) -> None:
+    # one job per row: BC reloads the page for each (Place ID, Contested Field)
+    jobs = list(iter_place_ids(input_csv, id_column, manifest=manifest))
+    if not jobs:
+        raise SystemExit(f"{RED}No Place IDs in {input_csv}{RESET}")
+    picked = random.Random(seed).sample(jobs, min(sample, len(jobs)))
+    print(f"Sampling {len(picked)} of {len(jobs)} job(s)…")
+
+    tracer.reset()
+    driver = start_driver()
+    samples: List[dict] = []
+    try:
+        for pid, row in picked:
+            contested = (row.get("Contested Field", "") or row.get("Contested Field Column", "") or "").strip()
+            try:
+                samples.append(measure_poi(driver, pid, contested))
+            except Exception as e:
+                scrape_log.error(f"{pid} failed during sampling", e)
+    finally:
+        driver.quit()
+    if not samples:
+        raise SystemExit(f"{RED}Every sampled POI failed; no estimate.{RESET}")
+
+    print("\nStep latency (seconds)")
+    summary = tracer.summary()
+    print(f"  {'step':<10}{'n':>5}{'mean':>9}{'p50':>9}{'p95':>9}")
+    for step in STEPS:
+        s = summary.get(step)
+        if s:
+            print(f"  {step:<10}{s['count']:>5}{s['mean']:>9.2f}{s['p50']:>9.2f}{s['p95']:>9.2f}")
+
+    counts = [s["versions"] for s in samples]
+    print(f"\nVersions per POI: mean {sum(counts) / len(counts):.1f} · p95 {percentile(counts, 95):.0f} · max {max(counts)}")
+
+    p = project(len(jobs), samples, target_hours)
+    failed = len(picked) - len(samples)
+    print(f"\nPer job: mean {p['mean_s']:.1f}s · p95 {p['p95_s']:.1f}s"
+          + (f" · {YELLOW}{failed} sample(s) failed{RESET}" if failed else ""))
+    print(f"One session: {p['serial_h']:.1f} h for {len(jobs)} job(s)")
+    color = GREEN if p["wall_h"] <= target_hours else YELLOW
+    print(f"{color}Recommend {p['sessions']} session(s) → --shard i/{p['sessions']} "
+          f"(≈ {p['wall_h']:.1f} h each, target {target_hours:g} h){RESET}")
+    if p["floor_h"] and p["floor_h"] > target_hours:
+        print(f"{YELLOW}APOLLO_RPS={limiter.rps:g} alone needs {p['floor_h']:.1f} h; "
+              f"raise it or extend the target{RESET}")
+
+    heavy = sorted((s for s in samples if s["versions"] >= huge), key=lambda s: -s["versions"])
+    if heavy:
+        print(f"{YELLOW}{len(heavy)} sampled POI(s) with ≥ {huge} versions; schedule these first:{RESET}")
+        for s in heavy:
+            print(f"  {s['place_id']}: {s['versions']} versions, {s['seconds']:.1f}s")
+
+    if costs_csv:
+        with open(costs_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["place_id", "versions", "seconds"])
+            writer.writeheader()
+            writer.writerows(samples)
+        print(f"{GREEN}✔ Per-POI costs → {costs_csv}{RESET}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Estimate sweep duration and plan sessions/shards.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    pl = sub.add_parser("plan", help="Sample POIs, time each step, project the sweep")
+    pl.add_argument("--input", default=INPUT_CSV)
+    pl.add_argument("--id-col", default="Place ID")
+    pl.add_argument("--manifest", default=None, help="Plan against a work manifest instead (work_manifest.py)")
+    pl.add_argument("--sample", type=int, default=SAMPLE)
+    pl.add_argument("--seed", type=int, default=None)
+    pl.add_argument("--target-hours", type=float, default=TARGET_HOURS)
+    pl.add_argument("--huge", type=int, default=HUGE_VERSIONS, help="Version count that marks a huge history")
+    pl.add_argument("--costs", default=None, help="Write per-POI measurements to this CSV")
+    args = p.parse_args(argv)
+
+    plan(args.input, args.id_col, args.sample, args.target_hours, args.huge, args.seed, args.costs, args.manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,18 @@ Logic:
 2) Wait for page to load and locate the "Corrections" section by div[@title='Corrections']
 3) Scrape ALL visible text contained in the value container next to that label
 4) Write to CSV with columns: "Ticket ID", "Corrections"
+
+Concurrent mode:
+    python details_correction.py --concurrency 6
+Safari allows a single automation session per machine, so instead of several
+sessions the ticket pages are fetched from inside the one authenticated page
+(see page_fetch.py), `--concurrency` requests at a time, in batches. Tickets
+whose fetched HTML has no Corrections block fall back to the serial
+navigate-and-read path. Rows are always written in input order.
+
+Both modes split the Corrections text into lines the same way
+(page_fetch.block_lines: one line per block element), so Corrections_Text
+does not depend on the mode.
 """
 
 import csv
@@ -16,11 +28,22 @@ from selenium.common.exceptions import SessionNotCreatedException, WebDriverExce
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import json
+from selenium.common.exceptions import TimeoutException
 import re
 import time
 
+from page_fetch import (
+    BLOCK_TAGS,
+    SKIP_TAGS,
+    fetch_enabled,
+    fetch_many,
+    parse_corrections_html,
+    record_parse,
+    structure_corrections,
+)
+from rate_limit import limited_get
+from work_manifest import cli_option
+
 # ---------- Config ----------
 PATH = "https://apollo.geo.apple.com/tickets/kittyhawk-sig/"
 INPUT_CSV = "NEI_report.csv"             # must contain column "Ticket ID"
@@ -37,6 +60,42 @@ RESET = "\033[0m"
 DELAY_BETWEEN_TICKETS = 0.75  # seconds; slow down if pages feel racy
 SLOW_MODE_EXTRA_WAIT = 0.5    # extra wait after navigation
 
+# Concurrent mode: in-page fetches in flight (0 = serial; --concurrency N) and tickets per fetch batch
+CONCURRENCY = 0
+BATCH_SIZE = 50
+
+# One round-trip for the Corrections value container: list items, code blocks, text lines.
+# Text is read the way page_fetch parses fetched HTML (textContent, block_lines), not innerText.
+CORRECTIONS_SNAPSHOT_JS = """
+const block = new Set(arguments[0]), skip = new Set(arguments[1]);
+const label = document.querySelector("div[title='Corrections']");
+if (!label) { return null; }
+let box = label.nextElementSibling;
+while (box && box.tagName !== "DIV") { box = box.nextElementSibling; }
+if (!box) { return null; }
+const lines = [];
+let buf = "";
+const flush = () => { const t = buf.replace(/\\s+/g, " ").trim(); buf = ""; if (t) { lines.push(t); } };
+const walk = (n) => {
+  if (n.nodeType === 3) { buf += n.data; return; }
+  if (n.nodeType !== 1) { return; }
+  const tag = n.tagName.toLowerCase();
+  if (skip.has(tag)) { return; }
+  const isBlock = block.has(tag);
+  if (isBlock) { flush(); }
+  n.childNodes.forEach(walk);
+  if (isBlock) { flush(); }
+};
+walk(box);
+flush();
+return {
+  list_items: Array.from(box.querySelectorAll("li"), (el) => (el.textContent || "").replace(/\\s+/g, " ").trim()).filter(Boolean),
+  code: Array.from(box.querySelectorAll("code"), (el) => (el.textContent || "").trim()).filter(Boolean),
+  lines: lines,
+};
+"""
+EMPTY_CORRECTIONS = {"list_items": [], "json_blocks": [], "code_blocks": [], "all_text": ""}
+
 # ---------- Helper ----------
 def clean_ticket_id(value: str) -> str:
     """
@@ -101,69 +160,69 @@ def extract_corrections_structured(driver):
       - json_blocks: list of JSON blobs (minified)
       - code_blocks: list of non-JSON code snippets
       - all_text: flattened visible text for reference
+    Waits for the Corrections label, then reads everything in ONE script call.
     """
     wait = WebDriverWait(driver, TIMEOUT)
     try:
-        label_el = wait.until(
-            EC.presence_of_element_located((By.XPATH, "//div[@title='Corrections']"))
-        )
+        wait.until(EC.presence_of_element_located((By.XPATH, "//div[@title='Corrections']")))
     except TimeoutException:
-        return {"list_items": [], "json_blocks": [], "code_blocks": [], "all_text": ""}
+        return dict(EMPTY_CORRECTIONS)
+
+    snap = driver.execute_script(CORRECTIONS_SNAPSHOT_JS, list(BLOCK_TAGS), list(SKIP_TAGS))
+    if not snap:
+        return dict(EMPTY_CORRECTIONS)
+    return structure_corrections(snap["list_items"], snap["code"], snap["lines"] or [])
+
+
+def scrape_serial(driver, ticket_ids):
+    """Yield (ticket_id, data | None) navigating to each ticket in turn."""
+    for ticket_id in ticket_ids:
+        print(f"\n=== Processing Ticket {ticket_id} ===")
+        try:
+            open_ticket(ticket_id, driver)
+            yield ticket_id, extract_corrections_structured(driver)
+        except Exception as ex:
+            print(f"{RED}✗ Error on ticket {ticket_id}: {type(ex).__name__}: {ex}{RESET}")
+            traceback.print_exc()
+            yield ticket_id, None
+        time.sleep(DELAY_BETWEEN_TICKETS)
+
 
+def scrape_concurrent(driver, ticket_ids, concurrency, batch_size=BATCH_SIZE):
+    """
+    Yield (ticket_id, data | None) in input order. Each batch is fetched in-page
+    (`concurrency` requests at a time) and parsed with lxml; misses use the serial path.
+    """
+    if not ticket_ids:
+        return
     try:
-        value_container = label_el.find_element(By.XPATH, "following-sibling::div[1]")
-    except NoSuchElementException:
-        return {"list_items": [], "json_blocks": [], "code_blocks": [], "all_text": ""}
-
-    # Collect list items
-    list_items = []
-    for li in value_container.find_elements(By.CSS_SELECTOR, "li"):
-        txt = (li.text or "").strip()
-        if txt:
-            list_items.append(txt)
-
-    # Collect code blocks
-    raw_code_blocks = []
-    for code in value_container.find_elements(By.TAG_NAME, "code"):
-        txt = (code.text or "").strip()
-        if txt:
-            raw_code_blocks.append(txt)
-
-    json_blocks = []
-    code_blocks = []
-    for block in raw_code_blocks:
-        candidate = block.strip()
-        # Quick guards: starts with { or [ is likely JSON
-        if candidate.startswith("{") or candidate.startswith("["):
+        open_ticket(ticket_ids[0], driver)  # same-origin page to fetch from
+    except Exception as ex:
+        # Fetches then fail (or miss) and every ticket takes the serial path, each guarded on its own
+        print(f"{RED}✗ Could not open ticket {ticket_ids[0]} to fetch from: {type(ex).__name__}: {ex}{RESET}")
+    for start in range(0, len(ticket_ids), batch_size):
+        batch = ticket_ids[start:start + batch_size]
+        results = [None] * len(batch)
+        if fetch_enabled("ticket"):
             try:
-                obj = json.loads(candidate)
-                json_blocks.append(json.dumps(obj, separators=(",", ":")))
-                continue
-            except Exception:
-                pass
-        # If not JSON or parse failed, keep as code text
-        code_blocks.append(candidate)
-
-    # Flatten all visible text as a reference column
-    all_lines = []
-    seen = set()
-    for line in (value_container.text or "").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if line in list_items or line in raw_code_blocks:
-            # already represented explicitly
-            pass
-        if line not in seen:
-            seen.add(line)
-            all_lines.append(line)
-
-    return {
-        "list_items": list_items,
-        "json_blocks": json_blocks,
-        "code_blocks": code_blocks,
-        "all_text": " | ".join(all_lines),
-    }
+                results = fetch_many(driver, [PATH + t for t in batch], concurrency=concurrency)
+            except Exception as ex:
+                print(f"{YELLOW}Batch fetch failed ({type(ex).__name__}: {ex}); using the serial path{RESET}")
+        fallback = []
+        parsed = {}
+        for ticket_id, res in zip(batch, results):
+            data = parse_corrections_html(res["body"]) if res and res["ok"] else None
+            if res is not None:
+                record_parse("ticket", data is not None)
+            if data is None:
+                fallback.append(ticket_id)
+            else:
+                parsed[ticket_id] = data
+        print(f"{GREEN}Fetched {len(parsed)}/{len(batch)} ticket(s) in-page; {len(fallback)} via navigation{RESET}")
+        slow = dict(scrape_serial(driver, fallback))
+        for ticket_id in batch:
+            yield ticket_id, parsed[ticket_id] if ticket_id in parsed else slow.get(ticket_id)
+
 
 # ---------- Main ----------
 def clean_ticket_id(value: str) -> str:
@@ -191,52 +250,41 @@ def clean_ticket_id(value: str) -> str:
     # choose the longest sequence of digits
     return max(digit_runs, key=len)
 
-def main():
+def main(concurrency: int = CONCURRENCY):
+    # Clean all Ticket IDs first so both modes see the same ordered list
+    ticket_ids = []
+    with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
+        reader = csv.DictReader(in_f)
+        # Handle potential BOM and trim headers
+        reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
+
+        for i, row in enumerate(reader, start=1):
+            raw_id = (row.get("Ticket ID") or "")
+            ticket_id = clean_ticket_id(raw_id)
+            if not ticket_id:
+                print(f"{YELLOW}Row {i}: Empty/invalid 'Ticket ID' after cleaning (raw='{raw_id}'); skipping.{RESET}")
+                continue
+            if str(raw_id).strip() != ticket_id:
+                print(f"{YELLOW}Row {i}: cleaned Ticket ID from '{raw_id}' -> '{ticket_id}' (removed HTML/noise){RESET}")
+            ticket_ids.append(ticket_id)
+
     driver = start_driver()
+    results = scrape_concurrent(driver, ticket_ids, concurrency) if concurrency > 0 else scrape_serial(driver, ticket_ids)
 
     with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as out_f:
         writer = csv.DictWriter(out_f, fieldnames=["Ticket ID", "Corrections_List", "Corrections_JSON", "Corrections_Code", "Corrections_Text"])
         writer.writeheader()
-
-        with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
-            reader = csv.DictReader(in_f)
-            # Handle potential BOM and trim headers
-            reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-
-            for i, row in enumerate(reader, start=1):
-                raw_id = (row.get("Ticket ID") or "")
-                ticket_id = clean_ticket_id(raw_id)
-                if not ticket_id:
-                    print(f"{YELLOW}Row {i}: Empty/invalid 'Ticket ID' after cleaning (raw='{raw_id}'); skipping.{RESET}")
-                    continue
-                if str(raw_id).strip() != ticket_id:
-                    print(f"{YELLOW}Row {i}: cleaned Ticket ID from '{raw_id}' -> '{ticket_id}' (removed HTML/noise){RESET}")
-
-                print(f"\n=== Processing Ticket {ticket_id} ===")
-                try:
-                    open_ticket(ticket_id, driver)
-                    data = extract_corrections_structured(driver)
-                    writer.writerow({
-                        "Ticket ID": ticket_id,
-                        "Corrections_List": " ; ".join(data["list_items"]) if data else "",
-                        "Corrections_JSON": " || ".join(data["json_blocks"]) if data else "",
-                        "Corrections_Code": " || ".join(data["code_blocks"]) if data else "",
-                        "Corrections_Text": data["all_text"] if data else "",
-                    })
-                    print(f"{GREEN}✓ Wrote corrections for {ticket_id}{RESET}")
-                    time.sleep(DELAY_BETWEEN_TICKETS)
-                except Exception as ex:
-                    print(f"{RED}✗ Error on ticket {ticket_id}: {type(ex).__name__}: {ex}{RESET}")
-                    traceback.print_exc()
-                    # Write an empty/partial row so we preserve ordering
-                    writer.writerow({
-                        "Ticket ID": ticket_id,
-                        "Corrections_List": "",
-                        "Corrections_JSON": "",
-                        "Corrections_Code": "",
-                        "Corrections_Text": "",
-                    })
-                    time.sleep(DELAY_BETWEEN_TICKETS)
+        for ticket_id, data in results:
+            # Failed tickets still get an empty row so we preserve ordering
+            writer.writerow({
+                "Ticket ID": ticket_id,
+                "Corrections_List": " ; ".join(data["list_items"]) if data else "",
+                "Corrections_JSON": " || ".join(data["json_blocks"]) if data else "",
+                "Corrections_Code": " || ".join(data["code_blocks"]) if data else "",
+                "Corrections_Text": data["all_text"] if data else "",
+            })
+            if data is not None:
+                print(f"{GREEN}✓ Wrote corrections for {ticket_id}{RESET}")
 
     driver.quit()
     print(f"{GREEN}✅ Done. Output → {OUTPUT_CSV}{RESET}")
@@ -244,9 +292,14 @@ def main():
 def open_ticket(ticket_id: str, driver) -> None:
     """Navigate directly to the KittyHawk-SIG ticket details page."""
     url = PATH + ticket_id
-    driver.get(url)
+    limited_get(driver, url)
     # Give Safari a moment to settle if the page is heavy
     time.sleep(SLOW_MODE_EXTRA_WAIT)
 
 if __name__ == "__main__":
-    main()
+    try:
+        concurrency = int(cli_option("--concurrency") or CONCURRENCY)
+    except ValueError:
+        print(f"{RED}--concurrency expects a whole number, got {cli_option('--concurrency')!r}{RESET}")
+        sys.exit(2)
+    main(concurrency)
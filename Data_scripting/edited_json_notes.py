@@ -27,11 +27,17 @@ ASSUMPTIONS:
 IMPORTANT:
     - This script defaults to **Show In Client (SIC)** but can run for **Hours** by passing --mode hours.
       Internally it maps to the filter keys `presence_period` (SIC) and `hours_period` (Hours).
+
+EDIT CACHE:
+    - Parsed edit JSON documents are kept in edit_json_cache.json, keyed by the edit id from the
+      badge link (`/edits/<id>`). Rows (and sic/hours reruns) that point at an edit seen before are
+      served from the cache without opening the JSON page. Links without an edit id are never
+      cached (the same URL can show a different edit). --no-edit-cache turns it off.
 """
 
-import csv
+import json
+import os
 import re
-import html
 import time
 import sys
 from datetime import datetime
@@ -60,10 +66,74 @@ from BC_hours_and_closures_Edit_Contests import (
     TIMEOUT,
     THRESHOLD,
 )
+from apollo_details_page import get_place_name
+from rate_limit import limited_get
+from retry_queue import RetryQueue
+from sharding import ShardOutput
+from work_manifest import cli_option, iter_place_ids, parse_shard
 
 # ---- I/O paths for this focused utility
 INPUT_CSV = "2_BC_Hours_and_Closures_Edit_Contests.csv"
 OUTPUT_CSV = "2_BC_output.csv"
+EDIT_CACHE_JSON = "edit_json_cache.json"
+EDIT_CACHE = None  # EditJsonCache, set in __main__ unless --no-edit-cache
+
+
+class EditJsonCache:
+    """
+    Persistent {edit key: parsed edit document} map shared across runs and modes.
+    A document is {"notes": str, "fields": {top-level scalar JSON fields}, "ts": ...};
+    edits are immutable, so entries never expire.
+    """
+
+    SAVE_EVERY = 25
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = 0
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError):
+                self.data = {}
+
+    @staticmethod
+    def key_for(href: str) -> str:
+        """Edit id from an '/edits/<id>' URL; "" (not cacheable) when the link has none."""
+        m = re.search(r"/edits/([^/?#]+)", href or "")
+        return m.group(1) if m else ""
+
+    def get(self, key: str):
+        doc = self.data.get(key) if key else None
+        if doc is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return doc
+
+    def put(self, key: str, doc: dict) -> None:
+        if not key:
+            return
+        self.data[key] = dict(doc, ts=datetime.now().isoformat())
+        self._dirty += 1
+        if self._dirty >= self.SAVE_EVERY:
+            self.save()
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+    def report(self) -> str:
+        return f"[edit cache] {self.hits} served from cache, {self.misses} opened ({len(self.data)} stored)"
 
 
 def _wait_versions_ready(driver):
@@ -93,63 +163,13 @@ def _wait_name_ready(driver):
             pass
 
 
-def _get_place_name(driver) -> str:
-    """Best-effort extraction of the POI's display name.
 
-    Priority order:
-      1) Details row value next to the label div[@title='Name']
-      2) Common header/title fallbacks
+def _edited_link_from_panel(driver, title_text: str):
     """
-    try:
-        # Canonical value cell(s) after the Name label
-        value_containers = driver.find_elements(By.XPATH, "//div[@title='Name']/following-sibling::div")
-        if value_containers:
-            spans = value_containers[0].find_elements(By.XPATH, ".//span[normalize-space()]")
-            if spans:
-                txt = spans[0].text.strip()
-                if txt:
-                    return txt
-            raw = value_containers[0].text.strip()
-            if raw:
-                return raw
-        # Header/title heuristics
-        for sel in (
-            "[data-test-id='place-header__title']",
-            "[data-test-id='place__title']",
-            "[data-test-id='place-title']",
-        ):
-            els = driver.find_elements(By.CSS_SELECTOR, sel)
-            if els and els[0].text.strip():
-                return els[0].text.strip()
-        for xp in (
-            "//header//h1",
-            "//header//h2",
-            "//div[contains(@class,'place-header')]//h1",
-            "//div[contains(@class,'place-header')]//h2",
-        ):
-            els = driver.find_elements(By.XPATH, xp)
-            for e in els:
-                t = e.text.strip()
-                if t:
-                    return t
-        for h in driver.find_elements(By.TAG_NAME, "h1"):
-            t = h.text.strip()
-            if t:
-                return t
-    except Exception:
-        pass
-    return ""
-
-
-def _open_json_from_panel(driver, title_text: str) -> bool:
-    """
-    STRICT panel opener:
+    STRICT link finder for a field panel:
       - Find the field panel by @title (e.g., 'Show In Client')
       - Ensure its badge text explicitly starts with 'edited'
-      - Click the link wrapping the badge (opens JSON details)
-    Returns True if navigation happened (new tab or same tab), else False.
-
-    NOTE: We **only** call this with title_text='Show In Client' in this script.
+      - Return the link wrapping the badge (it opens the JSON details), else None
     """
     # Locate the label cell (left) and the value/badge panel (right)
     try:
@@ -158,31 +178,40 @@ def _open_json_from_panel(driver, title_text: str) -> bool:
         )
         panel = label.find_element(By.XPATH, "following-sibling::div")
     except Exception:
-        return False
+        return None
 
     # Confirm the badge explicitly reads "edited"
     try:
         edited_badge = panel.find_element(By.CSS_SELECTOR, ".audit-badge")
         if not edited_badge or not edited_badge.text or not edited_badge.text.strip().lower().startswith("edit"):
             # Badge exists but isn't an 'edited' state → don't click
-            return False
+            return None
     except NoSuchElementException:
-        return False
+        return None
 
-    # Prefer a link that directly points to an '/edits/' URL; otherwise, click
-    # the closest wrapping <a> for the badge.
-    link = None
+    # Prefer a link that directly points to an '/edits/' URL; otherwise, the
+    # closest wrapping <a> for the badge.
     try:
         links = panel.find_elements(By.CSS_SELECTOR, "a[href*='/edits/']")
         if links:
-            link = links[0]
-        else:
-            link = panel.find_element(
-                By.XPATH,
-                ".//span[contains(@class,'audit-badge') and "
-                "contains(translate(.,'EDITED','edited'),'edited')]/ancestor::a[1]",
-            )
+            return links[0]
+        return panel.find_element(
+            By.XPATH,
+            ".//span[contains(@class,'audit-badge') and "
+            "contains(translate(.,'EDITED','edited'),'edited')]/ancestor::a[1]",
+        )
     except Exception:
+        return None
+
+
+def _open_json_from_panel(driver, title_text: str, link=None) -> bool:
+    """
+    STRICT panel opener: click the edited badge link of the panel (see
+    _edited_link_from_panel; pass `link` if already located).
+    Returns True if navigation happened (new tab or same tab), else False.
+    """
+    link = link or _edited_link_from_panel(driver, title_text)
+    if link is None:
         return False
 
     # Click (supports either same-tab navigation or a new-tab pop)
@@ -198,7 +227,7 @@ def _open_json_from_panel(driver, title_text: str) -> bool:
     return True
 
 
-def _scrape_notes_from_json(driver) -> str:
+def _scrape_edit_json(driver) -> dict:
     """
     After the edited link is clicked:
       - Either a new tab appears or we navigate in-place to a pretty-printed JSON page.
@@ -207,7 +236,8 @@ def _scrape_notes_from_json(driver) -> str:
           1) DOM path for the 'notes' attribute
           2) Longest visible string on the page
 
-    Returns the cleaned notes string (or "" if unavailable).
+    Returns {"notes": cleaned notes ("" if unavailable), "fields": top-level
+    scalar fields of the JSON ({} unless it parsed), "source": "json" | "dom" | "longest"}.
     """
     original = driver.current_window_handle
     pre_url = driver.current_url
@@ -274,18 +304,18 @@ def _scrape_notes_from_json(driver) -> str:
             end = raw_text.rfind("}")
             if start != -1 and end != -1 and end > start:
                 json_block = raw_text[start:end + 1]
-                import json as _json
                 try:
-                    obj = _json.loads(json_block)
+                    obj = json.loads(json_block)
                 except Exception:
                     # Handle common pretty-print hiccups (e.g., trailing commas)
                     cleaned = re.sub(r",(\s*[}\]])", r"\1", json_block)
-                    obj = _json.loads(cleaned)
+                    obj = json.loads(cleaned)
+                fields = {k: v for k, v in obj.items() if isinstance(v, (str, int, float, bool)) or v is None}
                 notes_val = obj.get("notes", "")
                 if isinstance(notes_val, str) and notes_val.strip():
                     notes_val = re.sub(r"\s+", " ", notes_val).strip()
                     _close_and_return()
-                    return notes_val
+                    return {"notes": notes_val, "fields": fields, "source": "json"}
     except Exception:
         # Fall through to DOM-based extraction
         pass
@@ -301,7 +331,7 @@ def _scrape_notes_from_json(driver) -> str:
         if txt:
             txt = re.sub(r"\s+", " ", txt).strip()
             _close_and_return()
-            return txt
+            return {"notes": txt, "fields": {}, "source": "dom"}
     except Exception:
         pass
 
@@ -315,7 +345,7 @@ def _scrape_notes_from_json(driver) -> str:
         best = ""
 
     _close_and_return()
-    return best
+    return {"notes": best, "fields": {}, "source": "longest"}
 
 
 def scrape_rca_note_for_place(driver, place_id: str, contested_field: str = "Show In Client"):
@@ -338,12 +368,12 @@ def scrape_rca_note_for_place(driver, place_id: str, contested_field: str = "Sho
     #    return None
 
     # Details
-    driver.get(PATH + place_id)
+    limited_get(driver, PATH + place_id)
     _wait_versions_ready(driver)
 
     # Ensure Name is present and capture it before leaving the details view
     _wait_name_ready(driver)
-    place_name = _get_place_name(driver)
+    place_name = get_place_name(driver)
 
     # Versions → apply filter based on mode
     click_versions_tab(driver)
@@ -366,13 +396,26 @@ def scrape_rca_note_for_place(driver, place_id: str, contested_field: str = "Sho
     _, vid = chosen
     click_version(driver, vid)
 
-    # Strict: only click the edited badge in the selected field row
+    # Strict: only the edited badge in the selected field row
     panel_label = cfg["panel_label"]
-    if not _open_json_from_panel(driver, panel_label):
+    link = _edited_link_from_panel(driver, panel_label)
+    if link is None:
         return {"place_id": place_id, "place_name": place_name, "rca_note": ""}
 
-    note = _scrape_notes_from_json(driver)
-    return {"place_id": place_id, "place_name": place_name, "rca_note": note}
+    # Same edit seen before (another row, or the other mode) → no JSON page visit
+    key = EditJsonCache.key_for(link.get_attribute("href") or "") if EDIT_CACHE is not None else ""
+    doc = EDIT_CACHE.get(key) if key else None
+    if doc is not None:
+        return {"place_id": place_id, "place_name": place_name, "rca_note": doc.get("notes", "")}
+
+    if not _open_json_from_panel(driver, panel_label, link):
+        return {"place_id": place_id, "place_name": place_name, "rca_note": ""}
+
+    doc = _scrape_edit_json(driver)
+    if key and doc["source"] != "longest":
+        # The longest-string fallback is a guess; leave it uncached so a rerun tries again
+        EDIT_CACHE.put(key, doc)
+    return {"place_id": place_id, "place_name": place_name, "rca_note": doc["notes"]}
 
 
 if __name__ == "__main__":
@@ -382,39 +425,36 @@ if __name__ == "__main__":
             val = (sys.argv[i + 1] or "").strip().lower()
             if val in MODE_CONFIG:
                 MODE = val
+    # Optional: --manifest jobs.csv (see work_manifest.py) to scrape each Place ID once
+    manifest = cli_option("--manifest")
+    # Optional: --shard i/N to split the sweep across machines (merge with sharding.py)
+    shard = parse_shard(cli_option("--shard"))
+    # Parsed edit JSON shared across rows / runs (--no-edit-cache to always open the JSON page)
+    if "--no-edit-cache" not in sys.argv:
+        EDIT_CACHE = EditJsonCache(cli_option("--edit-cache", EDIT_CACHE_JSON))
     driver = start_driver()
+    retries = RetryQueue()
 
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as out_f:
-        writer = csv.DictWriter(out_f, fieldnames=["place_id", "place_name", "rca_note"])
-        writer.writeheader()
-
-        with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
-            reader = csv.DictReader(in_f)
-            # Normalize BOM + whitespace in headers
-            reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-            for row in reader:
-                # ---- Robust Place ID cleanup (handles "<br>" and HTML entities)
-                pid_raw = (row.get("Place Id", "") or "").strip()
-                pid_unescaped = html.unescape(pid_raw)               # "&lt;br&gt;123" → "<br>123"
-                pid_no_tags = re.sub(r"<[^>]*>", "", pid_unescaped)  # "<br>123" → "123"
-                m = re.search(r"\d+", pid_no_tags)
-                pid = m.group(0) if m else ""
-                if not pid:
-                    print("❗ Missing Place ID; skipping.")
-                    continue
-
+    try:
+        # Per-shard output + journal when --shard i/N is given (see sharding.py)
+        with ShardOutput(OUTPUT_CSV, ["place_id", "place_name", "rca_note"], shard) as writer:
+            # Rows come from the source CSV (per-row cleanup) or a deduplicated work manifest
+            for pid, row in iter_place_ids(INPUT_CSV, "Place Id", manifest=manifest, shard=shard):
+                if pid in writer.done:
+                    continue  # resumed shard: already written
                 # Use the sheet value if present; we only act on "Hours".
                 #contested_field = (row.get("Contested Field", "") or row.get("Contested Field Column", "") or "").strip()
                 #if contested_field.lower() != "hours":
                 #    print(f"↷ Skipping {pid}: contested_field is '{contested_field}' (not Hours)")
                 #    continue
 
-                # Process one POI
+                # Process one POI (failures are retried after the main pass)
                 try:
                     rec = scrape_rca_note_for_place(driver, pid)
                 except Exception as e:
                     print(f"❌ Error for {pid}: {e}")
-                    rec = None
+                    retries.defer(pid, e, driver)
+                    continue
 
                 if rec is None:
                     # Early exit case (shouldn't hit because of the guard above)
@@ -423,5 +463,19 @@ if __name__ == "__main__":
                 print(f"→ {rec}")
                 writer.writerow(rec)
 
-    driver.quit()
-    print("✅ Done.")
\ No newline at end of file
+            # Deferred pass: fresh session + per-class backoff for the rows that failed above
+            driver = retries.drain(
+                scrape_rca_note_for_place,
+                start_driver,
+                driver,
+                on_result=writer.writerow,
+                on_giveup=lambda pid, item: writer.writerow({"place_id": pid, "place_name": "", "rca_note": ""}, status="failed"),
+            )
+    finally:
+        # Keep what was parsed so far even when the run dies part-way
+        if EDIT_CACHE is not None:
+            EDIT_CACHE.save()
+            print(EDIT_CACHE.report())
+        if driver is not None:
+            driver.quit()
+    print("✅ Done.")
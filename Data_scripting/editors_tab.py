@@ -10,7 +10,10 @@ This is a closures-only flow:
   • Always apply the **Show In Client** filter (key: `presence_period`).
   • Do NOT click the "edited" badge.
   • Match the Edits row by the CSV column **Edit Closure** (same calendar day
-    preferred; otherwise choose the closest in time).
+    preferred; otherwise choose the closest in time). A cell may hold several
+    dates separated by `;`, `|` or newlines → one output row per date.
+  • Each POI's Edits tab is read once (one bulk script call) into a date-sorted
+    `EditsIndex`; repeated Place Ids and multi-date cells reuse it.
 
 Reference
 ---------
@@ -27,14 +30,20 @@ Input / Output
 Usage
 -----
     python Data_scripting/editors_tab.py
+    python Data_scripting/editors_tab.py --fetch   # read Edits via in-page fetch (see page_fetch.py)
+
+With `--fetch`, the Edits resource is fetched from inside the page instead of
+clicking the tab; fetched rows are NOT narrowed by the Show In Client filter
+(it is client-side state), and the click path is used whenever the fetched
+body has no audit rows.
 """
 
 from __future__ import annotations
 import csv
 import re
-import html
 import sys
-from datetime import datetime
+from bisect import bisect_left
+from datetime import datetime, timedelta
 from typing import List, Tuple, Optional
 
 from selenium.webdriver.common.by import By
@@ -52,6 +61,10 @@ from BC_hours_and_closures_Edit_Contests import (
     TIMEOUT,
     THRESHOLD,  # not used directly here, but kept for parity
 )
+from apollo_details_page import get_place_name
+from page_fetch import fetch_parsed, parse_edits_html, tab_url
+from rate_limit import limited_get
+from work_manifest import clean_place_id
 
 # ---- Closures-only configuration
 FILTER_KEY = "presence_period"   # Show In Client
@@ -59,6 +72,24 @@ INPUT_CSV = "2_BC_Hours_and_Closures_Edit_Contests.csv"
 OUTPUT_CSV = "editor_notes_output.csv"
 ID_COL = "Place Id"
 CLOSURE_COL = "Edit Closure"
+USE_FETCH = "--fetch" in sys.argv
+TARGET_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%d %H:%M", "%m/%d/%Y %I:%M %p", "%b %d, %Y")
+
+# One round-trip for the whole Edits tab: [dateText, descriptionText] per audit row.
+EDITS_SNAPSHOT_JS = """
+const nextDiv = (el) => {
+  let n = el && el.nextElementSibling;
+  while (n && n.tagName !== "DIV") { n = n.nextElementSibling; }
+  return n;
+};
+const out = [];
+document.querySelectorAll("div[class*='audit-row']").forEach((r) => {
+  const d = nextDiv(r.querySelector("div[title='Date']"));
+  const desc = nextDiv(r.querySelector("div[title='Description']"));
+  if (d && desc) { out.push([d.innerText || "", (desc.innerText || "").trim()]); }
+});
+return out;
+"""
 
 
 # ---------- Page readiness / utilities ----------
@@ -73,29 +104,6 @@ def _wait_details_ready(driver):
     )
 
 
-def _get_place_name(driver) -> str:
-    """Read the POI name from the Name row or header fallbacks."""
-    try:
-        val = driver.find_elements(By.XPATH, "//div[@title='Name']/following-sibling::div")
-        if val:
-            t = val[0].text.strip()
-            if t:
-                return t
-    except Exception:
-        pass
-    for sel in (
-        "[data-test-id='place-header__title']",
-        "[data-test-id='place__title']",
-        "[data-test-id='place-title']",
-    ):
-        try:
-            els = driver.find_elements(By.CSS_SELECTOR, sel)
-            if els and els[0].text.strip():
-                return els[0].text.strip()
-        except Exception:
-            pass
-    return ""
-
 
 # ---------- Edits tab helpers ----------
 
@@ -140,23 +148,26 @@ def _parse_edit_datetime(txt: str) -> Optional[datetime]:
 
 
 def collect_edits(driver) -> List[Tuple[datetime, str]]:
-    """Return list of (edit_datetime, description_text) from Edits tab."""
-    rows = driver.find_elements(By.XPATH, "//div[contains(@class,'audit-row') and .//div[@title='Date']]")
+    """Return list of (edit_datetime, description_text) from Edits tab (one script call)."""
     out: List[Tuple[datetime, str]] = []
-    for r in rows:
-        try:
-            d_el = r.find_element(By.XPATH, ".//div[@title='Date']/following-sibling::div")
-            desc_el = r.find_element(By.XPATH, ".//div[@title='Description']/following-sibling::div")
-        except Exception:
-            continue
-        dt = _parse_edit_datetime(d_el.text)
-        desc = desc_el.text.strip()
+    for date_txt, desc in driver.execute_script(EDITS_SNAPSHOT_JS) or []:
+        dt = _parse_edit_datetime(date_txt)
         if dt:
             out.append((dt, desc))
     out.sort(key=lambda t: t[0], reverse=True)  # newest first
     return out
 
 
+def collect_edits_via_fetch(driver) -> Optional[List[Tuple[datetime, str]]]:
+    """Edits rows from an in-page fetch of the Edits resource; None → use the click path."""
+    rows = fetch_parsed(driver, "edits", tab_url(driver, "Edits", "edits"), parse_edits_html)
+    if not rows:
+        return None
+    out = [(dt, desc) for dt, desc in ((_parse_edit_datetime(d), desc) for d, desc in rows) if dt]
+    out.sort(key=lambda t: t[0], reverse=True)  # newest first
+    return out
+
+
 def apply_sic_filter(driver) -> None:
     """Open Versions and apply Show In Client (presence_period) filter."""
     click_versions_tab(driver)
@@ -167,35 +178,78 @@ def _same_calendar_day(a: datetime, b: datetime) -> bool:
     return (a.year, a.month, a.day) == (b.year, b.month, b.day)
 
 
+class EditsIndex:
+    """Edits rows sorted ascending by date; `match()` is two bisects instead of list scans."""
+
+    def __init__(self, edits: List[Tuple[datetime, str]]):
+        items = sorted(edits, key=lambda t: t[0])
+        self.dts = [dt for dt, _ in items]
+        self.descs = [desc for _, desc in items]
+
+    def __len__(self) -> int:
+        return len(self.dts)
+
+    def match(self, target_dt: Optional[datetime]) -> Tuple[Optional[datetime], str]:
+        """Latest edit on target_dt's calendar day; otherwise the closest (ties → newer)."""
+        if not self.dts:
+            return (None, "")
+        if target_dt is None:
+            return self.dts[-1], self.descs[-1]
+        day_end = datetime(target_dt.year, target_dt.month, target_dt.day) + timedelta(days=1)
+        i = bisect_left(self.dts, day_end) - 1
+        if i >= 0 and _same_calendar_day(self.dts[i], target_dt):
+            return self.dts[i], self.descs[i]
+        # fallback: closest neighbour on either side of target_dt
+        j = bisect_left(self.dts, target_dt)
+        if j == len(self.dts) or (j > 0 and target_dt - self.dts[j - 1] < self.dts[j] - target_dt):
+            j -= 1
+        return self.dts[j], self.descs[j]
+
+
 def find_matching_edit(edits: List[Tuple[datetime, str]], target_dt: Optional[datetime]) -> Tuple[Optional[datetime], str]:
     """Choose the Edits row for the same calendar day as target_dt; otherwise closest."""
-    if not edits:
-        return (None, "")
-    if target_dt is None:
-        return edits[0][0], edits[0][1]
-    for dt, desc in edits:
-        if _same_calendar_day(dt, target_dt):
-            return dt, desc
-    # fallback: absolute closest
-    best = min(edits, key=lambda t: abs((t[0] - target_dt).total_seconds()))
-    return best[0], best[1]
+    return EditsIndex(edits).match(target_dt)
+
+
+def parse_targets(raw: str) -> List[Tuple[str, Optional[datetime]]]:
+    """Edit Closure cell → [(date text, datetime | None)] (several dates allowed)."""
+    parts = [p.strip() for p in re.split(r"[;|\n]+", raw or "") if p.strip()]
+    targets: List[Tuple[str, Optional[datetime]]] = []
+    for part in parts or [(raw or "").strip()]:
+        target_dt = None
+        for fmt in TARGET_FORMATS:
+            try:
+                target_dt = datetime.strptime(part, fmt)
+                break
+            except Exception:
+                continue
+        targets.append((part, target_dt))
+    return targets
 
 
 # ---------- Core flow ----------
 
-def scrape_editor_note_via_edits(driver, place_id: str, target_dt: Optional[datetime]):
+def scrape_edits_index(driver, place_id: str) -> Tuple[str, EditsIndex]:
+    """Visit the POI once → (place_name, EditsIndex of its Edits tab)."""
     # Load details
-    driver.get(PATH + str(place_id))
+    limited_get(driver, PATH + str(place_id))
     _wait_details_ready(driver)
-    place_name = _get_place_name(driver)
+    place_name = get_place_name(driver)
 
     # Apply Show In Client filter (no badge clicking)
     apply_sic_filter(driver)
 
-    # Switch to Edits and collect entries
-    click_edits_tab(driver)
-    edits = collect_edits(driver)
-    match_dt, note = find_matching_edit(edits, target_dt)
+    # Switch to Edits and collect entries (optionally fetched without the tab click)
+    edits = collect_edits_via_fetch(driver) if USE_FETCH else None
+    if edits is None:
+        click_edits_tab(driver)
+        edits = collect_edits(driver)
+    return place_name, EditsIndex(edits)
+
+
+def scrape_editor_note_via_edits(driver, place_id: str, target_dt: Optional[datetime]):
+    place_name, index = scrape_edits_index(driver, place_id)
+    match_dt, note = index.match(target_dt)
 
     return {
         "place_id": str(place_id),
@@ -221,45 +275,40 @@ if __name__ == "__main__":
         )
         writer.writeheader()
 
+        # One Edits visit per Place Id; rows are still written in input order
+        visited = {}
         with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
             reader = csv.DictReader(in_f)
             reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
             for row in reader:
                 # Clean Place Id
-                pid_raw = (row.get(ID_COL, "") or "").strip()
-                pid_unescaped = html.unescape(pid_raw)
-                pid_no_tags = re.sub(r"<[^>]*>", "", pid_unescaped)
-                m = re.search(r"\d+", pid_no_tags)
-                pid = m.group(0) if m else ""
+                pid = clean_place_id(row.get(ID_COL, ""))
                 if not pid:
                     print("❗ Missing Place Id; skipping.")
                     continue
 
-                # Parse target Edit Closure date (lenient)
+                if pid not in visited:
+                    try:
+                        visited[pid] = scrape_edits_index(driver, pid)
+                    except Exception as e:
+                        print(f"❌ Error for {pid}: {e}")
+                        visited[pid] = ("", EditsIndex([]))
+                place_name, index = visited[pid]
+
+                # Parse target Edit Closure date(s) (lenient); one output row per date
                 raw_closure = (row.get(CLOSURE_COL, "") or "").strip()
-                target_dt = None
-                if raw_closure:
-                    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%d %H:%M", "%m/%d/%Y %I:%M %p", "%b %d, %Y"):
-                        try:
-                            target_dt = datetime.strptime(raw_closure, fmt)
-                            break
-                        except Exception:
-                            continue
-
-                try:
-                    rec = scrape_editor_note_via_edits(driver, pid, target_dt)
-                except Exception as e:
-                    print(f"❌ Error for {pid}: {e}")
+                for part, target_dt in parse_targets(raw_closure):
+                    match_dt, note = index.match(target_dt)
                     rec = {
                         "place_id": str(pid),
-                        "place_name": "",
-                        "edit_dt_iso": "",
-                        "editor_note": "",
+                        "place_name": place_name,
+                        # add original CSV date to output row
+                        "edit_closure_csv": part,
+                        "edit_dt_iso": match_dt.isoformat() if match_dt else "",
+                        "editor_note": note,
                     }
-                # add original CSV date to output row
-                rec["edit_closure_csv"] = raw_closure
-                print(f"→ {rec}")
-                writer.writerow(rec)
+                    print(f"→ {rec}")
+                    writer.writerow(rec)
 
     driver.quit()
     print("✅ Done (Edits tab notes).")
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+gdf_parse_bench.py
+
+Purpose
+-------
+Benchmark GDF_translate.parse_expression (offset-based) against the previous
+slicing parser, kept below as `legacy_parse_expression`. Every expression is
+parsed by both and the ASTs are checked equal before timing.
+
+Expressions are built as nested groups, e.g. depth 2:
+    [[[(t2h9){d5h8}] - [(t4h12){h1}]] + [(t7h10){h4}]]
+The old parser copied each group's inner text and rescanned it for the
+closing ']' at every level, so its cost grows with depth²; the new one does a
+single bracket-matching pass and works on offsets into the original string.
+
+Usage
+-----
+    python gdf_parse_bench.py                       # depths 10, 50, 100, 200
+    python gdf_parse_bench.py --depth 300 --repeat 20
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from GDF_translate import (
+    DUR_PAT,
+    QUAL_PAT,
+    Atom,
+    IntersectNode,
+    Node,
+    SubtractNode,
+    UnionNode,
+    parse_expression,
+)
+
+GREEN = "\033[92m"
+RESET = "\033[0m"
+
+DEPTHS = (10, 50, 100, 200)
+REPEAT = 10
+
+
+# ---------- Previous parser (substring slicing), for comparison only ----------
+
+def _legacy_parse_atom(s: str, i: int) -> Tuple[Atom, int]:
+    if s[i:i+2] != '[(':
+        raise ValueError(f"Expected '[(' at {i}")
+    i += 2
+    end_paren = s.index(')', i)
+    inner = s[i:end_paren]
+    flat_quals = [m.group(0) for m in QUAL_PAT.finditer(inner)]
+    j = end_paren + 1
+    durs = []
+    if j < len(s) and s[j] == '{':
+        j += 1
+        end_brace = s.index('}', j)
+        durs = [m.group(0) for m in DUR_PAT.finditer(s[j:end_brace])]
+        k = end_brace + 1
+        if s[k] != ']':
+            raise ValueError(f"Expected ']' at {k}")
+        k += 1
+    else:
+        if s[j] != ']':
+            raise ValueError(f"Expected ']' at {j}")
+        k = j + 1
+    return Atom(flat_quals, durs), k
+
+
+def _legacy_skip_ws(s: str, i: int) -> int:
+    while i < len(s) and s[i].isspace():
+        i += 1
+    return i
+
+
+def legacy_parse_expression(s: str, i: int = 0) -> Tuple[Node, int]:
+    def parse_factor(s, i):
+        i = _legacy_skip_ws(s, i)
+        if s[i:i+2] == '[(':
+            return _legacy_parse_atom(s, i)
+        if s[i] == '[':
+            depth = 0
+            start = i + 1
+            j = start
+            while j < len(s):
+                if s[j] == '[': depth += 1
+                elif s[j] == ']':
+                    if depth == 0: break
+                    depth -= 1
+                j += 1
+            node, _ = legacy_parse_expression(s[start:j], 0)
+            return node, j + 1
+        raise ValueError(f"Unexpected at pos {i}: {s[i:i+10]}")
+
+    def parse_term(s, i):
+        node, i = parse_factor(s, i)
+        while True:
+            i = _legacy_skip_ws(s, i)
+            if i >= len(s) or s[i] in ']+':
+                break
+            if s[i] == '*':
+                rhs, i = parse_factor(s, i+1)
+                node = IntersectNode(node, rhs)
+            elif s[i] == '-':
+                rhs, i = parse_factor(s, i+1)
+                node = SubtractNode(node, rhs)
+            else:
+                break
+        return node, i
+
+    node, i = parse_term(s, i)
+    while True:
+        i = _legacy_skip_ws(s, i)
+        if i >= len(s) or s[i] == ']':
+            break
+        if s[i] == '+':
+            rhs, i = parse_term(s, i+1)
+            if isinstance(node, UnionNode):
+                node.parts.append(rhs)
+            else:
+                node = UnionNode([node, rhs])
+        else:
+            break
+    return node, i
+
+
+# ---------- Benchmark ----------
+
+def nested_expression(depth: int, rng: random.Random) -> str:
+    def atom() -> str:
+        return f"[(t{rng.randint(1, 7)}h{rng.randint(6, 12)}){{d{rng.randint(1, 5)}h{rng.randint(1, 9)}}}]"
+    expr = atom()
+    for _ in range(depth):
+        expr = f"[{expr} {rng.choice('+*-')} {atom()}]"
+    return expr
+
+
+def best_of(fn, expr: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(expr)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(depths: List[int], repeat: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    # ~3 frames per nesting level in both parsers
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * max(depths) + 200))
+    print(f"  {'depth':>6}{'chars':>9}{'legacy ms':>12}{'offsets ms':>12}{'speedup':>9}")
+    for depth in depths:
+        expr = nested_expression(depth, rng)
+        if legacy_parse_expression(expr) != parse_expression(expr):
+            raise SystemExit(f"AST mismatch at depth {depth}")
+        old = best_of(legacy_parse_expression, expr, repeat)
+        new = best_of(parse_expression, expr, repeat)
+        print(f"  {depth:>6}{len(expr):>9}{old * 1e3:>12.2f}{new * 1e3:>12.2f}{old / new:>8.1f}x")
+    print(f"{GREEN}✔ Same AST from both parsers at every depth{RESET}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description="Benchmark the GDF parser on deeply nested expressions.")
+    p.add_argument("--depth", type=int, action="append", default=None, help="Nesting depth (repeatable)")
+    p.add_argument("--repeat", type=int, default=REPEAT, help="Timed runs per parser (best is reported)")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+    run(args.depth or list(DEPTHS), args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
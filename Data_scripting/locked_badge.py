@@ -9,7 +9,10 @@ from selenium.common.exceptions import SessionNotCreatedException, WebDriverExce
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
+
+# Shared change-detection walk (direct details URL, candidate-pruned versions)
+from versioning_checks import DIRECT, find_change_version as _find_change_version
 
 
 RED = "\033[91m"  # errors
@@ -87,98 +90,10 @@ def get_locked_label(driver):
 
 # remove up to versions check
 # instead of versions check-> find locked  field and scrap along with underscript
-def find_change_version(place_id, driver, threshold=datetime(2025, 6, 20)):
-    wait = WebDriverWait(driver, TIMEOUT)
-    print(f"🔄 Processing place_id={place_id}")
-    main, popup = open_and_switch(place_id, driver)
-    try:
-        click_versions_tab(driver)
-        versions = collect_versions(driver)
-
-        base_idx, (base_dt, base_id) = next(
-            (i, pair) for i, pair in enumerate(versions) if pair[0] >= threshold
-        )
-        click_version(driver, base_id)
-
-        prev_dt = base_dt
-
-        mod_panel = driver.find_element(
-            By.XPATH, "//div[@title='Modern Category']/following-sibling::div[1]"
-        )
-        prev_mod_el = mod_panel.find_element(By.CSS_SELECTOR, ".audit-badge")
-        prev_mod_badge = prev_mod_el.text.strip()
-        prev_mod_badge_hover = prev_mod_el.get_attribute("title").strip()
-
-        try:
-            audit_row = driver.find_element(
-                By.XPATH,
-                "//div[contains(@class,'audit-row')][.//div[@data-test-id='hours']]",
-            )
-            prev_hours_el = audit_row.find_element(By.CSS_SELECTOR, ".audit-badge")
-            prev_hours_badge = prev_hours_el.text.strip()
-            prev_hours_badge_hover = prev_hours_el.get_attribute("title").strip()
-        except NoSuchElementException:
-            prev_hours_badge = ""
-            prev_hours_badge_hover = ""
-
-        for dt, eid in versions[base_idx + 1 :]:
-            print(f"⤷ Processing version {eid} at {dt}")
-            click_version(driver, eid)
-
-            mod_panel = driver.find_element(
-                By.XPATH, "//div[@title='Modern Category']/following-sibling::div[1]"
-            )
-            curr_mod_el = mod_panel.find_element(By.CSS_SELECTOR, ".audit-badge")
-            curr_mod_badge = curr_mod_el.text.strip()
-            curr_mod_badge_hover = curr_mod_el.get_attribute("title").strip()
-
-            try:
-                audit_row = driver.find_element(
-                    By.XPATH,
-                    "//div[contains(@class,'audit-row')][.//div[@data-test-id='hours']]",
-                )
-                curr_hours_el = audit_row.find_element(By.CSS_SELECTOR, ".audit-badge")
-                curr_hours_badge = curr_hours_el.text.strip()
-                curr_hours_badge_hover = curr_hours_el.get_attribute("title").strip()
-            except NoSuchElementException:
-                curr_hours_badge = ""
-                curr_hours_badge_hover = ""
-
-            if (
-                curr_mod_badge != prev_mod_badge
-                or curr_mod_badge_hover != prev_mod_badge_hover
-                or curr_hours_badge != prev_hours_badge
-                or curr_hours_badge_hover != prev_hours_badge_hover
-            ):
-                print(f"❗ Change at {dt} — returning prior version’s ({prev_dt}) data")
-                return {
-                    "place_id": place_id,
-                    "changed_at": prev_dt.isoformat(),
-                    "hours_badge": prev_hours_badge,
-                    "hours_badge_hover": prev_hours_badge_hover,
-                    "modern_cat_badge": prev_mod_badge,
-                    "modern_cat_badge_hover": prev_mod_badge_hover,
-                }
-
-            prev_dt = dt
-            prev_mod_badge = curr_mod_badge
-            prev_mod_badge_hover = curr_mod_badge_hover
-            prev_hours_badge = curr_hours_badge
-            prev_hours_badge_hover = curr_hours_badge_hover
-
-        print("→ No change detected; returning last-seen data")
-        return {
-            "place_id": place_id,
-            "changed_at": "No change was detected",
-            "hours_badge": prev_hours_badge,
-            "hours_badge_hover": prev_hours_badge_hover,
-            "modern_cat_badge": prev_mod_badge,
-            "modern_cat_badge_hover": prev_mod_badge_hover,
-        }
-
-    finally:
-        driver.close()
-        driver.switch_to.window(main)
+def find_change_version(place_id, driver, threshold=datetime(2025, 6, 20), direct=DIRECT):
+    # Same pruned walk as versioning_checks: only versions that can touch
+    # Modern Category / Hours are clicked (see versioning_checks.candidate_versions)
+    return _find_change_version(place_id, driver, threshold=threshold, direct=direct)
 
 
 if __name__ == "__main__":
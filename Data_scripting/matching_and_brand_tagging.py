@@ -20,13 +20,16 @@ import csv
 import sys
 import traceback
 from selenium import webdriver
-from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.common.exceptions import SessionNotCreatedException, StaleElementReferenceException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from urllib.parse import urlsplit
 
+from apollo_details_page import ApolloDetailsPage
+from page_ready import first
+
 RED = "\033[91m"  # errors
 GREEN = "\033[92m"  # notes
 YELLOW = "\033[93m"  # warnings
@@ -56,17 +59,19 @@ def normalize_url(href: str):
         return cleaned or None
 
 
-def extract_url_by_label(driver, label: str, timeout: int = TIMEOUT):
+def extract_url_by_label(page: ApolloDetailsPage, label: str):
     """Return normalized href for the row whose label div has the given title.
     Example labels: 'URL', 'Homepage'. Never use this for 'Other'.
     If a visible 'None' placeholder is present, return the literal string 'None'.
-    Returns None when not found."""
+    Returns None when not found (immediately; the version view is already rendered).
+    Memoized per version view, so URL/Homepage are each read at most once per version."""
+    return page.cached(f"url:{label}", lambda p: _read_url(p.row(label)))
+
+
+def _read_url(container):
     try:
-        container = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located(
-                (By.XPATH, f"//div[@title='{label}']/following-sibling::div")
-            )
-        )
+        if container is None:
+            return None
         # If the UI explicitly shows a placeholder None, use it verbatim
         placeholders = container.find_elements(
             By.XPATH, ".//span[contains(@class,'text-placeholder')]"
@@ -83,6 +88,8 @@ def extract_url_by_label(driver, label: str, timeout: int = TIMEOUT):
                 return None
             return normalize_url(raw)
         return None
+    except StaleElementReferenceException:
+        raise  # ApolloDetailsPage.cached re-locates and retries
     except Exception:
         return None
 
@@ -130,7 +137,7 @@ def start_driver():
     return driver
 
 
-def extract_brand_name(driver):
+def extract_brand_name(page: ApolloDetailsPage):
     """
     Brand status detection:
     - If a visible placeholder 'None' exists in the Brand row -> return "None" (not branded).
@@ -138,12 +145,13 @@ def extract_brand_name(driver):
     - If it's branded but no literal brand text is visible (only an id link like (7926...)),
       return the placeholder "not visible".
     """
+    return page.cached("brand_name", lambda p: _read_brand_name(p.row("Brand")))
+
+
+def _read_brand_name(brand_row):
     try:
-        brand_row = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@title='Brand']/following-sibling::div")
-            )
-        )
+        if brand_row is None:
+            return "None"
 
         # Case 1: explicit None placeholder (not branded)
         placeholders = brand_row.find_elements(
@@ -178,18 +186,17 @@ def extract_brand_name(driver):
 
         # Fallback
         return "None"
+    except StaleElementReferenceException:
+        raise  # ApolloDetailsPage.cached re-locates and retries
     except Exception:
         return "None"
 
 
-def extract_brand_applier_source(driver):
-    """What Applied Brand? (Source) - Extracts the brand badge hover text (title attribute)"""
+def extract_brand_applier_source(page: ApolloDetailsPage):
+    """What Applied Brand? (Source) - Extracts the brand badge hover text (title attribute).
+    Reuses the Brand row located by extract_brand_name for the same version."""
     try:
-        brand_row = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@title='Brand']/following-sibling::div")
-            )
-        )
+        brand_row = page.row("Brand")
         badge_element = brand_row.find_element(By.CSS_SELECTOR, ".badge.audit-badge")
         badge_hover = (
             badge_element.get_attribute("title").strip()
@@ -201,10 +208,10 @@ def extract_brand_applier_source(driver):
         return "", ""
 
 
-def extract_brand_applier_vheader(driver):
+def extract_brand_applier_vheader(page: ApolloDetailsPage):
     """What Applied Brand (Version Header) - Returns only the relevant header texts."""
     try:
-        selected_row = WebDriverWait(driver, TIMEOUT).until(
+        selected_row = WebDriverWait(page.driver, TIMEOUT).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "tr.selected-row"))
         )
         tds = selected_row.find_elements(By.CSS_SELECTOR, "td.collapsed-column")
@@ -231,57 +238,53 @@ def extract_brand_applier_vheader(driver):
         return []
 
 
-def extract_brand_modern_category(driver):
+def extract_brand_modern_category(page: ApolloDetailsPage):
     """Brand Modern Category"""
     try:
-        mod_cat_row = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@title='Modern Category']/following-sibling::div")
-            )
-        )
-        mod_cat_element = mod_cat_row.find_element(By.TAG_NAME, "span")
+        mod_cat_row = page.row("Modern Category")
+        mod_cat_element = first(mod_cat_row, By.TAG_NAME, "span") if mod_cat_row is not None else None
+        if mod_cat_element is None:
+            return "", ""
         mod_cat_text = mod_cat_element.text.strip()
         return mod_cat_text
     except Exception:
         return "", ""
 
 
-def extract_poi_name_prior(driver):
+def extract_poi_name_prior(page: ApolloDetailsPage):
     """POI name prior to Brand Application"""
     try:
-        prior_name_row = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@title='Name']/following-sibling::div")
-            )
-        )
-        prior_name_span = prior_name_row.find_element(By.TAG_NAME, "span")
+        prior_name_row = page.row("Name")
+        prior_name_span = first(prior_name_row, By.TAG_NAME, "span") if prior_name_row is not None else None
+        if prior_name_span is None:
+            return "", ""
         prior_name_text = prior_name_span.text.strip()
         return prior_name_text
     except Exception:
         return "", ""
 
 
-def extract_ow_url_prior(driver):
+def extract_ow_url_prior(page: ApolloDetailsPage):
     """POI OW URL prior to Brand Application (normalized, no scheme/www).
     Prefer 'URL' then 'Homepage'. If a 'None' placeholder is present, returns the literal 'None'. Returns None when absent.
     """
-    href = extract_url_by_label(driver, "URL", timeout=TIMEOUT)
+    href = extract_url_by_label(page, "URL")
     if href is not None:
         return href
-    href = extract_url_by_label(driver, "Homepage", timeout=5)
+    href = extract_url_by_label(page, "Homepage")
     if href is not None:
         return href
     return None
 
 
-def extract_ow_url_at_brand(driver):
+def extract_ow_url_at_brand(page: ApolloDetailsPage):
     """URL at the version where Brand is applied (normalized).
     Prefer 'Homepage' then 'URL'. If a 'None' placeholder is present, returns the literal 'None'. Returns None when absent.
     """
-    href = extract_url_by_label(driver, "Homepage", timeout=TIMEOUT)
+    href = extract_url_by_label(page, "Homepage")
     if href is not None:
         return href
-    href = extract_url_by_label(driver, "URL", timeout=5)
+    href = extract_url_by_label(page, "URL")
     if href is not None:
         return href
     return None
@@ -343,18 +346,16 @@ def collect_versions(driver):
     return sorted(entries, key=lambda x: x[0])
 
 
-def click_version(driver, entry_id):
-    wait = WebDriverWait(driver, TIMEOUT)
-    wait.until(EC.element_to_be_clickable((By.ID, entry_id))).click()
-    wait.until(
-        EC.presence_of_element_located((By.XPATH, "//div[@title='Modern Category']"))
-    )
-    wait.until(EC.presence_of_element_located((By.XPATH, "//div[@title='Hours']")))
+def click_version(page: ApolloDetailsPage, entry_id):
+    # One barrier per version view (this also drops the page's cached rows/values);
+    # the extract_* helpers below read without waiting
+    page.click_version(entry_id, "Modern Category", "Hours")
 
 
 def scrape_badge(hyperlink, driver):
     print(f"Processing POI={hyperlink}")
-    driver.get(hyperlink)
+    page = ApolloDetailsPage(driver, TIMEOUT)
+    page.goto(hyperlink)
     try:
         click_versions_tab(driver)
         # filtering for brand
@@ -366,15 +367,15 @@ def scrape_badge(hyperlink, driver):
         prior_poi_name = None
         prior_ow_url = None
         for dt, entry_id in versions:
-            click_version(driver, entry_id)
+            click_version(page, entry_id)
             # brand check
-            brand_name = extract_brand_name(driver)
+            brand_name = extract_brand_name(page)
             if brand_name != "None":
                 # scrape fields
-                brand_app_hover = extract_brand_applier_source(driver)
-                version_header = extract_brand_applier_vheader(driver)
-                brand_modern_category = extract_brand_modern_category(driver)
-                ow_url_at_brand = extract_ow_url_at_brand(driver)
+                brand_app_hover = extract_brand_applier_source(page)
+                version_header = extract_brand_applier_vheader(page)
+                brand_modern_category = extract_brand_modern_category(page)
+                ow_url_at_brand = extract_ow_url_at_brand(page)
                 # For the brand-applied version, the "prior" values must come from the previous iteration only.
                 # If this is the first version (no prior), leave as None (or "None" if UI displayed it earlier).
                 poi_name_prior = prior_poi_name
@@ -390,8 +391,8 @@ def scrape_badge(hyperlink, driver):
                     "POI OW URL at Brand Application": ow_url_at_brand,
                 }
             # save POI name for next iteration
-            prior_poi_name = extract_poi_name_prior(driver)
-            prior_ow_url = extract_ow_url_prior(driver)
+            prior_poi_name = extract_poi_name_prior(page)
+            prior_ow_url = extract_ow_url_prior(page)
         # if no brand found, return empty
         print(f"{YELLOW}No Brand data found in any version.{RESET}")
         return {
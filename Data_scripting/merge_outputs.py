@@ -0,0 +1,258 @@
+"""
+merge_outputs.py
+
+Purpose
+-------
+Join any number of scraper outputs back onto the source contest sheet by
+Place ID in ONE streaming pass (replaces the VLOOKUPs done by hand).
+
+Each output CSV is loaded once into a hash index {normalized Place ID → row};
+the source CSV is then streamed row by row and every row is written out with
+the matching columns from each output appended. Place IDs on both sides go
+through `work_manifest.clean_place_id`, the same cleanup the scrapers apply,
+so "=HYPERLINK(...)", entities and stray text still match.
+
+Keys
+----
+Some scrapers run one job per Place ID + key (BC: one per contested field) and
+echo the key in their output. `--key` names source key columns (default:
+"Contested Field" / "Contested Field Column"); an output that has a matching
+column joins on Place ID + key, matched the way work_manifest.fan_out does
+("Contested Field" ↔ "contested_field"), so `123,Hours` and `123,Closure` each
+get their own result. Outputs without the column join on Place ID alone.
+
+Duplicates
+----------
+An output can hold several rows for one Place ID (e.g. editor notes with one
+row per target date). `--dupes` picks what the source row receives:
+
+    first   keep the first row seen (default; same as sharding.py merge)
+    last    keep the last row seen
+    join    keep every distinct value per column, joined with " | "
+
+With first/last the report counts dropped rows whose key column differs from
+the kept row, i.e. a keyed output joined without that key because the source
+has no matching column.
+
+Columns
+-------
+Output columns are appended in file order. The id column of each output is
+dropped (the source already carries it). A column whose name is already taken
+is prefixed with the output's prefix: `--join path=prefix`, default the file
+stem plus "." (e.g. "poi_names_output.place_name").
+
+Usage
+-----
+    python merge_outputs.py BC_Hours_and_Closures_Edit_Contests.csv enriched.csv \\
+        --join "BC_hours_&_closures_output.csv" \\
+        --join poi_names_output.csv \\
+        --join editor_notes_output.csv=notes. --dupes join \\
+        --id-col "Place ID" --key "Contested Field"
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from work_manifest import clean_place_id, column_key
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+ID_CANDIDATES = ("place_id", "Place ID", "Place Id", "place id", "PlaceID")
+DUPE_POLICIES = ("first", "last", "join")
+KEY_CANDIDATES = ("Contested Field", "Contested Field Column")
+JOIN_SEP = " | "
+
+
+def _clean_header(fieldnames: Optional[Sequence[str]]) -> List[str]:
+    return [fn.lstrip("\ufeff").strip() for fn in (fieldnames or [])]
+
+
+def parse_join_spec(spec: str) -> Tuple[str, str]:
+    """'path' or 'path=prefix' → (path, prefix). Default prefix: '<file stem>.'."""
+    path, sep, prefix = spec.partition("=")
+    if not sep:
+        prefix = os.path.splitext(os.path.basename(path))[0] + "."
+    return path, prefix
+
+
+def _cell(raw: Sequence[str], pos: int) -> str:
+    return raw[pos] if pos < len(raw) else ""
+
+
+class OutputIndex:
+    """
+    One scraper output held as {normalized Place ID → row values}, or
+    {(Place ID, *key values) → row values} when it carries any of `source_keys`.
+    """
+
+    def __init__(self, path: str, prefix: str, id_column: Optional[str] = None, dupes: str = "first",
+                 source_keys: Sequence[str] = ()):
+        if dupes not in DUPE_POLICIES:
+            raise ValueError(f"--dupes must be one of {DUPE_POLICIES}, got {dupes!r}")
+        self.path = path
+        self.prefix = prefix
+        self.dupes = dupes
+        self.rows: Dict[object, List[str]] = {}
+        self.duplicate_ids = 0
+        self.dropped_other_keys = 0  # first/last: dropped duplicates with a different (unjoined) key value
+        self.blank_ids = 0
+        self._tags: Dict[object, tuple] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = _clean_header(next(reader, []))
+            self.id_column = id_column or next((c for c in ID_CANDIDATES if c in header), "")
+            if self.id_column not in header:
+                raise ValueError(f"{path}: no Place ID column (tried {id_column or ', '.join(ID_CANDIDATES)})")
+            id_pos = header.index(self.id_column)
+            by_key = {column_key(c): i for i, c in enumerate(header) if i != id_pos}
+            # Source key columns this output also has → part of the join (dropped from the appended columns)
+            self.keys = [k for k in dict.fromkeys(source_keys) if column_key(k) in by_key]
+            key_pos = [by_key[column_key(k)] for k in self.keys]
+            # Key-like columns not joined on (the source lacks them): only used to flag lossy dupes
+            tag_pos = [i for k, i in by_key.items()
+                       if k in {column_key(c) for c in (*KEY_CANDIDATES, *source_keys)} and i not in key_pos]
+            self.value_pos = [i for i in range(len(header)) if i != id_pos and i not in key_pos]
+            self.columns = [header[i] for i in self.value_pos]
+            for raw in reader:
+                pid = clean_place_id(_cell(raw, id_pos))
+                if not pid:
+                    self.blank_ids += 1
+                    continue
+                key = (pid, *(_cell(raw, i).strip() for i in key_pos)) if key_pos else pid
+                values = [_cell(raw, i) for i in self.value_pos]
+                self._add(key, values, tuple(_cell(raw, i).strip() for i in tag_pos))
+        self.matched: set = set()
+
+    def _add(self, key, values: List[str], tag: tuple = ()) -> None:
+        prev = self.rows.get(key)
+        if prev is None:
+            self.rows[key] = values if self.dupes != "join" else [[v] if v else [] for v in values]
+            self._tags[key] = tag
+            return
+        self.duplicate_ids += 1
+        if self.dupes != "join" and tag != self._tags[key]:
+            self.dropped_other_keys += 1
+        if self.dupes == "last":
+            self.rows[key] = values
+            self._tags[key] = tag
+        elif self.dupes == "join":
+            for bucket, v in zip(prev, values):
+                if v and v not in bucket:
+                    bucket.append(v)
+
+    def lookup(self, key) -> List[str]:
+        values = self.rows.get(key)
+        if values is None:
+            return [""] * len(self.columns)
+        self.matched.add(key)
+        if self.dupes == "join":
+            return [JOIN_SEP.join(bucket) for bucket in values]
+        return values
+
+
+def merge_outputs(
+    source_csv: str,
+    out_csv: str,
+    joins: Sequence[Tuple[str, str]],
+    id_column: str = "Place ID",
+    out_id_column: Optional[str] = None,
+    dupes: str = "first",
+    key_columns: Sequence[str] = KEY_CANDIDATES,
+) -> dict:
+    """Stream `source_csv`, append each output's columns, write `out_csv`. Returns a report dict."""
+    with open(source_csv, newline="", encoding="utf-8") as in_f:
+        src_keys = [c for c in _clean_header(next(csv.reader(in_f), [])) if c in key_columns]
+    indexes = [OutputIndex(path, prefix, out_id_column, dupes, src_keys) for path, prefix in joins]
+
+    with open(source_csv, newline="", encoding="utf-8") as in_f, \
+            open(out_csv, "w", newline="", encoding="utf-8") as out_f:
+        reader = csv.reader(in_f)
+        src_header = _clean_header(next(reader, []))
+        if id_column not in src_header:
+            raise ValueError(f"Column '{id_column}' not found in {source_csv}")
+        id_pos = src_header.index(id_column)
+        key_pos = [[src_header.index(k) for k in idx.keys] for idx in indexes]
+
+        header = list(src_header)
+        taken = set(header)
+        for idx in indexes:
+            for col in idx.columns:
+                name = col if col not in taken else idx.prefix + col
+                header.append(name)
+                taken.add(name)
+
+        writer = csv.writer(out_f)
+        writer.writerow(header)
+        rows = unmatched = 0
+        for raw in reader:
+            raw = raw + [""] * (len(src_header) - len(raw))
+            pid = clean_place_id(raw[id_pos])
+            out = raw[:len(src_header)]
+            hit = False
+            for idx, kpos in zip(indexes, key_pos):
+                key = (pid, *(raw[i].strip() for i in kpos)) if kpos else pid
+                values = idx.lookup(key) if pid else [""] * len(idx.columns)
+                hit = hit or key in idx.rows
+                out.extend(values)
+            writer.writerow(out)
+            rows += 1
+            unmatched += 0 if hit else 1
+
+    return {
+        "rows": rows,
+        "unmatched_rows": unmatched,
+        "outputs": [
+            {
+                "path": idx.path,
+                "keys": idx.keys,
+                "ids": len(idx.rows),
+                "matched": len(idx.matched),
+                "not_in_source": len(idx.rows) - len(idx.matched),
+                "duplicate_rows": idx.duplicate_ids,
+                "dropped_other_keys": idx.dropped_other_keys,
+                "blank_ids": idx.blank_ids,
+            }
+            for idx in indexes
+        ],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Join scraper outputs onto the source sheet by Place ID.")
+    p.add_argument("source_csv")
+    p.add_argument("out_csv")
+    p.add_argument("--join", action="append", required=True, metavar="PATH[=PREFIX]",
+                   help="Scraper output to join (repeatable)")
+    p.add_argument("--id-col", default="Place ID", help="Place ID column in the source CSV")
+    p.add_argument("--out-id-col", default=None, help="Place ID column in the outputs (default: auto-detect)")
+    p.add_argument("--dupes", choices=DUPE_POLICIES, default="first")
+    p.add_argument("--key", action="append", default=[],
+                   help="Source column that makes a job distinct, joined with the output's matching column "
+                        f"(repeatable; default: {', '.join(KEY_CANDIDATES)})")
+    args = p.parse_args(argv)
+
+    report = merge_outputs(
+        args.source_csv, args.out_csv, [parse_join_spec(s) for s in args.join],
+        args.id_col, args.out_id_col, args.dupes, args.key or KEY_CANDIDATES,
+    )
+    print(f"{GREEN}✔ {report['rows']} source row(s) → {args.out_csv}{RESET}")
+    if report["unmatched_rows"]:
+        print(f"{YELLOW}{report['unmatched_rows']} row(s) matched no output{RESET}")
+    for o in report["outputs"]:
+        color = YELLOW if o["not_in_source"] or o["duplicate_rows"] else GREEN
+        keyed = f" + {', '.join(o['keys'])}" if o["keys"] else ""
+        print(f"{color}  {o['path']} (Place ID{keyed}): {o['matched']}/{o['ids']} id(s) matched · "
+              f"{o['not_in_source']} not in source · {o['duplicate_rows']} duplicate row(s) ({args.dupes}){RESET}")
+        if o["dropped_other_keys"]:
+            print(f"{YELLOW}    {o['dropped_other_keys']} dropped duplicate(s) had a different key value "
+                  f"(no matching source column to join on; see --key){RESET}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from urllib.parse import urlsplit
 
+from rate_limit import limited_get
+
 import re
 
 def extract_url(cell_value: str) -> str:
@@ -229,7 +231,7 @@ def click_version(driver, entry_id):
 
 def scrape_badge(hyperlink, driver):
     print(f"Processing POI={hyperlink}")
-    driver.get(hyperlink)
+    limited_get(driver, hyperlink)
     try:
         click_versions_tab(driver)
         # filtering for brand
@@ -0,0 +1,340 @@
+"""
+page_fetch.py
+
+Purpose
+-------
+Read ToDos / Edits / ticket resources without clicking tabs and waiting for
+them to render. `fetch_many` runs `fetch()` calls from INSIDE the
+authenticated Apollo page (`execute_async_script`), several at once, and
+returns the raw bodies to Python; the `parse_*` helpers turn those bodies into
+the same values the click-path helpers return (lxml, no browser round-trips).
+
+One Safari session can therefore fan out many lightweight requests: the
+cookies / SSO session of the page are reused (`credentials: "include"`).
+
+Fallback
+--------
+Apollo is a client-rendered app; some routes may return only the app shell.
+Every fetch path is best-effort: when a body parses to nothing the caller
+falls back to the click path. A resource kind ("todos", "edits", "ticket")
+that has never parsed successfully is switched off for the session after
+`MAX_MISSES` misses, so a shell-only route costs at most a few extra requests.
+
+Usage
+-----
+    from page_fetch import fetch_many, fetch_parsed, parse_edits_html, tab_url
+
+    url = tab_url(driver, "Edits", "edits")
+    edits = fetch_parsed(driver, "edits", url, parse_edits_html)
+    if edits is None:
+        ...  # click path
+
+    results = fetch_many(driver, [PATH + t for t in ticket_ids], concurrency=6)
+    for r in results:
+        data = parse_corrections_html(r["body"]) if r["ok"] else None
+"""
+
+from __future__ import annotations
+import json
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+from lxml import html as lxml_html
+
+import scrape_log
+from rate_limit import limiter
+
+TIMEOUT = 30          # seconds per request
+CONCURRENCY = 6       # in-flight fetches per page
+MAX_MISSES = 3        # empty parses before a never-successful kind is disabled
+
+# Worker pool of fetch() calls; resolves with one result object per URL (input order).
+FETCH_JS = """
+const urls = arguments[0], concurrency = arguments[1], timeoutMs = arguments[2],
+      asJson = arguments[3], done = arguments[arguments.length - 1];
+const out = new Array(urls.length);
+let next = 0;
+async function one(i) {
+  const ctrl = new AbortController();
+  const timer = setTimeout(() => ctrl.abort(), timeoutMs);
+  try {
+    const r = await fetch(urls[i], {
+      credentials: "include",
+      signal: ctrl.signal,
+      headers: asJson ? {"Accept": "application/json"} : {"Accept": "text/html"},
+    });
+    out[i] = {url: urls[i], final_url: r.url, status: r.status, ok: r.ok, body: await r.text(), error: null};
+  } catch (e) {
+    out[i] = {url: urls[i], final_url: "", status: 0, ok: false, body: "", error: String(e)};
+  } finally {
+    clearTimeout(timer);
+  }
+}
+async function worker() {
+  while (next < urls.length) { await one(next++); }
+}
+Promise.all(Array.from({length: Math.max(1, Math.min(concurrency, urls.length))}, worker))
+  .then(() => done(out), (e) => done(urls.map((u) => ({url: u, final_url: "", status: 0, ok: false, body: "", error: String(e)}))));
+"""
+
+# {label: href} for the details-page nav tabs.
+TAB_HREFS_JS = """
+const out = {};
+document.querySelectorAll("a.nav-link").forEach((a) => {
+  const label = (a.textContent || "").trim();
+  if (label && a.href && !a.href.endsWith("#")) { out[label] = a.href; }
+});
+return out;
+"""
+
+
+# ---------- Fetching ----------
+
+def fetch_many(
+    driver,
+    urls: Sequence[str],
+    concurrency: int = CONCURRENCY,
+    as_json: bool = False,
+    timeout: float = TIMEOUT,
+) -> List[dict]:
+    """
+    Fetch `urls` from inside the current page, `concurrency` at a time.
+
+    Returns one dict per URL, in input order:
+        {url, final_url, status, ok, body, error[, json]}
+    With `as_json`, successful bodies are decoded into `json` (None if not JSON).
+    Every URL takes a token from the shared rate limiter (rate_limit.py); when
+    limiting is on, URLs are sent in waves no larger than the bucket.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    concurrency = max(1, int(concurrency))
+    chunk = min(len(urls), limiter.burst) if limiter.enabled else len(urls)
+    results = []
+    prev_timeout = _script_timeout(driver)
+    try:
+        for start in range(0, len(urls), chunk):
+            part = urls[start:start + chunk]
+            limiter.acquire(len(part))
+            waves = math.ceil(len(part) / concurrency)
+            driver.set_script_timeout(timeout * waves + 5)
+            results.extend(driver.execute_async_script(FETCH_JS, part, concurrency, int(timeout * 1000), bool(as_json)))
+    finally:
+        # The session's script timeout is shared with every other execute_async_script caller
+        if prev_timeout is not None:
+            driver.set_script_timeout(prev_timeout)
+    for r in results:
+        # A redirect away from Apollo means the SSO session expired.
+        if r.get("ok") and r.get("final_url") and "apollo.geo.apple.com" not in r["final_url"]:
+            r["ok"] = False
+            r["error"] = f"redirected to {r['final_url']}"
+        if as_json:
+            try:
+                r["json"] = json.loads(r["body"]) if r.get("ok") else None
+            except ValueError:
+                r["json"] = None
+    return results
+
+
+def _script_timeout(driver) -> Optional[float]:
+    try:
+        return driver.timeouts.script
+    except Exception:
+        return None
+
+
+def tab_hrefs(driver) -> Dict[str, str]:
+    try:
+        return driver.execute_script(TAB_HREFS_JS) or {}
+    except Exception:
+        return {}
+
+
+def tab_url(driver, label, suffix: str) -> str:
+    """URL behind a details-page tab (label or label variants): its href, else `<current url>/<suffix>`."""
+    hrefs = tab_hrefs(driver)
+    for lbl in ([label] if isinstance(label, str) else label):
+        if hrefs.get(lbl):
+            return hrefs[lbl]
+    base = (driver.current_url or "").split("?", 1)[0].split("#", 1)[0].rstrip("/")
+    return f"{base}/{suffix}"
+
+
+# ---------- Per-kind enable / disable ----------
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def fetch_enabled(kind: str) -> bool:
+    s = _stats.get(kind)
+    return not s or s["hits"] > 0 or s["misses"] < MAX_MISSES
+
+
+def record_parse(kind: str, ok: bool) -> None:
+    s = _stats.setdefault(kind, {"hits": 0, "misses": 0})
+    s["hits" if ok else "misses"] += 1
+    if not ok and s["hits"] == 0 and s["misses"] == MAX_MISSES:
+        scrape_log.warn(f"[fetch] '{kind}' bodies never parsed; using the click path for the rest of the run")
+
+
+def fetch_parsed(driver, kind: str, url: str, parser: Callable[[str], object]):
+    """Fetch one resource and parse it. Returns the parsed value, or None → use the click path."""
+    if not fetch_enabled(kind):
+        return None
+    try:
+        res = fetch_many(driver, [url], concurrency=1)[0]
+    except Exception as e:
+        scrape_log.warn(f"[fetch] {kind} fetch failed: {type(e).__name__}: {e}")
+        record_parse(kind, False)
+        return None
+    parsed = parser(res["body"]) if res["ok"] else None
+    record_parse(kind, bool(parsed))
+    return parsed or None
+
+
+# ---------- Parsing (lxml) ----------
+
+def _doc(body: str):
+    if not body or not body.strip():
+        return None
+    try:
+        return lxml_html.fromstring(body)
+    except Exception:
+        return None
+
+
+def _text(el) -> str:
+    """Whitespace-normalized text of an element (≈ WebElement.text on one line)."""
+    return re.sub(r"\s+", " ", el.text_content() or "").strip()
+
+
+# Line breaks for block_lines (and the same walk in details_correction's live-DOM snapshot),
+# so fetched and navigated pages split text into identical lines.
+BLOCK_TAGS = (
+    "address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table",
+    "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+)
+SKIP_TAGS = ("script", "style", "template", "noscript")
+
+
+def block_lines(el) -> List[str]:
+    """Non-empty, whitespace-collapsed text lines of an element; a line ends at every block tag."""
+    lines: List[str] = []
+    buf: List[str] = []
+
+    def flush():
+        t = re.sub(r"\s+", " ", "".join(buf)).strip()
+        buf.clear()
+        if t:
+            lines.append(t)
+
+    def walk(node):
+        if not isinstance(node.tag, str):  # comments / processing instructions
+            return
+        tag = node.tag.lower()
+        if tag in SKIP_TAGS:
+            return
+        block = tag in BLOCK_TAGS
+        if block:
+            flush()
+        if node.text:
+            buf.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                buf.append(child.tail)
+        if block:
+            flush()
+
+    walk(el)
+    flush()
+    return lines
+
+
+def _class_xpath(cls: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+def structure_corrections(list_items: List[str], raw_code: List[str], lines: List[str]) -> dict:
+    """
+    Shared tail of the Corrections extractors (fetched HTML or live DOM snapshot):
+    split code blocks into minified JSON vs plain code, de-duplicate text lines.
+    """
+    json_blocks, code_blocks = [], []
+    for block in raw_code:
+        candidate = block.strip()
+        # Quick guards: starts with { or [ is likely JSON
+        if candidate.startswith("{") or candidate.startswith("["):
+            try:
+                json_blocks.append(json.dumps(json.loads(candidate), separators=(",", ":")))
+                continue
+            except Exception:
+                pass
+        code_blocks.append(candidate)
+
+    all_lines: List[str] = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if line and line not in seen:
+            seen.add(line)
+            all_lines.append(line)
+    return {
+        "list_items": list_items,
+        "json_blocks": json_blocks,
+        "code_blocks": code_blocks,
+        "all_text": " | ".join(all_lines),
+    }
+
+
+def parse_corrections_html(body: str) -> Optional[dict]:
+    """
+    Ticket page → the dict `details_correction.extract_corrections_structured` returns:
+    {list_items, json_blocks, code_blocks, all_text}. None when there is no Corrections block.
+    """
+    doc = _doc(body)
+    if doc is None:
+        return None
+    containers = doc.xpath("//div[@title='Corrections']/following-sibling::div[1]")
+    if not containers:
+        return None
+    box = containers[0]
+    list_items = [t for t in (_text(li) for li in box.iter("li")) if t]
+    raw_code = [t for t in ((c.text_content() or "").strip() for c in box.iter("code")) if t]
+    return structure_corrections(list_items, raw_code, block_lines(box))
+
+
+def parse_edits_html(body: str) -> List[tuple]:
+    """Edits page → [(date_text, description_text)] per audit row (unparsed dates)."""
+    doc = _doc(body)
+    if doc is None:
+        return []
+    out = []
+    for row in doc.xpath(f"//div[{_class_xpath('audit-row')} and .//div[@title='Date']]"):
+        d = row.xpath(".//div[@title='Date']/following-sibling::div")
+        desc = row.xpath(".//div[@title='Description']/following-sibling::div")
+        if d and desc:
+            out.append((_text(d[0]), (desc[0].text_content() or "").strip()))
+    return out
+
+
+def parse_todo_title_html(body: str) -> str:
+    """ToDos page → the ToDo summary title text ("" when not server-rendered)."""
+    doc = _doc(body)
+    if doc is None:
+        return ""
+    for xp in (
+        "//*[@data-test-id='todo-summary__todo-title' or @data-test-id='todo-summary_todo-title']",
+        f"//*[{_class_xpath('todo-summary')}]//*[{_class_xpath('section-header')}]",
+        f"//*[{_class_xpath('todo-summary')}]//h1",
+        f"//*[{_class_xpath('todo-summary')}]//h2",
+    ):
+        for el in doc.xpath(xp):
+            t = _text(el)
+            if t:
+                return t
+    return ""
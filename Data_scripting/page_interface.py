@@ -0,0 +1,117 @@
+"""
+page_interface.py
+
+Purpose
+-------
+The small page interface the Apollo flows are written against, so the same
+`find_change_version` (BC_hours_and_closures_Edit_Contests.py) and
+`scrape_gemini` (CDEF.py) run on Safari/Selenium or on Playwright
+(playwright_backend.py).
+
+`ApolloPage` has five operations; selectors are CSS, or XPath with an
+"xpath=" prefix, and reads go through `evaluate()` snapshots so both backends
+return the same values:
+
+    goto(url)                 rate-limited navigation (rate_limit.py)
+    wait_for(selector)        True once attached, False on timeout
+    click(selector)           wait until clickable, then click
+    evaluate(js, arg)         run an arrow function `(arg) => ...` in the page
+    current_url
+
+`execute_script(body)` runs a `return ...` statement body like
+WebDriver.execute_script, so page_ready.py / version_fingerprint.py helpers
+accept a page as well as a driver. Timeouts surface as Selenium's
+TimeoutException on every backend, so existing handlers keep working.
+
+Usage
+-----
+    from page_interface import as_page
+
+    page = as_page(driver)              # WebDriver → SeleniumPage; an ApolloPage passes through
+    page.goto(PATH + place_id)
+    if page.wait_for("a[id^='entry-']"):
+        ids = page.evaluate("() => Array.from(document.querySelectorAll(\"a[id^='entry-']\"), (a) => a.id)")
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from rate_limit import limited_get
+
+TIMEOUT = 30
+
+
+class ApolloPage(ABC):
+    """The few page operations the flows need. Selectors: CSS, or 'xpath=...'."""
+
+    @abstractmethod
+    def goto(self, url: str) -> None:
+        ...
+
+    @abstractmethod
+    def wait_for(self, selector: str, timeout: float = TIMEOUT) -> bool:
+        """True once `selector` is attached; False on timeout (never raises for absence)."""
+
+    @abstractmethod
+    def click(self, selector: str, timeout: float = TIMEOUT) -> None:
+        """Click the first match once clickable; TimeoutException if it never is."""
+
+    @abstractmethod
+    def evaluate(self, js: str, arg: Any = None) -> Any:
+        """Run an arrow function `(arg) => ...` in the page and return its value."""
+
+    @property
+    @abstractmethod
+    def current_url(self) -> str:
+        ...
+
+    def execute_script(self, script: str) -> Any:
+        """Run a `return ...` statement body (as WebDriver.execute_script, no arguments)."""
+        return self.evaluate(f"() => {{{script}}}")
+
+
+class SeleniumPage(ApolloPage):
+    """ApolloPage over a Selenium WebDriver."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    @staticmethod
+    def _locator(selector: str):
+        if selector.startswith("xpath="):
+            return By.XPATH, selector[len("xpath="):]
+        return By.CSS_SELECTOR, selector
+
+    def goto(self, url: str) -> None:
+        limited_get(self.driver, url)
+
+    def wait_for(self, selector: str, timeout: float = TIMEOUT) -> bool:
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located(self._locator(selector)))
+            return True
+        except (TimeoutException, WebDriverException):
+            return False
+
+    def click(self, selector: str, timeout: float = TIMEOUT) -> None:
+        WebDriverWait(self.driver, timeout).until(EC.element_to_be_clickable(self._locator(selector))).click()
+
+    def evaluate(self, js: str, arg: Any = None) -> Any:
+        return self.driver.execute_script(f"return ({js})(arguments[0]);", arg)
+
+    @property
+    def current_url(self) -> str:
+        return self.driver.current_url
+
+    def execute_script(self, script: str) -> Any:
+        return self.driver.execute_script(script)
+
+
+def as_page(driver) -> ApolloPage:
+    """Wrap a WebDriver in a SeleniumPage; an ApolloPage is returned unchanged."""
+    return driver if isinstance(driver, ApolloPage) else SeleniumPage(driver)
@@ -0,0 +1,134 @@
+"""
+page_ready.py
+
+Purpose
+-------
+Wait ONCE per view for the POI details panel to finish rendering, then read
+fields with zero-timeout lookups.
+
+Before, every field helper ran its own `WebDriverWait(driver, TIMEOUT)` for its
+label, so a field that is legitimately absent cost the full 30 s, and a POI
+with three missing fields burned 90 s. Now:
+
+  • `wait_details_rendered(driver)` is the barrier: it waits until the page is
+    idle (readyState complete, no spinner) and the number of field label rows
+    (`div.col-label[title]`) is stable across two polls. Call it after
+    `driver.get(...)` and after selecting a version.
+  • `field_value(driver, title)` / `first(...)` use `find_elements`, which
+    returns immediately, so an absent field is reported as absent (None) at
+    once.
+  • `wait_versions_settled(driver, before)` is the same barrier for the
+    Versions list after a filter is chosen: the `a[id^='entry-']` list must
+    have changed from `before` (or VERSIONS_GRACE passed without a change, for
+    filters that keep every version) and be stable across two polls.
+
+Usage
+-----
+    from page_ready import field_value, first, wait_details_rendered
+
+    click_version(driver, entry_id)         # ends with wait_details_rendered()
+    panel = field_value(driver, "Hours")    # None → field absent in this view
+
+    before = probe_versions(driver)
+    choose_field(driver, "hours_period")
+    wait_versions_settled(driver, before)   # then probe / collect the filtered list
+"""
+
+from __future__ import annotations
+import time
+from typing import Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+TIMEOUT = 30
+SETTLE = 0.25  # seconds between the two polls that must agree
+VERSIONS_GRACE = 1.5  # seconds to wait for a filter to change the Versions list
+
+# -1 while the page is still loading; otherwise the number of rendered field labels.
+READY_JS = """
+if (document.readyState !== "complete") { return -1; }
+if (document.querySelector(".spinner-border, .spinner-grow, [aria-busy='true']")) { return -1; }
+return document.querySelectorAll("div.col-label[title]").length;
+"""
+
+
+class _LabelsSettled:
+    """Condition: label count > 0 and unchanged since the previous poll."""
+
+    def __init__(self):
+        self.last = None
+
+    def __call__(self, driver):
+        n = driver.execute_script(READY_JS)
+        settled = n is not None and n > 0 and n == self.last
+        self.last = n
+        return settled
+
+
+# null while loading; otherwise [first entry id, last entry id, count] (count 0 → empty list).
+VERSIONS_JS = """
+if (document.readyState !== "complete") { return null; }
+if (document.querySelector(".spinner-border, .spinner-grow, [aria-busy='true']")) { return null; }
+const a = document.querySelectorAll("a[id^='entry-']");
+return a.length ? [a[0].id, a[a.length - 1].id, a.length] : ["", "", 0];
+"""
+
+
+class _VersionsSettled:
+    """Condition: Versions list differs from `before` (or the grace period is over) and is stable."""
+
+    def __init__(self, before, grace: float):
+        self.before = list(before) if before else ["", "", 0]  # probe_versions() → None for an empty list
+        self.deadline = time.monotonic() + grace
+        self.last = None
+
+    def __call__(self, driver):
+        fp = driver.execute_script(VERSIONS_JS)
+        stable = fp is not None and fp == self.last
+        self.last = fp
+        if not stable:
+            return False
+        return fp != self.before or time.monotonic() >= self.deadline
+
+
+def wait_details_rendered(driver, timeout: float = TIMEOUT) -> bool:
+    """Barrier for the details panel. Returns False (non-fatal) if it never settles."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=SETTLE).until(_LabelsSettled())
+        return True
+    except (TimeoutException, WebDriverException):
+        return False
+
+
+def wait_versions_settled(driver, before=None, timeout: float = TIMEOUT, grace: float = VERSIONS_GRACE) -> bool:
+    """Barrier for the Versions list after a filter change. Returns False (non-fatal) on timeout."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=SETTLE).until(_VersionsSettled(before, grace))
+        return True
+    except (TimeoutException, WebDriverException):
+        return False
+
+
+def first(scope, by: str, selector: str):
+    """First matching element under `scope` (driver or element), or None. Never waits."""
+    found = scope.find_elements(by, selector)
+    return found[0] if found else None
+
+
+def field_value(driver, title: str):
+    """Value container next to the `div[@title=...]` label, or None if the field is absent."""
+    return first(driver, By.XPATH, f"//div[@title='{title}']/following-sibling::div")
+
+
+def badge_text(panel) -> str:
+    """`.audit-badge` text (or any `span.badge`) inside a field panel; "" if none."""
+    if panel is None:
+        return ""
+    el = first(panel, By.CSS_SELECTOR, ".audit-badge") or first(panel, By.XPATH, ".//span[contains(@class,'badge')]")
+    return el.text.strip() if el is not None else ""
+
+
+def text_of(el) -> Optional[str]:
+    return el.text.strip() if el is not None else None
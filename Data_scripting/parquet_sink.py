@@ -0,0 +1,175 @@
+"""
+parquet_sink.py
+
+Purpose
+-------
+Typed Parquet copy of a scraper's output, written alongside the CSV.
+
+The CSV keeps lists as Python reprs ("['Brand', 'Applier']") and dates as
+M/D/YYYY strings, so every downstream load re-parses them (`ast.literal_eval`
+in auto_report.clean_list_string). The Parquet file stores them typed:
+
+    version_header            list<string>
+    edited_at                 timestamp[s]
+    present_badge, ...        dictionary<int32, string>   (few distinct values)
+
+Rows are buffered and flushed as one row group every `row_group_size` rows,
+so memory stays flat on long runs. pyarrow is optional; without it the
+scrapers refuse `--parquet` with an install hint and the CSV is unaffected.
+
+The file is written to `<path>.tmp` (no footer, so unreadable, until close)
+and renamed on close; use the sink as a context manager so an exception still
+closes it. The CSV (and shard journal) stay the record of a run that was
+killed outright: on a resumed shard, pass `resume_from=<the CSV>` and the rows
+already in it are converted first, so the Parquet file matches the CSV again.
+
+Usage
+-----
+    from parquet_sink import BC_COLUMNS, ParquetSink, parquet_path
+
+    with ParquetSink(parquet_path(writer.path), BC_COLUMNS) as sink:
+        sink.write(result)        # same dict passed to the CSV writer
+
+    resumed = ParquetSink(parquet_path(writer.path), BC_COLUMNS, resume_from=writer.path)
+"""
+
+from __future__ import annotations
+import ast
+import csv
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for --parquet
+    pa = None
+    pq = None
+
+GREEN = "\033[92m"
+RESET = "\033[0m"
+
+ROW_GROUP_SIZE = 500
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+
+# Column → logical type for BC_hours_and_closures_Edit_Contests.py output.
+BC_COLUMNS: Dict[str, str] = {
+    "place_id": "string",
+    "contested_field": "category",
+    "edited_at": "timestamp",
+    "version_header": "list",
+    "present_badge": "category",
+    "show_client_edited_badge": "category",
+    "todo_source_lvl_2": "category",
+    "rca_indicator": "string",
+}
+
+
+def parquet_path(output_csv: str) -> str:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}.parquet"
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise SystemExit("--parquet needs pyarrow: pip install pyarrow")
+
+
+def arrow_schema(columns: Dict[str, str]):
+    require_pyarrow()
+    types = {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("s"),
+        "list": pa.list_(pa.string()),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind in columns.items()])
+
+
+# ---------- Value conversion (CSV-style values → typed) ----------
+
+def to_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    text = str(value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_list(value) -> List[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            parsed = ast.literal_eval(text)
+            if isinstance(parsed, (list, tuple)):
+                return [str(v) for v in parsed]
+        except (ValueError, SyntaxError):
+            pass
+    return [text]
+
+
+def to_string(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+CONVERTERS = {"string": to_string, "category": to_string, "timestamp": to_timestamp, "list": to_list}
+
+
+# ---------- Sink ----------
+
+class ParquetSink:
+    """Buffered Parquet writer with a fixed schema; one row group per flush."""
+
+    def __init__(self, path: str, columns: Dict[str, str], row_group_size: int = ROW_GROUP_SIZE,
+                 resume_from: Optional[str] = None):
+        require_pyarrow()
+        self.path = path
+        self.columns = dict(columns)
+        self.schema = arrow_schema(self.columns)
+        self.row_group_size = max(1, int(row_group_size))
+        self.rows = 0
+        self._buf: List[dict] = []
+        self._tmp = path + ".tmp"
+        self._writer = pq.ParquetWriter(self._tmp, self.schema)
+        if resume_from and os.path.exists(resume_from):
+            # Rebuild from the CSV rows of earlier sessions, including any whose
+            # Parquet file never got its footer (ParquetWriter cannot append anyway)
+            with open(resume_from, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self.write(row)
+
+    def write(self, row: dict) -> None:
+        self._buf.append({
+            name: CONVERTERS[kind](row.get(name)) for name, kind in self.columns.items()
+        })
+        if len(self._buf) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        self._writer.write_table(pa.Table.from_pylist(self._buf, schema=self.schema))
+        self.rows += len(self._buf)
+        self._buf = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        os.replace(self._tmp, self.path)
+        print(f"{GREEN}✔ {self.rows} row(s) → {self.path}{RESET}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -9,6 +9,8 @@ with columns: place_id, place_name.
 
 Usage (defaults shown):
     python Data_scripting/place_name.py [INPUT_CSV] [OUTPUT_CSV] [ID_COLUMN]
+    python Data_scripting/place_name.py ... --manifest jobs.csv   # deduplicated (work_manifest.py)
+    python Data_scripting/place_name.py ... --shard 0/4           # one machine's share (sharding.py)
 
 Defaults:
     INPUT_CSV = Data_scripting/BC_Hours_and_Closures_Edit_Contests.csv
@@ -16,18 +18,26 @@ Defaults:
     ID_COLUMN  = "Place Id"
 """
 
-import csv
-import html
-import re
 import sys
 import traceback
 import time
 from selenium import webdriver
-from selenium.common.exceptions import SessionNotCreatedException, WebDriverException, TimeoutException
+from selenium.common.exceptions import (
+    SessionNotCreatedException,
+    WebDriverException,
+    TimeoutException,
+    NoSuchElementException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from apollo_details_page import get_place_name
+from rate_limit import limited_get
+from retry_queue import RetryQueue
+from sharding import ShardOutput
+from work_manifest import cli_option, iter_place_ids, parse_shard
+
 # Console colors (optional)
 RED = "\033[91m"
 RESET = "\033[0m"
@@ -39,7 +49,7 @@ PATH = "https://apollo.geo.apple.com/p/release/"  # base details page
 # Throttling / resilience defaults (can be overridden via CLI flags)
 STARTUP_DELAY = 3.0   # seconds to pause after launching the driver
 NAV_DELAY = 1.25      # seconds to pause right after driver.get(url)
-RETRIES = 3           # navigation/ready retries per POI
+RETRIES = 3           # deferred retries per POI (after the main pass)
 
 DEFAULT_INPUT = "2_BC_Hours_and_Closures_Edit_Contests.csv"
 DEFAULT_OUTPUT = "poi_names_output.csv"
@@ -125,130 +135,65 @@ def _wait_details_loaded(driver):
             pass
 
 
-def _get_place_name(driver) -> str:
-    """Best-effort extraction of the POI's display name.
-
-    Priority order:
-      1) Details row value next to the label div[@title='Name']
-      2) Common header/title fallbacks
-    """
-    try:
-        # 1) Canonical: the details row labeled Name, value column spans
-        value_containers = driver.find_elements(By.XPATH, "//div[@title='Name']/following-sibling::div")
-        if value_containers:
-            # Grab visible text from first span or direct text
-            spans = value_containers[0].find_elements(By.XPATH, ".//span[normalize-space()]")
-            if spans:
-                txt = spans[0].text.strip()
-                if txt:
-                    return txt
-            raw = value_containers[0].text.strip()
-            if raw:
-                return raw
-
-        # 2) Header/title based heuristics
-        for sel in (
-            "[data-test-id='place-header__title']",
-            "[data-test-id='place__title']",
-            "[data-test-id='place-title']",
-        ):
-            els = driver.find_elements(By.CSS_SELECTOR, sel)
-            if els and els[0].text.strip():
-                return els[0].text.strip()
-        for xp in (
-            "//header//h1",
-            "//header//h2",
-            "//div[contains(@class,'place-header')]//h1",
-            "//div[contains(@class,'place-header')]//h2",
-        ):
-            els = driver.find_elements(By.XPATH, xp)
-            for e in els:
-                t = e.text.strip()
-                if t:
-                    return t
-        for h in driver.find_elements(By.TAG_NAME, "h1"):
-            t = h.text.strip()
-            if t:
-                return t
-    except Exception:
-        pass
-    return ""
-
-
-def _clean_place_id(raw: str) -> str:
-    """Strip tags/entities and pull first number; if none, return raw."""
-    s = (raw or "").strip()
-    if not s:
-        return ""
-    s = html.unescape(s)
-    s = re.sub(r"<[^>]*>", "", s)  # drop any HTML like <br>
-    m = re.search(r"\d+", s)
-    return m.group(0) if m else s
-
-
 
 def scrape_name_for_row(driver, place_id: str) -> dict:
+    """Single attempt; raises so the caller can defer the POI to the retry pass."""
     url = PATH + str(place_id)
 
-    last_exc = None
-    for attempt in range(1, RETRIES + 1):
-        try:
-            driver.get(url)
-            # small human-like pause so SSO / redirects can settle
-            time.sleep(NAV_DELAY)
+    limited_get(driver, url)
+    # small human-like pause so SSO / redirects can settle
+    time.sleep(NAV_DELAY)
 
-            # wait for page load & expected URL shape
-            _wait_ready_state(driver, timeout=TIMEOUT)
-            _wait_url_contains(driver, "/p/release/", timeout=TIMEOUT)
+    # wait for page load & expected URL shape
+    _wait_ready_state(driver, timeout=TIMEOUT)
+    _wait_url_contains(driver, "/p/release/", timeout=TIMEOUT)
 
-            # try to wait for details markers
-            _wait_details_loaded(driver)
+    # try to wait for details markers
+    _wait_details_loaded(driver)
 
-            # minor jiggle to trigger lazy loads
-            try:
-                driver.execute_script("window.scrollBy(0, 60)")
-                time.sleep(0.15)
-                driver.execute_script("window.scrollBy(0, -60)")
-            except Exception:
-                pass
+    # minor jiggle to trigger lazy loads
+    try:
+        driver.execute_script("window.scrollBy(0, 60)")
+        time.sleep(0.15)
+        driver.execute_script("window.scrollBy(0, -60)")
+    except Exception:
+        pass
+
+    name = get_place_name(driver)
+    if not name:
+        raise NoSuchElementException("Name not found")
+    return {"place_id": str(place_id), "place_name": name}
 
-            name = _get_place_name(driver)
-            if name:
-                return {"place_id": str(place_id), "place_name": name}
-            # If name blank, raise to retry
-            raise TimeoutException("Name not found yet")
-        except Exception as e:
-            last_exc = e
-            # backoff before retry
-            time.sleep(STARTUP_DELAY * (attempt))
-    # After retries, return best-effort (blank name) and log once
-    print(f"{RED}Failed to load/scrape name for {place_id}: {last_exc}{RESET}")
-    return {"place_id": str(place_id), "place_name": ""}
-
-
-def main(input_csv: str, output_csv: str, id_column: str):
+
+def main(input_csv: str, output_csv: str, id_column: str, manifest: str | None = None, shard=None):
     driver = start_driver()
+    retries = RetryQueue(max_attempts=RETRIES)
     try:
-        with open(output_csv, "w", newline="", encoding="utf-8") as out_f:
-            writer = csv.DictWriter(out_f, fieldnames=["place_id", "place_name"])
-            writer.writeheader()
-
-            with open(input_csv, newline="", encoding="utf-8") as in_f:
-                reader = csv.DictReader(in_f)
-                # Normalize BOM + whitespace in headers
-                reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-
-                for row in reader:
-                    raw = row.get(id_column, "")
-                    pid = _clean_place_id(raw)
-                    if not pid:
-                        print(":exclamation: Missing Place Id; skipping.")
-                        continue
+        # Per-shard output + journal when --shard i/N is given (see sharding.py)
+        with ShardOutput(output_csv, ["place_id", "place_name"], shard) as writer:
+            # Rows come from the source CSV (per-row cleanup) or a deduplicated work manifest
+            for pid, _row in iter_place_ids(input_csv, id_column, manifest=manifest, shard=shard, keep_raw=True):
+                if pid in writer.done:
+                    continue  # resumed shard: already written
+                try:
                     rec = scrape_name_for_row(driver, pid)
-                    print(f"→ {rec}")
-                    writer.writerow(rec)
+                except Exception as e:
+                    # No inline sleeps; retried after the main pass on a fresh session
+                    retries.defer(pid, e, driver)
+                    continue
+                print(f"→ {rec}")
+                writer.writerow(rec)
+
+            driver = retries.drain(
+                scrape_name_for_row,
+                start_driver,
+                driver,
+                on_result=writer.writerow,
+                on_giveup=lambda pid, item: writer.writerow({"place_id": str(pid), "place_name": ""}, status="failed"),
+            )
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
         print("✅ Done (POI names).")
 
 
@@ -270,8 +215,12 @@ if __name__ == "__main__":
                 globals()["RETRIES"] = int(sys.argv[i + 1])
             except Exception:
                 pass
+    # Optional: --manifest jobs.csv (see work_manifest.py) to scrape each Place ID once
+    manifest = cli_option("--manifest")
+    # Optional: --shard i/N to split the sweep across machines (merge with sharding.py)
+    shard = parse_shard(cli_option("--shard"))
     # CLI args: INPUT OUTPUT ID_COLUMN
     input_csv = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT
     output_csv = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
     id_column = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_ID_COLUMN
-    main(input_csv, output_csv, id_column)
\ No newline at end of file
+    main(input_csv, output_csv, id_column, manifest, shard)
\ No newline at end of file
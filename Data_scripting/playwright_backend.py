@@ -0,0 +1,296 @@
+"""
+playwright_backend.py
+
+Purpose
+-------
+Alternative async backend for the Apollo scrapers. Safari/Selenium gives one
+heavyweight session per driver (and one automation session per machine);
+Playwright runs many isolated browser contexts inside ONE Chromium process,
+driven by `asyncio` with a bounded pool of workers.
+
+There is one copy of each flow: `find_change_version` in
+BC_hours_and_closures_Edit_Contests.py and `scrape_gemini` in CDEF.py, whose
+helpers go through the `ApolloPage` interface (page_interface.py). This module
+only adds the Playwright implementation of that interface:
+
+    SeleniumPage    wraps a WebDriver (page_interface.py; what the Safari scripts use)
+    PlaywrightPage  wraps a Playwright page (one browser context per POI)
+
+The flows are synchronous, so each one runs in a worker thread and
+PlaywrightPage hands its calls to the event loop that owns the browser.
+Playwright timeouts/errors are raised as Selenium's TimeoutException /
+WebDriverException, so the flows' existing handlers apply unchanged.
+
+Auth
+----
+Contexts start from a saved storage state (cookies after Apple SSO):
+    python playwright_backend.py login            # headed browser; finish SSO, press Enter
+Playwright is optional: pip install playwright && playwright install chromium
+
+Usage
+-----
+    python playwright_backend.py run bc     [--concurrency 8] [--backend playwright|selenium]
+    python playwright_backend.py run gemini [--concurrency 8] [--input in.csv] [--output out.csv]
+    ... run bc --costs "BC_hours_&_closures_output.log.jsonl"    # longest POIs first (scheduler.py)
+Rows are written in input order. Rows that fail are written empty and logged;
+the deferred-retry pass of the Selenium scripts is not repeated here.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    from playwright.async_api import async_playwright
+except ImportError:  # optional backend
+    async_playwright = None
+    PlaywrightError = PlaywrightTimeoutError = None
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import scrape_log
+from rate_limit import limiter
+from scheduler import StealingQueue, load_costs
+from BC_hours_and_closures_Edit_Contests import (
+    INPUT_CSV as BC_INPUT_CSV,
+    OUTPUT_CSV as BC_OUTPUT_CSV,
+    OUTPUT_FIELDS as BC_FIELDS,
+    PATH,
+    TIMEOUT,
+    _contested_field,
+    _empty_result,
+    find_change_version,
+)
+from CDEF import (
+    INPUT_CSV as GEMINI_INPUT_CSV,
+    OUTPUT_CSV as GEMINI_OUTPUT_CSV,
+    OUTPUT_FIELDS as GEMINI_FIELDS,
+    empty_result as gemini_empty_result,
+    scrape_gemini,
+)
+from page_interface import ApolloPage, SeleniumPage
+from work_manifest import iter_place_ids
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+STORAGE_STATE = "apollo_state.json"
+CONCURRENCY = 8
+
+
+# =============================================================================
+# Playwright page
+# =============================================================================
+class PlaywrightPage(ApolloPage):
+    """
+    ApolloPage over a Playwright page, called from a flow's worker thread.
+    Each operation is scheduled on `loop` (the one driving the browser) and
+    waited for; the browser context is closed by the runner.
+    """
+
+    def __init__(self, page, loop: asyncio.AbstractEventLoop):
+        self.page = page
+        self.loop = loop
+
+    def _call(self, op: Callable[[], Awaitable[Any]]) -> Any:
+        async def _run():
+            return await op()
+        try:
+            return asyncio.run_coroutine_threadsafe(_run(), self.loop).result()
+        except PlaywrightTimeoutError as e:
+            raise TimeoutException(str(e)) from e
+        except PlaywrightError as e:
+            raise WebDriverException(str(e)) from e
+
+    def goto(self, url: str) -> None:
+        limiter.acquire()
+        self._call(lambda: self.page.goto(url, wait_until="domcontentloaded", timeout=TIMEOUT * 1000))
+
+    def wait_for(self, selector: str, timeout: float = TIMEOUT) -> bool:
+        try:
+            self._call(lambda: self.page.wait_for_selector(selector, state="attached", timeout=timeout * 1000))
+            return True
+        except (TimeoutException, WebDriverException):
+            return False
+
+    def click(self, selector: str, timeout: float = TIMEOUT) -> None:
+        self._call(lambda: self.page.locator(selector).first.click(timeout=timeout * 1000))
+
+    def evaluate(self, js: str, arg: Any = None) -> Any:
+        return self._call(lambda: self.page.evaluate(js, arg))
+
+    @property
+    def current_url(self) -> str:
+        return self.page.url
+
+
+# =============================================================================
+# Runners
+# =============================================================================
+Job = Tuple[str, dict]
+Flow = Callable[[ApolloPage, str, dict], dict]
+OnResult = Callable[[int, str, Optional[dict], Optional[BaseException]], None]
+
+
+async def run_playwright(
+    jobs: Sequence[Job],
+    flow: Flow,
+    on_result: OnResult,
+    concurrency: int = CONCURRENCY,
+    storage_state: Optional[str] = STORAGE_STATE,
+    headless: bool = True,
+    costs: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    One Chromium, one fresh context per POI, `concurrency` workers.
+    Workers pull from a StealingQueue: with `costs` (scheduler.load_costs) the
+    longest POIs go first and idle workers steal short ones; without, input order.
+    A POI whose context cannot be created is reported like any other failure.
+    """
+    if async_playwright is None:
+        raise SystemExit("Playwright is not installed: pip install playwright && playwright install chromium")
+    workers = max(1, min(concurrency, len(jobs)))
+    queue = StealingQueue(list(enumerate(jobs)), costs or {}, workers, key=lambda job: job[1][0])
+    loop = asyncio.get_running_loop()
+    threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="apollo-flow")
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=headless)
+
+        async def worker(w: int):
+            while True:
+                job = queue.next(w)
+                if job is None:
+                    return
+                i, (pid, row) = job
+                context = None
+                try:
+                    context = await browser.new_context(storage_state=storage_state)
+                    page = PlaywrightPage(await context.new_page(), loop)
+                    result = await loop.run_in_executor(threads, flow, page, pid, row)
+                except Exception as e:
+                    on_result(i, pid, None, e)
+                else:
+                    on_result(i, pid, result, None)
+                finally:
+                    if context is not None:
+                        with contextlib.suppress(Exception):
+                            await context.close()
+
+        try:
+            await asyncio.gather(*(worker(w) for w in range(workers)))
+        finally:
+            threads.shutdown(wait=False)
+            await browser.close()
+
+
+def run_selenium(jobs: Sequence[Job], flow: Flow, on_result: OnResult) -> None:
+    """Same flows on the existing Safari driver (one session → sequential)."""
+    from BC_hours_and_closures_Edit_Contests import start_driver
+    page = SeleniumPage(start_driver())
+    try:
+        for i, (pid, row) in enumerate(jobs):
+            try:
+                result = flow(page, pid, row)
+            except Exception as e:
+                on_result(i, pid, None, e)
+            else:
+                on_result(i, pid, result, None)
+    finally:
+        page.driver.quit()
+
+
+class OrderedWriter:
+    """Buffer out-of-order completions; write rows to the CSV in input order."""
+
+    def __init__(self, writer: csv.DictWriter, empty_row: Callable[[str, dict], dict], jobs: Sequence[Job]):
+        self.writer = writer
+        self.empty_row = empty_row
+        self.jobs = jobs
+        self.pending: Dict[int, dict] = {}
+        self.next = 0
+
+    def __call__(self, i: int, pid: str, result: Optional[dict], error: Optional[BaseException]) -> None:
+        if error is not None:
+            scrape_log.error(f"{pid} failed", error)
+        self.pending[i] = result if result is not None else self.empty_row(*self.jobs[i])
+        while self.next in self.pending:
+            self.writer.writerow(self.pending.pop(self.next))
+            self.next += 1
+
+
+async def login(storage_state: str = STORAGE_STATE) -> None:
+    """Headed browser for Apple SSO; saves cookies for the headless contexts."""
+    if async_playwright is None:
+        raise SystemExit("Playwright is not installed: pip install playwright && playwright install chromium")
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=False)
+        context = await browser.new_context()
+        page = await context.new_page()
+        await page.goto(PATH.rsplit("/p/", 1)[0])
+        await asyncio.to_thread(input, "Finish SSO in the browser window, then press Enter… ")
+        await context.storage_state(path=storage_state)
+        await browser.close()
+    print(f"{GREEN}✔ Saved session → {storage_state}{RESET}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Async Apollo scrapers (Playwright or Selenium backend).")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    lg = sub.add_parser("login", help="Save an authenticated storage state")
+    lg.add_argument("--state", default=STORAGE_STATE)
+    r = sub.add_parser("run", help="Run a flow over a CSV of Place IDs")
+    r.add_argument("flow", choices=["bc", "gemini"])
+    r.add_argument("--backend", choices=["playwright", "selenium"], default="playwright")
+    r.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    r.add_argument("--costs", action="append", default=[],
+                   help="Previous row log (.jsonl) or costs CSV; longest POIs first (repeatable)")
+    r.add_argument("--state", default=STORAGE_STATE)
+    r.add_argument("--input", default=None)
+    r.add_argument("--output", default=None)
+    r.add_argument("--headful", action="store_true")
+    args = p.parse_args(argv)
+
+    if args.cmd == "login":
+        asyncio.run(login(args.state))
+        return
+
+    if args.flow == "bc":
+        in_csv, out_csv, fields = args.input or BC_INPUT_CSV, args.output or BC_OUTPUT_CSV, BC_FIELDS
+
+        def flow(page, pid, row):
+            return find_change_version(pid, page, contested_field=_contested_field(row))
+
+        def empty_row(pid, row):
+            return _empty_result(pid, _contested_field(row))
+    else:
+        in_csv, out_csv, fields = args.input or GEMINI_INPUT_CSV, args.output or GEMINI_OUTPUT_CSV, GEMINI_FIELDS
+
+        def flow(page, pid, row):
+            return scrape_gemini(pid, page)
+
+        def empty_row(pid, row):
+            return gemini_empty_result(pid)
+
+    jobs = list(iter_place_ids(in_csv, "Place ID"))
+    with open(out_csv, "w", newline="", encoding="utf-8") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=fields)
+        writer.writeheader()
+        on_result = OrderedWriter(writer, empty_row, jobs)
+        if args.backend == "playwright":
+            costs = load_costs(args.costs) if args.costs else None
+            asyncio.run(run_playwright(jobs, flow, on_result, args.concurrency, args.state, not args.headful, costs))
+        else:
+            run_selenium(jobs, flow, on_result)
+    print(f"{GREEN}✔ {len(jobs)} POI(s) → {out_csv}{RESET}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+rate_limit.py
+
+Purpose
+-------
+One request budget for every scraper process on this machine. Sharded runs,
+the Playwright backend and in-page fetches all hit apollo.geo.apple.com; each
+request first takes a token from a token bucket stored in SQLite, so N
+processes together stay under one global requests/second.
+
+The bucket row is updated inside `BEGIN IMMEDIATE` (SQLite's write lock), so
+refill + take is atomic across processes without a separate lock file. Each
+thread opens its own connection (sqlite3 connections are bound to the thread
+that created them), so flows running in worker threads share the bucket too.
+
+Config (environment)
+--------------------
+    APOLLO_RPS        global requests/second (default 4; 0 disables limiting)
+    APOLLO_BURST      bucket size, i.e. requests allowed back-to-back (default 8)
+    APOLLO_RATE_DB    SQLite file (default: <tmp>/apollo_rate_limit.sqlite)
+
+Usage
+-----
+    from rate_limit import limited_get, limiter
+
+    limited_get(driver, PATH + place_id)   # instead of driver.get(...)
+    limiter.acquire(len(urls))             # before a batch of in-page fetches
+"""
+
+from __future__ import annotations
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+DEFAULT_RPS = 4.0
+DEFAULT_BURST = 8
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "apollo_rate_limit.sqlite")
+BUCKET = "apollo"
+MAX_SLEEP = 1.0  # re-check the shared bucket at least this often while waiting
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+class RateLimiter:
+    """Token bucket shared through a SQLite file (one row per bucket name)."""
+
+    def __init__(self, rps: float, burst: int, db_path: str = DEFAULT_DB, name: str = BUCKET):
+        self.rps = float(rps)
+        self.burst = max(1, int(burst))
+        self.db_path = db_path
+        self.name = name
+        self.waited = 0.0  # seconds this process spent waiting for tokens
+        self._local = threading.local()  # one connection per thread
+        self._waited_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rps > 0
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None → we issue BEGIN IMMEDIATE ourselves
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _take(self, n: int) -> float:
+        """Take `n` tokens if available. Returns 0.0 on success, else seconds until they will be."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = db.execute("SELECT tokens, updated FROM bucket WHERE name = ?", (self.name,)).fetchone()
+            tokens, updated = row if row else (float(self.burst), now)
+            tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rps)
+            wait = 0.0
+            if tokens >= n:
+                tokens -= n
+            else:
+                wait = (n - tokens) / self.rps
+            db.execute("INSERT OR REPLACE INTO bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                       (self.name, tokens, now))
+            db.execute("COMMIT")
+            return wait
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def acquire(self, n: int = 1) -> float:
+        """Block until `n` requests may be sent. Returns the seconds spent waiting."""
+        if not self.enabled or n <= 0:
+            return 0.0
+        t0 = time.monotonic()
+        remaining = int(n)
+        while remaining:
+            take = min(remaining, self.burst)
+            wait = self._take(take)
+            if wait == 0.0:
+                remaining -= take
+            else:
+                time.sleep(min(wait, MAX_SLEEP))
+        spent = time.monotonic() - t0
+        with self._waited_lock:
+            self.waited += spent
+        return spent
+
+
+limiter = RateLimiter(
+    rps=_env_float("APOLLO_RPS", DEFAULT_RPS),
+    burst=int(_env_float("APOLLO_BURST", DEFAULT_BURST)),
+    db_path=os.environ.get("APOLLO_RATE_DB", "") or DEFAULT_DB,
+)
+
+
+def limited_get(driver, url: str) -> None:
+    """`driver.get(url)` after taking a token from the shared bucket."""
+    limiter.acquire()
+    driver.get(url)
@@ -0,0 +1,244 @@
+"""
+retry_queue.py
+
+Purpose
+-------
+Deferred retries for the Apollo scrapers. Instead of retrying a failing POI
+inline (sleeping and blocking the whole run), the main loop classifies the
+failure, pushes the row onto a `RetryQueue` and moves on. Once the main pass
+is done, the queue is drained on a **fresh** Safari session with a backoff
+that depends on the failure class.
+
+Rows recovered (or given up) in the deferred pass are written after the main
+pass, so the output is NOT in input order; join on place_id
+(merge_outputs.py) rather than by row position.
+
+Failure classes
+---------------
+    timeout        → WebDriverWait expired (slow page / slow POI)
+    stale          → element went stale while the Vue view re-rendered
+    sso_redirect   → we ended up on an SSO / login page instead of Apollo
+    missing_field  → an expected label/row/version was not on the page
+    driver_crash   → the WebDriver session died (needs a new session)
+    unknown        → anything else
+
+Usage
+-----
+    queue = RetryQueue()
+    for pid in place_ids:
+        try:
+            writer.writerow(scrape(driver, pid))
+        except Exception as e:
+            queue.defer(pid, e, driver)
+    driver = queue.drain(scrape, start_driver, driver, on_result=writer.writerow,
+                         on_giveup=lambda pid, e: writer.writerow(empty_row(pid)))
+"""
+
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+import scrape_log
+
+TIMEOUT = "timeout"
+STALE = "stale"
+SSO_REDIRECT = "sso_redirect"
+MISSING_FIELD = "missing_field"
+DRIVER_CRASH = "driver_crash"
+UNKNOWN = "unknown"
+
+# Base backoff (seconds) per class; multiplied by the attempt number.
+BACKOFF = {
+    TIMEOUT: 5.0,
+    STALE: 1.0,
+    SSO_REDIRECT: 30.0,
+    MISSING_FIELD: 2.0,
+    DRIVER_CRASH: 10.0,
+    UNKNOWN: 5.0,
+}
+MAX_ATTEMPTS = 3
+RESTART_ATTEMPTS = 3  # tries to open a fresh session before giving up the remaining rows
+
+# Classes that mean the current session is unusable → restart before retrying.
+RESTART_CLASSES = {SSO_REDIRECT, DRIVER_CRASH}
+
+# Substrings of current_url that indicate we were bounced to a login page.
+SSO_MARKERS = ("idmsa.apple.com", "/sso", "login", "signin", "auth")
+
+
+def _looks_like_sso(driver) -> bool:
+    if driver is None:
+        return False
+    try:
+        url = (driver.current_url or "").lower()
+    except Exception:
+        return False
+    if "apollo.geo.apple.com" in url and "login" not in url:
+        return False
+    return any(m in url for m in SSO_MARKERS)
+
+
+def classify_failure(exc: BaseException, driver=None) -> str:
+    """Map an exception (plus the page we are on) to one of the failure classes."""
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return DRIVER_CRASH
+    if isinstance(exc, StaleElementReferenceException):
+        return STALE
+    # A redirect to SSO usually surfaces as a timeout waiting for Apollo chrome.
+    if _looks_like_sso(driver):
+        return SSO_REDIRECT
+    if isinstance(exc, TimeoutException):
+        return TIMEOUT
+    if isinstance(exc, (NoSuchElementException, StopIteration, KeyError, IndexError)):
+        return MISSING_FIELD
+    if isinstance(exc, WebDriverException):
+        msg = str(exc).lower()
+        if "session" in msg or "disconnected" in msg or "not reachable" in msg:
+            return DRIVER_CRASH
+    if isinstance(exc, (ConnectionError, OSError)):
+        return DRIVER_CRASH
+    return UNKNOWN
+
+
+@dataclass
+class DeferredItem:
+    key: Any
+    failure: str
+    error: str
+    attempts: int = 1
+    history: List[str] = field(default_factory=list)
+
+
+class RetryQueue:
+    """Collect failed rows during the main pass and retry them afterwards."""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, backoff: Optional[Dict[str, float]] = None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff = dict(BACKOFF, **(backoff or {}))
+        self.items: List[DeferredItem] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def defer(self, key, exc: BaseException, driver=None) -> str:
+        """Classify `exc` and queue `key` for the deferred pass. Returns the class."""
+        failure = classify_failure(exc, driver)
+        err = f"{type(exc).__name__}: {exc}".strip()
+        self.items.append(DeferredItem(key=key, failure=failure, error=err, history=[failure]))
+        scrape_log.warn(f"↷ Deferred {key!r} ({failure}): {err.splitlines()[0] if err else ''}")
+        return failure
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for it in self.items:
+            counts[it.failure] = counts.get(it.failure, 0) + 1
+        return counts
+
+    def drain(
+        self,
+        work: Callable[[Any, Any], Any],
+        start_driver: Callable[[], Any],
+        driver=None,
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_giveup: Optional[Callable[[Any, DeferredItem], None]] = None,
+    ):
+        """
+        Retry every deferred key with `work(driver, key)`.
+
+        - Quits `driver` and starts a fresh session before the first retry.
+        - Sleeps `backoff[class] * attempt` before each retry.
+        - Restarts the session again after SSO redirects / driver crashes.
+        - Items still failing after `max_attempts` retries go to `on_giveup`.
+        - If no new session can be started (RESTART_ATTEMPTS tries), every item
+          not yet resolved goes to `on_giveup` instead of being lost.
+
+        Results arrive after the main pass, i.e. out of input order.
+        Returns the live driver so the caller can quit it (None if no session
+        could be started).
+        """
+        if not self.items:
+            return driver
+        scrape_log.warn(f"Retrying {len(self.items)} deferred row(s): {self.summary()}")
+        pending = self.items
+        self.items = []
+        try:
+            driver = self._restart(driver, start_driver)
+        except Exception as e:
+            self._give_up_all(pending, e, on_giveup)
+            return None
+
+        while pending:
+            # Cheapest classes first so quick wins land before long SSO backoffs.
+            pending.sort(key=lambda it: self.backoff.get(it.failure, 0))
+            still: List[DeferredItem] = []
+            for n, it in enumerate(pending):
+                time.sleep(self.backoff.get(it.failure, 0) * it.attempts)
+                try:
+                    res = work(driver, it.key)
+                except Exception as e:
+                    it.failure = classify_failure(e, driver)
+                    it.error = f"{type(e).__name__}: {e}"
+                    it.history.append(it.failure)
+                    it.attempts += 1
+                    if it.failure in RESTART_CLASSES:
+                        try:
+                            driver = self._restart(driver, start_driver)
+                        except Exception as restart_err:
+                            self._give_up_all(still + pending[n:], restart_err, on_giveup)
+                            return None
+                    if it.attempts > self.max_attempts:
+                        scrape_log.error(f"✗ Giving up on {it.key!r} after {self.max_attempts} retr{'y' if self.max_attempts == 1 else 'ies'} ({'/'.join(it.history)})")
+                        if on_giveup:
+                            on_giveup(it.key, it)
+                    else:
+                        still.append(it)
+                    continue
+                scrape_log.info(f"✓ Deferred retry succeeded for {it.key!r}")
+                if on_result:
+                    on_result(res)
+            pending = still
+        return driver
+
+    @staticmethod
+    def _give_up_all(items: List[DeferredItem], exc: BaseException, on_giveup) -> None:
+        scrape_log.error(f"✗ No new session; giving up on {len(items)} deferred row(s)", exc)
+        for it in items:
+            it.error = f"{type(exc).__name__}: {exc}"
+            it.history.append(DRIVER_CRASH)
+            if on_giveup:
+                on_giveup(it.key, it)
+
+    def _restart(self, driver, start_driver):
+        """
+        Quit `driver` and start a new session, backing off between failed starts.
+        The scrapers' start_driver() calls sys.exit() when Safari refuses a session;
+        that SystemExit is raised here as a RuntimeError so drain() can give the rows up.
+        """
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        for attempt in range(1, RESTART_ATTEMPTS + 1):
+            try:
+                return start_driver()
+            except SystemExit as e:
+                err = RuntimeError(f"start_driver exited (code {e.code!r})")
+                err.__cause__ = e
+            except Exception as e:
+                err = e
+            if attempt == RESTART_ATTEMPTS:
+                raise err
+            scrape_log.warn(f"Session start failed ({type(err).__name__}); retrying in "
+                            f"{self.backoff[DRIVER_CRASH] * attempt:.0f}s")
+            time.sleep(self.backoff[DRIVER_CRASH] * attempt)
@@ -0,0 +1,261 @@
+"""
+scheduler.py
+
+Purpose
+-------
+Longest-first dispatch of POIs so a sweep does not end with one worker
+grinding through a 400-version history while the others sit idle.
+
+Cost of a POI comes from, in order of preference:
+  • the previous run's per-row timings (`<output>.log.jsonl`, scrape_log.RowLog)
+  • crawl_planner.py `--costs` CSV (place_id, versions, seconds)
+  • a cheap pre-pass (`estimate` below): one page load + Versions tab per POI,
+    counting the `a[id^='entry-']` anchors (version_fingerprint.probe_versions)
+Version counts are converted to seconds with the median seconds/version of the
+POIs that have both; unknown POIs get the median cost.
+
+Dispatch
+--------
+`StealingQueue` seeds one deque per worker by LPT (each job, longest first, to
+the least-loaded worker). A worker takes from the FRONT of its own deque
+(longest remaining); an idle worker steals from the BACK (shortest) of the
+deque with the most remaining work. Tail time then approaches
+total work / workers instead of ending on one long job.
+
+For machines (`--shard i/N`), `assign` writes the same LPT split into a work
+manifest: jobs longest-first, `shard` balanced by cost, `shards` = N, and
+work_manifest.iter_place_ids follows that column instead of the hash. The
+split is over Place IDs (a POI's cost is the sum of its jobs), so every job of
+one Place ID stays on one shard, as with the hash.
+
+Usage
+-----
+    # cheap pre-pass (Versions count per POI, optional filter)
+    python scheduler.py estimate jobs.csv costs.csv --filter brand
+
+    # cost-balanced 4-way split (previous run timings + pre-pass counts)
+    python scheduler.py assign jobs.csv --shards 4 \\
+        --costs "BC_hours_&_closures_output.log.jsonl" --costs costs.csv
+
+    # in code (Playwright runner)
+    queue = StealingQueue(jobs, costs, workers=8, key=lambda job: job[0])
+    job = queue.next(worker_id)    # None → nothing left anywhere
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import json
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+DEFAULT_COST = 1.0
+
+
+# ---------- Costs ----------
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+def load_costs(paths: Iterable[str]) -> Dict[str, float]:
+    """
+    Per-POI cost in seconds from row logs (*.jsonl) and cost CSVs. Later files
+    override earlier ones; a POI with several logged rows keeps its slowest.
+    """
+    seconds: Dict[str, float] = {}
+    versions: Dict[str, float] = {}
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    pid, secs = str(rec.get("place_id") or ""), rec.get("seconds")
+                    if rec.get("event") == "row" and pid and secs is not None:
+                        seconds[pid] = max(float(secs), seconds.get(pid, 0.0))
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                pid = str(row.get("place_id") or "").strip()
+                if not pid:
+                    continue
+                if (row.get("seconds") or "").strip():
+                    seconds[pid] = float(row["seconds"])
+                if (row.get("versions") or "").strip():
+                    versions[pid] = float(row["versions"])
+
+    # Versions → seconds via the POIs measured both ways
+    ratios = [seconds[p] / versions[p] for p in seconds if versions.get(p)]
+    per_version = _median(ratios) if ratios else 1.0
+    costs = {pid: n * per_version for pid, n in versions.items()}
+    costs.update(seconds)
+    return costs
+
+
+def cost_of(costs: Dict[str, float], default: Optional[float] = None) -> Callable[[str], float]:
+    """Lookup with a fallback for unseen POIs (median known cost, else DEFAULT_COST)."""
+    fallback = default if default is not None else (_median(list(costs.values())) or DEFAULT_COST)
+    return lambda pid: costs.get(pid, fallback)
+
+
+def longest_first(items: Sequence, cost: Callable[[object], float]) -> List:
+    """Stable sort, highest cost first."""
+    return sorted(items, key=cost, reverse=True)
+
+
+def lpt_partition(items: Sequence, cost: Callable[[object], float], n: int) -> List[List]:
+    """Longest-processing-time split of `items` into `n` lists of ~equal total cost."""
+    n = max(1, int(n))
+    bins: List[List] = [[] for _ in range(n)]
+    load = [0.0] * n
+    for item in longest_first(items, cost):
+        i = min(range(n), key=lambda b: (load[b], b))
+        bins[i].append(item)
+        load[i] += cost(item)
+    return bins
+
+
+# ---------- Work-stealing queue ----------
+
+class StealingQueue:
+    """Per-worker deques seeded by LPT; idle workers steal the victim's shortest job."""
+
+    def __init__(self, jobs: Sequence, costs: Dict[str, float], workers: int,
+                 key: Callable[[object], str] = lambda job: job):
+        lookup = cost_of(costs)
+        self._cost = lambda job: lookup(key(job))
+        self._lock = threading.Lock()
+        self._queues = [deque(b) for b in lpt_partition(jobs, self._cost, workers)]
+        self._left = [sum(self._cost(j) for j in q) for q in self._queues]
+        self.steals = 0
+
+    def next(self, worker: int):
+        """Next job for `worker`, or None when every deque is empty."""
+        with self._lock:
+            own = self._queues[worker]
+            if own:
+                job = own.popleft()
+                self._left[worker] -= self._cost(job)
+                return job
+            victim = max(range(len(self._queues)), key=lambda i: self._left[i])
+            if not self._queues[victim]:
+                return None
+            job = self._queues[victim].pop()
+            self._left[victim] -= self._cost(job)
+            self.steals += 1
+            return job
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues)
+
+
+# ---------- CLI ----------
+
+def estimate(manifest_csv: str, out_csv: str, filter_key: Optional[str] = None) -> None:
+    """Pre-pass: Versions count per POI (one page load each) → costs CSV."""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from BC_hours_and_closures_Edit_Contests import PATH, TIMEOUT, choose_field, click_versions_tab, start_driver
+    from page_ready import wait_versions_settled
+    from rate_limit import limited_get
+    import scrape_log
+    from version_fingerprint import probe_versions
+    from work_manifest import iter_place_ids
+
+    driver = start_driver()
+    n = 0
+    try:
+        with open(out_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["place_id", "versions", "seconds"])
+            writer.writeheader()
+            for pid, _job in iter_place_ids(manifest_csv, manifest=manifest_csv):
+                try:
+                    limited_get(driver, PATH + pid)
+                    click_versions_tab(driver)
+                    if filter_key:
+                        unfiltered = probe_versions(driver)
+                        if choose_field(driver, filter_key):
+                            wait_versions_settled(driver, unfiltered)
+                    WebDriverWait(driver, TIMEOUT).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "a[id^='entry-']"))
+                    )
+                    fp = probe_versions(driver)
+                except Exception as e:
+                    scrape_log.warn(f"{pid}: no estimate ({type(e).__name__})")
+                    continue
+                writer.writerow({"place_id": pid, "versions": fp[2] if fp else 0, "seconds": ""})
+                f.flush()
+                n += 1
+    finally:
+        driver.quit()
+    print(f"{GREEN}✔ Version counts for {n} POI(s) → {out_csv}{RESET}")
+
+
+def assign(manifest_csv: str, shards: int, cost_paths: Sequence[str], out_csv: Optional[str] = None) -> None:
+    """Rewrite a work manifest longest-first with cost-balanced shards (one Place ID → one shard)."""
+    from work_manifest import read_jobs
+
+    jobs = read_jobs(manifest_csv)
+    costs = load_costs(cost_paths)
+    cost = cost_of(costs)
+    # Partition Place IDs, not rows: a POI's jobs (e.g. one per contested field) share a shard
+    job_count = jobs["place_id"].value_counts().to_dict()
+    place_ids = list(dict.fromkeys(jobs["place_id"]))
+
+    def place_cost(pid):
+        return cost(pid) * job_count[pid]
+
+    bins = lpt_partition(place_ids, place_cost, shards)
+    shard = {pid: s for s, b in enumerate(bins) for pid in b}
+    rank = {pid: r for r, pid in enumerate(longest_first(place_ids, place_cost))}
+    order = sorted(jobs.index, key=lambda i: rank[jobs.at[i, "place_id"]])  # stable: a POI's jobs stay in order
+    out = jobs.loc[order].assign(shard=[shard[jobs.at[i, "place_id"]] for i in order], shards=max(1, shards))
+    out.to_csv(out_csv or manifest_csv, index=False)
+
+    known = sum(1 for p in jobs["place_id"] if p in costs)
+    print(f"{GREEN}✔ {len(jobs)} job(s) → {max(1, shards)} shard(s), longest first → {out_csv or manifest_csv}{RESET}")
+    for s, b in enumerate(bins):
+        print(f"  shard {s}: {len(b)} POI(s), {sum(job_count[p] for p in b)} job(s), "
+              f"≈ {sum(place_cost(p) for p in b) / 3600.0:.1f} h")
+    if known < len(jobs):
+        print(f"{YELLOW}{len(jobs) - known} job(s) had no cost; used the median{RESET}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Cost estimates and longest-first scheduling for sweeps.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("estimate", help="Pre-pass: count versions per POI")
+    e.add_argument("manifest_csv")
+    e.add_argument("out_csv")
+    e.add_argument("--filter", default=None, help="Versions filter key (e.g. brand, hours_period)")
+    a = sub.add_parser("assign", help="Longest-first, cost-balanced shards in a work manifest")
+    a.add_argument("manifest_csv")
+    a.add_argument("--shards", type=int, required=True)
+    a.add_argument("--costs", action="append", default=[], help="Row log (.jsonl) or costs CSV (repeatable)")
+    a.add_argument("--out", default=None, help="Write here instead of rewriting the manifest")
+    args = p.parse_args(argv)
+
+    if args.cmd == "estimate":
+        estimate(args.manifest_csv, args.out_csv, args.filter)
+    else:
+        assign(args.manifest_csv, args.shards, args.costs, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+scrape_log.py
+
+Purpose
+-------
+Low-overhead logging for the Apollo scrapers:
+
+  • Levels (DEBUG < INFO < WARN < ERROR). Default INFO; set with
+    `--log-level debug` or the SCRAPE_LOG_LEVEL environment variable.
+  • `snap(driver, note)` only talks to WebDriver (current_url / readyState)
+    when DEBUG is on, so it costs nothing in normal runs.
+  • A single live status line on the terminal:
+        [ 412/4000 ] 23.1 rows/min · err 1.7% · p95 9.8s · ETA 2h35m
+  • Per-row detail goes to a JSONL file instead of the terminal.
+  • `Tracer.span(name)` times named steps (used by the crawl planner).
+
+Usage
+-----
+    from scrape_log import ProgressLine, RowLog, debug, error, snap, warn
+
+    progress = ProgressLine(total=len(jobs), row_log=RowLog("out.log.jsonl"))
+    t0 = time.perf_counter()
+    result = scrape(pid)
+    progress.done(pid, time.perf_counter() - t0, result=result)
+    ...
+    progress.finish()
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+MAGENTA = "\033[95m"
+RESET = "\033[0m"
+
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warn": WARN, "warning": WARN, "error": ERROR}
+COLORS = {DEBUG: MAGENTA, INFO: GREEN, WARN: YELLOW, ERROR: RED}
+
+REDRAW_EVERY = 0.5        # seconds between live-line redraws
+PLAIN_STATUS_EVERY = 30   # seconds between status lines when stderr is not a TTY
+LATENCY_WINDOW = 500      # recent rows used for p95
+
+
+def _level_from_env() -> int:
+    raw = os.environ.get("SCRAPE_LOG_LEVEL", "")
+    argv = sys.argv[1:]
+    for i, a in enumerate(argv):
+        if a == "--log-level" and i + 1 < len(argv):
+            raw = argv[i + 1]
+        elif a.startswith("--log-level="):
+            raw = a.split("=", 1)[1]
+    return LEVELS.get(raw.strip().lower(), INFO)
+
+
+LEVEL = _level_from_env()
+_active: Optional["ProgressLine"] = None  # live line to clear/redraw around messages
+_row_log: Optional["RowLog"] = None       # log records are mirrored here when set
+
+
+def set_level(name: str) -> None:
+    global LEVEL
+    LEVEL = LEVELS.get(name.strip().lower(), LEVEL)
+
+
+def enabled(level: int) -> bool:
+    return level >= LEVEL
+
+
+def log(level: int, msg: str, **fields) -> None:
+    if level < LEVEL:
+        return
+    ts = datetime.now().strftime("%H:%M:%S")
+    if _active is not None:
+        _active.clear()
+    print(f"{COLORS.get(level, '')}[{ts}] {msg}{RESET}", flush=True)
+    if _row_log is not None:
+        _row_log.write({"event": "log", "level": level, "msg": msg, **fields})
+    if _active is not None:
+        _active.redraw(force=True)
+
+
+def debug(msg: str, **fields) -> None:
+    if DEBUG >= LEVEL:
+        log(DEBUG, msg, **fields)
+
+
+def info(msg: str, **fields) -> None:
+    log(INFO, msg, **fields)
+
+
+def warn(msg: str, **fields) -> None:
+    log(WARN, msg, **fields)
+
+
+def error(msg: str, e: Optional[BaseException] = None, **fields) -> None:
+    if e is not None:
+        msg = f"{msg} | {type(e).__name__}: {e}"
+    log(ERROR, msg, **fields)
+
+
+def snap(driver, note: str = "") -> None:
+    """Context snapshot (URL + readyState). No WebDriver calls unless DEBUG is on."""
+    if DEBUG < LEVEL:
+        return
+    try:
+        url = driver.current_url
+    except Exception:
+        url = "<no current_url>"
+    try:
+        rs = driver.execute_script("return document.readyState")
+    except Exception:
+        rs = "<no readyState>"
+    debug(f"SNAP {note} → url={url} readyState={rs}")
+
+
+# ---------- Per-row JSONL ----------
+
+class RowLog:
+    """Append-only JSONL file for per-row detail (one object per line, flushed)."""
+
+    def __init__(self, path: str):
+        global _row_log
+        self.path = path
+        self._f = open(path, "a", encoding="utf-8")
+        _row_log = self
+
+    def write(self, record: dict) -> None:
+        record.setdefault("ts", datetime.now().isoformat())
+        self._f.write(json.dumps(record, default=str) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        global _row_log
+        self._f.close()
+        if _row_log is self:
+            _row_log = None
+
+
+def row_log_path(output_csv: str) -> str:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}.log.jsonl"
+
+
+# ---------- Live status line ----------
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h{m:02d}m"
+    if m:
+        return f"{m}m{s:02d}s"
+    return f"{s}s"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class ProgressLine:
+    """
+    Single-line live status: rows done, rows/min, error rate, p95 row latency, ETA.
+
+    `done()` / `failed()` record a row (and write it to the JSONL row log);
+    the line is redrawn at most every REDRAW_EVERY seconds.
+    """
+
+    def __init__(self, total: Optional[int] = None, row_log: Optional[RowLog] = None, stream=None):
+        global _active
+        self.total = total
+        self.row_log = row_log
+        self.stream = stream or sys.stderr
+        self.tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.started = time.monotonic()
+        self.rows = 0
+        self.attempts = 0
+        self.errors = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._last_draw = 0.0
+        self._drawn = False
+        _active = self
+
+    # -- recording
+    def done(self, place_id, seconds: Optional[float] = None, **detail) -> None:
+        self.rows += 1
+        self.attempts += 1
+        if seconds is not None:
+            self.latencies.append(seconds)
+        if self.row_log:
+            self.row_log.write({"event": "row", "place_id": place_id, "ok": True, "seconds": seconds, **detail})
+        self.redraw()
+
+    def failed(self, place_id, seconds: Optional[float] = None, error: str = "", final: bool = False, **detail) -> None:
+        """A failed attempt; `final` rows (given up) also count as done."""
+        self.attempts += 1
+        self.errors += 1
+        if final:
+            self.rows += 1
+        if seconds is not None:
+            self.latencies.append(seconds)
+        if self.row_log:
+            self.row_log.write({"event": "row", "place_id": place_id, "ok": False, "final": final,
+                                "seconds": seconds, "error": error, **detail})
+        self.redraw()
+
+    # -- rendering
+    def status(self) -> str:
+        elapsed = max(1e-6, time.monotonic() - self.started)
+        per_min = self.rows / elapsed * 60.0
+        err = (self.errors / self.attempts * 100.0) if self.attempts else 0.0
+        p95 = percentile(self.latencies, 95)
+        count = f"{self.rows}/{self.total}" if self.total else f"{self.rows}"
+        eta = "--"
+        if self.total and per_min > 0:
+            eta = _fmt_duration((self.total - self.rows) / per_min * 60.0)
+        return f"[ {count} ] {per_min:.1f} rows/min · err {err:.1f}% · p95 {p95:.1f}s · ETA {eta}"
+
+    def redraw(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self.tty:
+            if not force and now - self._last_draw < REDRAW_EVERY:
+                return
+            self.stream.write("\r\033[K" + self.status())
+            self.stream.flush()
+            self._drawn = True
+        else:
+            # Redirected output: an occasional plain status line instead of \r redraws
+            if force or now - self._last_draw < PLAIN_STATUS_EVERY:
+                return
+            self.stream.write(self.status() + "\n")
+            self.stream.flush()
+        self._last_draw = now
+
+    def clear(self) -> None:
+        if self.tty and self._drawn:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+
+    def finish(self) -> None:
+        global _active
+        self.clear()
+        elapsed = time.monotonic() - self.started
+        self.stream.write(f"{GREEN}{self.status()} · elapsed {_fmt_duration(elapsed)}{RESET}\n")
+        self.stream.flush()
+        if _active is self:
+            _active = None
+        if self.row_log:
+            self.row_log.close()
+
+
+# ---------- Step timing ----------
+
+class Tracer:
+    """Collect wall-clock durations for named steps (`with tracer.span("versions"): ...`)."""
+
+    def __init__(self):
+        self.samples: Dict[str, list] = defaultdict(list)
+
+    @contextmanager
+    def span(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - t0)
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, vals in self.samples.items():
+            out[name] = {
+                "count": len(vals),
+                "total": sum(vals),
+                "mean": sum(vals) / len(vals) if vals else 0.0,
+                "p50": percentile(vals, 50),
+                "p95": percentile(vals, 95),
+            }
+        return out
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+
+tracer = Tracer()
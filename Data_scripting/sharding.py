@@ -0,0 +1,275 @@
+"""
+sharding.py
+
+Purpose
+-------
+Split one big scraper sweep across several machines and stitch it back
+together deterministically.
+
+Each machine runs the same scraper with `--shard i/N`. Place IDs are assigned
+by a stable hash of the normalized ID (`work_manifest.shard_of`), so every
+machine agrees on the split without coordination. Each shard writes its own
+output and a JSONL journal:
+
+    BC_hours_&_closures_output.shard-0-of-4.csv
+    BC_hours_&_closures_output.shard-0-of-4.journal.jsonl
+
+Re-running a shard resumes from its journal: jobs journaled "ok" are skipped,
+jobs that were given up ("failed") are scraped again. A job is identified by
+its key fields (place_id, plus e.g. contested_field for the BC scraper), so
+several jobs of one Place ID are all kept. If the journal exists but the
+output CSV does not, both start over.
+
+The `merge` command combines the shard outputs into the canonical OUTPUT_CSV,
+one row per job ordered by first appearance of its Place ID in the source
+sheet, and reports missing, duplicate, unexpected and failed IDs. Within one
+shard file a later row for a job replaces an earlier one (the retry of a row
+given up before the resume).
+
+Usage
+-----
+    # on machine k of 4
+    python BC_hours_and_closures_Edit_Contests.py --shard k/4
+
+    # afterwards, on any machine with all shard files
+    python sharding.py merge "BC_hours_&_closures_output.csv" \\
+        --source BC_Hours_and_Closures_Edit_Contests.csv --id-col "Place ID" --shards 4 \\
+        --key-col contested_field
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+from work_manifest import clean_place_id, normalize_place_ids
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def shard_path(output_csv: str, shard: Optional[Tuple[int, int]]) -> str:
+    """`out.csv` → `out.shard-i-of-N.csv` (unchanged when not sharding)."""
+    if not shard:
+        return output_csv
+    root, ext = os.path.splitext(output_csv)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{ext or '.csv'}"
+
+
+def journal_path(output_path: str) -> str:
+    root, _ = os.path.splitext(output_path)
+    return f"{root}.journal.jsonl"
+
+
+def read_journal(path: str) -> List[dict]:
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn last line after a crash
+    return entries
+
+
+class ShardOutput:
+    """
+    CSV writer + JSONL journal for one shard of a scraper run.
+
+    Drop-in for the scrapers' `csv.DictWriter`: `writerow(row)` writes and
+    flushes the row, then journals `{place_id, key, status, ts}`. With a shard,
+    an existing journal resumes the run: `done` holds the job keys written
+    "ok" (see `key_of`). Without a shard it behaves like the old plain output file.
+    """
+
+    def __init__(self, output_csv: str, fieldnames: Sequence[str], shard=None, id_field: str = "place_id",
+                 key_fields: Sequence[str] = ()):
+        self.path = shard_path(output_csv, shard)
+        self.id_field = id_field
+        self.key_fields = [id_field, *key_fields]
+        self.journal = journal_path(self.path) if shard else None
+        self.done: Set = set()
+        if self.journal and os.path.exists(self.path):
+            for e in read_journal(self.journal):
+                key = self._journal_key(e)
+                if e.get("status", "ok") == "ok":
+                    self.done.add(key)
+        resume = bool(self.done)
+        self._f = open(self.path, "a" if resume else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=list(fieldnames))
+        if not resume:
+            self._writer.writeheader()
+        else:
+            print(f"{YELLOW}Resuming {self.path}: {len(self.done)} job(s) already journaled{RESET}")
+        # A fresh output file gets a fresh journal, so old entries cannot skip unwritten jobs
+        self._jf = open(self.journal, "a" if resume else "w", encoding="utf-8") if self.journal else None
+
+    def key_of(self, row: dict):
+        """Job key of an output row: the Place ID, or a tuple with the key fields too."""
+        values = tuple(str(row.get(f, "") or "").strip() for f in self.key_fields)
+        return values[0] if len(values) == 1 else values
+
+    def _journal_key(self, entry: dict):
+        values = entry.get("key") or [entry.get("place_id", "")]
+        values = tuple(values) + ("",) * (len(self.key_fields) - len(values))
+        return values[0] if len(self.key_fields) == 1 else values[:len(self.key_fields)]
+
+    def writerow(self, row: dict, status: str = "ok") -> None:
+        self._writer.writerow(row)
+        self._f.flush()
+        if self._jf:
+            key = self.key_of(row)
+            entry = {"place_id": str(row.get(self.id_field, "")), "status": status, "ts": datetime.now().isoformat()}
+            if len(self.key_fields) > 1:
+                entry["key"] = list(key)
+            self._jf.write(json.dumps(entry) + "\n")
+            self._jf.flush()
+            if status == "ok":
+                self.done.add(key)
+
+    def close(self) -> None:
+        self._f.close()
+        if self._jf:
+            self._jf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ---------- Merge ----------
+
+def find_shard_files(output_csv: str, shards: Optional[int] = None) -> List[str]:
+    root, ext = os.path.splitext(output_csv)
+    ext = ext or ".csv"
+    pat = re.compile(re.escape(root) + r"\.shard-(\d+)-of-(\d+)" + re.escape(ext) + "$")
+    found = []
+    for path in glob.glob(glob.escape(root) + ".shard-*-of-*" + ext):
+        m = pat.match(path)
+        if m and (shards is None or int(m.group(2)) == shards):
+            found.append((int(m.group(2)), int(m.group(1)), path))
+    return [p for _, _, p in sorted(found)]
+
+
+def merge_shards(
+    output_csv: str,
+    source_csv: str,
+    id_column: str = "Place ID",
+    out_id_column: str = "place_id",
+    shards: Optional[int] = None,
+    key_columns: Sequence[str] = (),
+) -> Dict[str, list]:
+    """Write the canonical OUTPUT_CSV (one row per job: Place ID + key columns) and return a report dict."""
+    paths = find_shard_files(output_csv, shards)
+    if not paths:
+        raise FileNotFoundError(f"No shard outputs found for {output_csv}")
+
+    src = pd.read_csv(source_csv, dtype=str, keep_default_na=False)
+    src.columns = [str(c).lstrip("\ufeff").strip() for c in src.columns]
+    if id_column not in src.columns:
+        raise ValueError(f"Column '{id_column}' not found in {source_csv}")
+    order = [p for p in pd.unique(normalize_place_ids(src[id_column])) if p]
+    rank = {pid: i for i, pid in enumerate(order)}
+
+    fieldnames: List[str] = []
+    rows: Dict[tuple, dict] = {}   # job key (pid, *key values) → row, in first-seen order
+    dupes: Dict[tuple, List[str]] = {}
+    failed: Set[tuple] = set()
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for fn in reader.fieldnames or []:
+                if fn not in fieldnames:
+                    fieldnames.append(fn)
+            for row in reader:
+                key = (clean_place_id(row.get(out_id_column, "")),
+                       *(str(row.get(c, "") or "").strip() for c in key_columns))
+                prev = rows.get(key)
+                if prev is not None and prev["__shard__"] != path:
+                    dupes.setdefault(key, [prev["__shard__"]]).append(path)
+                    continue
+                row["__shard__"] = path
+                rows[key] = row  # same file: a resumed retry supersedes the earlier row
+        for e in read_journal(journal_path(path)):
+            values = e.get("key") or [e.get("place_id", "")]
+            key = (clean_place_id(values[0]), *(list(values[1:]) + [""] * len(key_columns))[:len(key_columns)])
+            if e.get("status") not in (None, "ok"):
+                failed.add(key)
+            else:
+                failed.discard(key)
+
+    written_pids = {key[0] for key in rows}
+    missing = [pid for pid in order if pid not in written_pids]
+    unexpected = sorted(pid for pid in written_pids if pid not in rank)
+    first_seen = {key: i for i, key in enumerate(rows)}
+    ordered = sorted(rows, key=lambda key: (rank.get(key[0], len(rank)), key[0], first_seen[key]))
+
+    with open(output_csv, "w", newline="", encoding="utf-8") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        for key in ordered:
+            writer.writerow(rows[key])
+
+    return {
+        "shard_files": paths,
+        "written": [_fmt_key(k) for k in ordered],
+        "missing": missing,
+        "duplicates": sorted(_fmt_key(k) for k in dupes),
+        "unexpected": unexpected,
+        "failed": sorted(_fmt_key(k) for k in failed if k[0]),
+    }
+
+
+def _fmt_key(key: tuple) -> str:
+    return "/".join(v for v in key if v) or key[0]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Merge per-shard scraper outputs.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("merge", help="Combine shard outputs into the canonical OUTPUT_CSV")
+    m.add_argument("output_csv", help="Canonical output path (shards are <root>.shard-i-of-N<ext>)")
+    m.add_argument("--source", required=True, help="Source CSV that defines the canonical order")
+    m.add_argument("--id-col", default="Place ID", help="Place ID column in the source CSV")
+    m.add_argument("--out-id-col", default="place_id", help="Place ID column in the shard outputs")
+    m.add_argument("--shards", type=int, default=None, help="Only merge shards of an N-way split")
+    m.add_argument("--key-col", action="append", default=[],
+                   help="Output column that, with the Place ID, identifies a job (e.g. contested_field)")
+    m.add_argument("--report", default=None, help="Optional JSON report path")
+    args = p.parse_args(argv)
+
+    report = merge_shards(args.output_csv, args.source, args.id_col, args.out_id_col, args.shards,
+                          args.key_col)
+    print(f"{GREEN}✔ Merged {len(report['shard_files'])} shard file(s), {len(report['written'])} job(s) → {args.output_csv}{RESET}")
+    for key, color in (("missing", RED), ("duplicates", YELLOW), ("unexpected", YELLOW), ("failed", RED)):
+        ids = report[key]
+        if ids:
+            preview = ", ".join(ids[:10]) + (" …" if len(ids) > 10 else "")
+            print(f"{color}{key}: {len(ids)} → {preview}{RESET}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in report.items() if k != "written"}, f, indent=2)
+    if report["missing"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
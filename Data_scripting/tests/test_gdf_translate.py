@@ -0,0 +1,106 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # scripts import each other as siblings
+
+from GDF_translate import (
+    Atom,
+    IntersectNode,
+    SubtractNode,
+    UnionNode,
+    _merge_ranges,
+    bits_to_sched,
+    evaluate_weekly,
+    evaluate_weekly_bits,
+    parse_expression,
+)
+from gdf_parse_bench import legacy_parse_expression, nested_expression
+
+SEED = 0
+CASES = 2000
+
+
+def _random_atom(rng):
+    quals = [f"t{rng.randint(1, 7)}" for _ in range(rng.choice((0, 1, 1, 2)))]
+    if rng.random() < 0.9:
+        quals.append(f"h{rng.randint(0, 23)}")
+    if rng.random() < 0.4:
+        quals.append(f"m{rng.randint(0, 59)}")
+    durs = []
+    if rng.random() < 0.5:
+        durs.append(f"d{rng.randint(1, 7)}")
+    if rng.random() < 0.9:
+        durs.append(f"h{rng.randint(0, 30)}")  # past midnight is clipped
+    if rng.random() < 0.4:
+        durs.append(f"m{rng.randint(0, 59)}")
+    return Atom(quals, durs)
+
+
+def _random_node(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        return _random_atom(rng)
+    op = rng.choice("+*-")
+    if op == "+":
+        return UnionNode([_random_node(rng, depth - 1) for _ in range(rng.randint(2, 4))])
+    cls = IntersectNode if op == "*" else SubtractNode
+    return cls(_random_node(rng, depth - 1), _random_node(rng, depth - 1))
+
+
+def _normalized(sched):
+    """Range engine output without empty days or zero-length / adjacent pieces."""
+    out = {}
+    for t, ranges in sched.items():
+        merged = _merge_ranges([(s, e) for s, e in ranges if e > s])
+        if merged:
+            out[t] = merged
+    return out
+
+
+def test_bitmap_engine_matches_range_engine():
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        node = _random_node(rng, rng.randint(0, 5))
+        assert dict(bits_to_sched(evaluate_weekly_bits(node))) == _normalized(evaluate_weekly(node)), node
+
+
+def test_bitmap_engine_matches_range_engine_on_parsed_expressions():
+    rng = random.Random(SEED)
+    for _ in range(CASES // 10):
+        node, _ = parse_expression(nested_expression(rng.randint(0, 20), rng))
+        assert dict(bits_to_sched(evaluate_weekly_bits(node))) == _normalized(evaluate_weekly(node))
+
+
+def _parse_outcome(parse, s):
+    try:
+        return parse(s)
+    except (ValueError, IndexError):  # the legacy parser can index past the end; both mean "unparseable"
+        return "error"
+
+
+def _mutate(s, rng):
+    chars = list(s)
+    for _ in range(rng.randint(1, 3)):
+        pos = rng.randrange(len(chars) + 1)
+        action = rng.random()
+        if action < 0.4 and chars:
+            del chars[min(pos, len(chars) - 1)]
+        elif action < 0.8:
+            chars.insert(pos, rng.choice("[](){}+-* t2h9d5m3x"))
+        else:
+            chars.insert(pos, " ")
+    return "".join(chars)
+
+
+def test_offset_parser_matches_legacy_parser():
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        expr = nested_expression(rng.randint(0, 8), rng)
+        assert parse_expression(expr) == legacy_parse_expression(expr), expr
+
+
+def test_offset_parser_matches_legacy_parser_on_fuzzed_input():
+    rng = random.Random(SEED)
+    for _ in range(CASES):
+        expr = _mutate(nested_expression(rng.randint(0, 4), rng), rng)
+        assert _parse_outcome(parse_expression, expr) == _parse_outcome(legacy_parse_expression, expr), expr
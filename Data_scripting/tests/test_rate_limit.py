@@ -0,0 +1,40 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # scripts import each other as siblings
+
+from rate_limit import RateLimiter
+
+
+def _acquire_from_threads(limiter, threads, per_thread):
+    errors = []
+
+    def work():
+        try:
+            for _ in range(per_thread):
+                limiter.acquire()
+        except Exception as e:  # sqlite3.ProgrammingError with a shared connection
+            errors.append(e)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return errors
+
+
+def test_acquire_from_several_threads(tmp_path):
+    limiter = RateLimiter(rps=1000, burst=50, db_path=str(tmp_path / "rate.sqlite"))
+    limiter.acquire()  # main thread opens its connection first
+    assert _acquire_from_threads(limiter, threads=8, per_thread=5) == []
+
+
+def test_threads_share_one_bucket(tmp_path):
+    limiter = RateLimiter(rps=50, burst=1, db_path=str(tmp_path / "rate.sqlite"))
+    t0 = time.monotonic()
+    assert _acquire_from_threads(limiter, threads=4, per_thread=3) == []
+    # 12 requests from one full token at 50/s: the other 11 wait for refills
+    assert time.monotonic() - t0 >= 11 / 50 * 0.9
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # scripts import each other as siblings
+
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+
+from retry_queue import BACKOFF, DRIVER_CRASH, RetryQueue
+
+NO_BACKOFF = {k: 0.0 for k in BACKOFF}
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+def _exiting_start_driver():
+    sys.exit()  # what the scrapers' start_driver() does when Safari refuses a session
+
+
+def test_restart_fails_gives_up_every_row():
+    queue = RetryQueue(backoff=NO_BACKOFF)
+    queue.defer("1", TimeoutException("slow"))
+    queue.defer("2", TimeoutException("slow"))
+    gave_up, results = [], []
+
+    driver = queue.drain(lambda d, key: {"place_id": key}, _exiting_start_driver, FakeDriver(),
+                         on_result=results.append, on_giveup=lambda key, item: gave_up.append(key))
+
+    assert driver is None
+    assert results == []
+    assert gave_up == ["1", "2"]
+
+
+def test_restart_fails_mid_drain_gives_up_the_rest():
+    queue = RetryQueue(backoff=NO_BACKOFF)
+    for key in ("ok", "crash", "later"):
+        queue.defer(key, TimeoutException("slow"))
+    starts = []
+
+    def start_driver():
+        starts.append(1)
+        if len(starts) > 1:
+            sys.exit()
+        return FakeDriver()
+
+    def work(driver, key):
+        if key == "crash":
+            raise InvalidSessionIdException("session gone")
+        return {"place_id": key}
+
+    gave_up, results = [], []
+    driver = queue.drain(work, start_driver, FakeDriver(),
+                         on_result=results.append, on_giveup=lambda key, item: gave_up.append((key, item)))
+
+    assert driver is None
+    assert results == [{"place_id": "ok"}]
+    assert sorted(key for key, _ in gave_up) == ["crash", "later"]
+    assert all(item.history[-1] == DRIVER_CRASH for _, item in gave_up)
+
+
+def test_gives_up_after_max_attempts():
+    queue = RetryQueue(max_attempts=2, backoff=NO_BACKOFF)
+    queue.defer("1", TimeoutException("slow"))
+    calls, gave_up = [], []
+
+    def work(driver, key):
+        calls.append(key)
+        raise TimeoutException("still slow")
+
+    driver = queue.drain(work, FakeDriver, FakeDriver(), on_giveup=lambda key, item: gave_up.append((key, item)))
+
+    assert isinstance(driver, FakeDriver)
+    assert calls == ["1", "1"]
+    assert [key for key, _ in gave_up] == ["1"]
+    assert gave_up[0][1].attempts == 3
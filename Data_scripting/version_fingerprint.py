@@ -0,0 +1,107 @@
+"""
+version_fingerprint.py
+
+Purpose
+-------
+Skip the full version walk for POIs whose version history has not changed
+since the last run.
+
+After the Versions tab (and field filter) is open, `probe_versions` reads the
+`a[id^='entry-']` anchors in ONE script call and returns a fingerprint:
+(first entry id, last entry id, entry count). If it matches the fingerprint
+stored by the previous run, the stored result is reused; otherwise the caller
+does the full walk and stores the new result.
+
+Storage
+-------
+A JSON file keyed by "<place_id>|<filter_key>|<threshold>":
+    {"fp": [first_id, last_id, count], "result": {...}, "ts": "..."}
+
+Usage
+-----
+    store = FingerprintStore("vheader_fingerprints.json")
+    fp = probe_versions(driver)
+    cached = store.get(key, fp)
+    if cached is None:
+        result = full_walk(...)
+        store.put(key, fp, result)
+    store.save()
+"""
+
+from __future__ import annotations
+import json
+import os
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+GREEN = "\033[92m"
+RESET = "\033[0m"
+
+# First/last anchor ids + count, without touching each element from Python.
+PROBE_JS = """
+const a = document.querySelectorAll("a[id^='entry-']");
+return a.length ? [a[0].id, a[a.length - 1].id, a.length] : null;
+"""
+
+SAVE_EVERY = 25  # puts between checkpoint writes
+
+
+def probe_versions(driver) -> Optional[Tuple[str, str, int]]:
+    """Return (first_entry_id, last_entry_id, count) for the visible Versions list, or None."""
+    try:
+        res = driver.execute_script(PROBE_JS)
+    except Exception:
+        return None
+    if not res:
+        return None
+    return str(res[0]), str(res[1]), int(res[2])
+
+
+def fingerprint_key(place_id: str, filter_key: Optional[str] = None, threshold: Optional[datetime] = None) -> str:
+    return "|".join([str(place_id or ""), filter_key or "", threshold.isoformat() if threshold else ""])
+
+
+class FingerprintStore:
+    """Persistent {key: {fp, result}} map shared between weekly reruns."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = 0
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError):
+                self.data = {}
+
+    def get(self, key: str, fp) -> Optional[Any]:
+        """Cached result when `fp` matches the stored fingerprint, else None."""
+        entry = self.data.get(key)
+        if fp is not None and entry and tuple(entry.get("fp") or ()) == tuple(fp):
+            self.hits += 1
+            return entry.get("result")
+        self.misses += 1
+        return None
+
+    def put(self, key: str, fp, result: Any) -> None:
+        if fp is None:
+            return
+        self.data[key] = {"fp": list(fp), "result": result, "ts": datetime.now().isoformat()}
+        self._dirty += 1
+        if self._dirty >= SAVE_EVERY:
+            self.save()
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+    def report(self) -> str:
+        return f"{GREEN}[incremental] {self.hits} unchanged (cached), {self.misses} walked{RESET}"
@@ -4,7 +4,8 @@
 
 LOGIC:
 - Read config and scrape by place ids:
-- search place id
+- open the POI details page directly (PATH_DETAILS + place id);
+  fall back to search place id → click result → switch to popup if that fails
 - enter poi
 -
     - Locate date before edit was made to hours or category
@@ -12,6 +13,12 @@ LOGIC:
         - For date prior to the edit
             - locate hover text for modern_category (eg. internal- ModernCategoryConflator | direct- uuid#)
 
+
+USAGE:
+    python versioning_checks.py            # direct details URL (popup search only as fallback)
+    python versioning_checks.py --popup    # old flow: search page → popup window per POI
+    python versioning_checks.py --bench 10 # time popup vs direct open for the first 10 Place IDs
+                                           # (warm-up per POI, alternating order)
 """
 
 import csv
@@ -27,6 +34,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from page_ready import wait_versions_settled
+from rate_limit import limited_get
+from version_fingerprint import probe_versions
+
 
 RED = "\033[91m"  # errors
 GREEN = "\033[92m"  # notes
@@ -36,9 +47,12 @@ RESET = "\033[0m"
 
 
 PATH = "https://apollo.geo.apple.com/?query="
+PATH_DETAILS = "https://apollo.geo.apple.com/p/release/"
 INPUT_CSV = "tickets/input.csv"
 OUTPUT_CSV = "tickets/output.csv"
 TIMEOUT = 30
+DIRECT = "--popup" not in sys.argv
+VERSIONS_TAB_XPATH = "//a[contains(@class,'nav-link') and normalize-space()='Versions']"
 
 
 def start_driver():
@@ -142,7 +156,7 @@ def extract_hours(driver):
 
 def open_and_switch(place_id, driver):
     """Search + click first result → switch to new window."""
-    driver.get(PATH + place_id)
+    limited_get(driver, PATH + place_id)
     main = driver.current_window_handle
 
     WebDriverWait(driver, TIMEOUT).until(
@@ -155,14 +169,34 @@ def open_and_switch(place_id, driver):
     return main, new_win
 
 
+def open_details(place_id, driver, direct=True):
+    """
+    Open the POI details view → (main_handle, popup_handle).
+    Direct mode loads PATH_DETAILS + place_id in the current window (popup_handle is None);
+    if the details shell does not appear, or direct=False, use the search → popup flow.
+    """
+    if direct:
+        try:
+            limited_get(driver, PATH_DETAILS + place_id)
+            WebDriverWait(driver, TIMEOUT).until(
+                EC.presence_of_element_located((By.XPATH, VERSIONS_TAB_XPATH))
+            )
+            return driver.current_window_handle, None
+        except TimeoutException:
+            print(f"{YELLOW}Details URL did not load for {place_id}; falling back to search popup{RESET}")
+    return open_and_switch(place_id, driver)
+
+
+def close_details(driver, main, popup):
+    """Close the popup window (if the search flow opened one) and return to main."""
+    if popup is not None:
+        driver.close()
+        driver.switch_to.window(main)
+
+
 def click_versions_tab(driver):
     WebDriverWait(driver, TIMEOUT).until(
-        EC.element_to_be_clickable(
-            (
-                By.XPATH,
-                "//a[contains(@class,'nav-link') and normalize-space()='Versions']",
-            )
-        )
+        EC.element_to_be_clickable((By.XPATH, VERSIONS_TAB_XPATH))
     ).click()
 
 
@@ -190,103 +224,248 @@ def click_version(driver, entry_id):
     wait.until(EC.presence_of_element_located((By.XPATH, "//div[@title='Hours']")))
 
 
-def find_change_version(place_id, driver, threshold=datetime(2025, 6, 20)):
-    wait = WebDriverWait(driver, TIMEOUT)
-    print(f"🔄 Processing place_id={place_id}")
-    main, popup = open_and_switch(place_id, driver)
+# ---------- Candidate pruning ----------
+# Versions filter keys for the tracked fields, and header words that hint at them.
+TRACKED_FILTERS = ("category", "hours_period")
+TRACKED_HINTS = ("category", "hours")
+
+# One round-trip: [entry_id, date text, header cell texts] for every visible version row.
+VERSIONS_SNAPSHOT_JS = """
+return Array.from(document.querySelectorAll("a[id^='entry-']"), (a) => {
+  const span = a.querySelector("span");
+  const row = a.closest("tr");
+  const header = row ? Array.from(row.querySelectorAll("td.collapsed-column"))
+      .filter((td) => !td.querySelector("input"))
+      .map((td) => (td.innerText || "").trim())
+      .filter(Boolean) : [];
+  return [a.id, span ? (span.innerText || "").trim() : "", header];
+});
+"""
+
+
+def snapshot_versions(driver):
+    """Return [(datetime, entry_id, header_texts)] sorted ascending, in one script call."""
     try:
-        click_versions_tab(driver)
-        versions = collect_versions(driver)
+        WebDriverWait(driver, TIMEOUT).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[id^='entry-']"))
+        )
+    except TimeoutException:
+        return []
+    out = []
+    for eid, txt, header in driver.execute_script(VERSIONS_SNAPSHOT_JS) or []:
+        try:
+            dt = datetime.strptime(txt.rsplit(" ", 1)[0], "%Y-%m-%d %I:%M %p")
+        except ValueError:
+            continue
+        out.append((dt, eid, header))
+    return sorted(out, key=lambda x: x[0])
 
-        base_idx, (base_dt, base_id) = next(
-            (i, pair) for i, pair in enumerate(versions) if pair[0] >= threshold
+
+def _filtered_ids(driver, before):
+    """
+    Entry ids under the filter just chosen, once the list has re-rendered (page_ready
+    barrier against `before`, the list probed right before the click). None when the
+    filtered list is empty, so the caller does not prune on a list still being rebuilt.
+    """
+    wait_versions_settled(driver, before)
+    ids = {eid for eid, _, _ in (driver.execute_script(VERSIONS_SNAPSHOT_JS) or [])}
+    return ids or None
+
+
+def select_filter(driver, filter_key):
+    """Pick a Versions field filter through the Choices.js control ('none' clears it). Non-fatal."""
+    try:
+        WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, ".choices__inner, .choices"))
+        ).click()
+        WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable(
+                (By.XPATH, f"//div[contains(@class,'choices__item') and @data-value='{filter_key}']")
+            )
+        ).click()
+        return True
+    except Exception:
+        print(f"{YELLOW}[filter] Could not select {filter_key!r}{RESET}")
+        return False
+
+
+def candidate_versions(driver, versions):
+    """
+    Entry ids of versions that may have touched Modern Category or Hours.
+      1) union of the ids listed under the 'category' and 'hours_period' filters
+         (a filter that lists nothing → every version)
+      2) else versions whose header cells mention a tracked field
+      3) else every version (no pruning)
+    Leaves the Versions list unfiltered.
+    """
+    ids = set()
+    filtered = True
+    empty = False
+    for key in TRACKED_FILTERS:
+        before = probe_versions(driver)
+        if not select_filter(driver, key):
+            filtered = False
+            break
+        shown = _filtered_ids(driver, before)
+        if shown is None:
+            filtered, empty = False, True
+            break
+        ids.update(shown)
+    if not select_filter(driver, "none"):
+        # could not clear the filter → reload so every entry is clickable again
+        driver.refresh()
+        click_versions_tab(driver)
+        snapshot_versions(driver)
+    if empty:
+        # an empty filtered list may be mid re-render: don't prune on it
+        return {eid for _, eid, _ in versions}, "all"
+    if filtered and ids:
+        return ids, "filter"
+
+    hinted = {
+        eid for _, eid, header in versions
+        if any(h in " ".join(header).lower() for h in TRACKED_HINTS)
+    }
+    if hinted:
+        return hinted, "header"
+    return {eid for _, eid, _ in versions}, "all"
+
+
+def read_tracked_badges(driver):
+    """(modern badge, modern hover, hours badge, hours hover) for the selected version."""
+    mod_panel = driver.find_element(
+        By.XPATH, "//div[@title='Modern Category']/following-sibling::div[1]"
+    )
+    mod_el = mod_panel.find_element(By.CSS_SELECTOR, ".audit-badge")
+    mod_badge = mod_el.text.strip()
+    mod_hover = (mod_el.get_attribute("title") or "").strip()
+    try:
+        audit_row = driver.find_element(
+            By.XPATH,
+            "//div[contains(@class,'audit-row')][.//div[@data-test-id='hours']]",
         )
-        click_version(driver, base_id)
+        hours_el = audit_row.find_element(By.CSS_SELECTOR, ".audit-badge")
+        hours_badge = hours_el.text.strip()
+        hours_hover = (hours_el.get_attribute("title") or "").strip()
+    except NoSuchElementException:
+        hours_badge = ""
+        hours_hover = ""
+    return mod_badge, mod_hover, hours_badge, hours_hover
 
-        prev_dt = base_dt
 
-        mod_panel = driver.find_element(
-            By.XPATH, "//div[@title='Modern Category']/following-sibling::div[1]"
+def find_change_version(place_id, driver, threshold=datetime(2025, 6, 20), direct=DIRECT):
+    """
+    Walk versions from the first one at/after `threshold` and return the tracked badges of the
+    version just before Modern Category / Hours first change. Only candidate versions (see
+    candidate_versions) are clicked; `changed_at` is the version right before the changed one
+    in the full timeline, as if every version had been visited.
+    """
+    print(f"🔄 Processing place_id={place_id}")
+    main, popup = open_details(place_id, driver, direct)
+    try:
+        click_versions_tab(driver)
+        versions = snapshot_versions(driver)
+
+        base_idx, (base_dt, base_id, _) = next(
+            (i, v) for i, v in enumerate(versions) if v[0] >= threshold
         )
-        prev_mod_el = mod_panel.find_element(By.CSS_SELECTOR, ".audit-badge")
-        prev_mod_badge = prev_mod_el.text.strip()
-        prev_mod_badge_hover = prev_mod_el.get_attribute("title").strip()
+        candidates, source = candidate_versions(driver, versions)
+        later = versions[base_idx + 1 :]
+        to_click = [(i, dt, eid) for i, (dt, eid, _) in enumerate(later, start=base_idx + 1) if eid in candidates]
+        print(f"{GREEN}{len(to_click)}/{len(later)} version(s) to check (candidates via {source}){RESET}")
 
-        try:
-            audit_row = driver.find_element(
-                By.XPATH,
-                "//div[contains(@class,'audit-row')][.//div[@data-test-id='hours']]",
-            )
-            prev_hours_el = audit_row.find_element(By.CSS_SELECTOR, ".audit-badge")
-            prev_hours_badge = prev_hours_el.text.strip()
-            prev_hours_badge_hover = prev_hours_el.get_attribute("title").strip()
-        except NoSuchElementException:
-            prev_hours_badge = ""
-            prev_hours_badge_hover = ""
+        click_version(driver, base_id)
+        prev = read_tracked_badges(driver)
 
-        for dt, eid in versions[base_idx + 1 :]:
+        for i, dt, eid in to_click:
             print(f"⤷ Processing version {eid} at {dt}")
             click_version(driver, eid)
-
-            mod_panel = driver.find_element(
-                By.XPATH, "//div[@title='Modern Category']/following-sibling::div[1]"
-            )
-            curr_mod_el = mod_panel.find_element(By.CSS_SELECTOR, ".audit-badge")
-            curr_mod_badge = curr_mod_el.text.strip()
-            curr_mod_badge_hover = curr_mod_el.get_attribute("title").strip()
-
-            try:
-                audit_row = driver.find_element(
-                    By.XPATH,
-                    "//div[contains(@class,'audit-row')][.//div[@data-test-id='hours']]",
-                )
-                curr_hours_el = audit_row.find_element(By.CSS_SELECTOR, ".audit-badge")
-                curr_hours_badge = curr_hours_el.text.strip()
-                curr_hours_badge_hover = curr_hours_el.get_attribute("title").strip()
-            except NoSuchElementException:
-                curr_hours_badge = ""
-                curr_hours_badge_hover = ""
-
-            if (
-                curr_mod_badge != prev_mod_badge
-                or curr_mod_badge_hover != prev_mod_badge_hover
-                or curr_hours_badge != prev_hours_badge
-                or curr_hours_badge_hover != prev_hours_badge_hover
-            ):
+            curr = read_tracked_badges(driver)
+            if curr != prev:
+                # version right before the change in the full list (non-candidates leave the badges alone)
+                prev_dt = versions[i - 1][0]
                 print(f"❗ Change at {dt} — returning prior version’s ({prev_dt}) data")
                 return {
                     "place_id": place_id,
                     "changed_at": prev_dt.isoformat(),
-                    "hours_badge": prev_hours_badge,
-                    "hours_badge_hover": prev_hours_badge_hover,
-                    "modern_cat_badge": prev_mod_badge,
-                    "modern_cat_badge_hover": prev_mod_badge_hover,
+                    "hours_badge": prev[2],
+                    "hours_badge_hover": prev[3],
+                    "modern_cat_badge": prev[0],
+                    "modern_cat_badge_hover": prev[1],
                 }
-
-            prev_dt = dt
-            prev_mod_badge = curr_mod_badge
-            prev_mod_badge_hover = curr_mod_badge_hover
-            prev_hours_badge = curr_hours_badge
-            prev_hours_badge_hover = curr_hours_badge_hover
+            prev = curr
 
         print("→ No change detected; returning last-seen data")
         return {
             "place_id": place_id,
             "changed_at": "No change was detected",
-            "hours_badge": prev_hours_badge,
-            "hours_badge_hover": prev_hours_badge_hover,
-            "modern_cat_badge": prev_mod_badge,
-            "modern_cat_badge_hover": prev_mod_badge_hover,
+            "hours_badge": prev[2],
+            "hours_badge_hover": prev[3],
+            "modern_cat_badge": prev[0],
+            "modern_cat_badge_hover": prev[1],
         }
 
     finally:
-        driver.close()
-        driver.switch_to.window(main)
+        close_details(driver, main, popup)
+
+
+def _time_open(driver, pid, mode):
+    """Seconds until the Versions tab is present for one open in `mode` ('popup' or 'direct')."""
+    t0 = time.perf_counter()
+    if mode == "popup":
+        main, popup = open_and_switch(pid, driver)
+        WebDriverWait(driver, TIMEOUT).until(
+            EC.presence_of_element_located((By.XPATH, VERSIONS_TAB_XPATH))
+        )
+    else:
+        main, popup = open_details(pid, driver, direct=True)
+    elapsed = time.perf_counter() - t0
+    close_details(driver, main, popup)
+    return elapsed
+
+
+def bench_open(driver, place_ids):
+    """
+    Time popup vs direct open (until the Versions tab is present) per POI and print the saving.
+
+    Each POI is opened once untimed first (warm-up, so neither mode gets the cold cache),
+    then both modes are timed in alternating order: popup first on even rows, direct first
+    on odd rows. Means and medians are reported.
+    """
+    times = {"popup": [], "direct": []}
+    for n, pid in enumerate(place_ids):
+        _time_open(driver, pid, "direct")  # warm-up, discarded
+        order = ("popup", "direct") if n % 2 == 0 else ("direct", "popup")
+        for mode in order:
+            times[mode].append(_time_open(driver, pid, mode))
+        print(f"{pid}: popup {times['popup'][-1]:.2f}s  direct {times['direct'][-1]:.2f}s  (order {'/'.join(order)})")
+
+    if place_ids:
+        p_avg = sum(times["popup"]) / len(times["popup"])
+        d_avg = sum(times["direct"]) / len(times["direct"])
+        p_med = sorted(times["popup"])[len(place_ids) // 2]
+        d_med = sorted(times["direct"])[len(place_ids) // 2]
+        print(
+            f"{GREEN}Bench over {len(place_ids)} POI(s): popup {p_avg:.2f}s/row (median {p_med:.2f}s), "
+            f"direct {d_avg:.2f}s/row (median {d_med:.2f}s) "
+            f"→ saves {p_avg - d_avg:.2f}s/row ({(p_avg - d_avg) / p_avg * 100 if p_avg else 0:.0f}%){RESET}"
+        )
 
 
 if __name__ == "__main__":
     driver = start_driver()
 
+    if "--bench" in sys.argv:
+        i = sys.argv.index("--bench")
+        n = int(sys.argv[i + 1]) if i + 1 < len(sys.argv) else 10
+        with open(INPUT_CSV, newline="", encoding="utf-8") as in_f:
+            reader = csv.DictReader(in_f)
+            reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
+            pids = [p for p in ((r.get("Place ID") or "").strip() for r in reader) if p][:n]
+        bench_open(driver, pids)
+        driver.quit()
+        sys.exit(0)
+
     with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as out_f:
         writer = csv.DictWriter(
             out_f,
@@ -13,11 +13,18 @@ If no args:
 Field filter (optional):
     --field hours  → applies the Versions filter for Hours (hours_period)
     --field show   → applies the Versions filter for Show In Client (presence_period)
+Incremental rerun (optional, after the positional args):
+    --incremental  → skip the version walk for POIs whose Versions list is unchanged
+                     since the last run (fingerprints in vheader_fingerprints.json)
+Logging:
+    --log-level debug → step markers on the terminal (default: one live status line;
+                        per-row detail in <output>.log.jsonl)
 """
 
 import csv
 import sys
 import re
+import time
 import traceback
 from datetime import datetime
 
@@ -31,10 +38,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import scrape_log
+from scrape_log import ProgressLine, RowLog, row_log_path
+from rate_limit import limited_get
+from page_ready import wait_versions_settled
+from version_fingerprint import FingerprintStore, fingerprint_key, probe_versions
+
 # ---- Constants
 TIMEOUT = 30
 PATH = "https://apollo.geo.apple.com/p/release/"
 THRESHOLD = datetime(2025, 7, 25)
+FINGERPRINTS_JSON = "vheader_fingerprints.json"
 
 # ---- Console colors
 RED = "\033[91m"
@@ -45,17 +59,11 @@ RESET = "\033[0m"
 
 
 def _dbg(msg: str) -> None:
-    ts = datetime.now().strftime("%H:%M:%S")
-    print(f"{MAGENTA}[{ts}] {msg}{RESET}")
+    scrape_log.debug(msg)
 
 
 def _dbe(msg: str, e: Exception | None = None) -> None:
-    ts = datetime.now().strftime("%H:%M:%S")
-    if e is None:
-        print(f"{RED}[{ts}] {msg}{RESET}")
-    else:
-        et = type(e).__name__
-        print(f"{RED}[{ts}] {msg} | {et}: {e}{RESET}")
+    scrape_log.error(msg, e)
 
 
 # =============================================================================
@@ -155,7 +163,7 @@ def choose_field(driver, filter_key: str) -> bool:
             EC.element_to_be_clickable((By.XPATH, dropdown_trigger_xpath))
         ).click()
     except TimeoutException:
-        print(f"{YELLOW}[filter] Trigger not clickable; continuing without filter{RESET}")
+        scrape_log.warn("[filter] Trigger not clickable; continuing without filter")
         return False
 
     try:
@@ -163,10 +171,10 @@ def choose_field(driver, filter_key: str) -> bool:
         WebDriverWait(driver, TIMEOUT).until(
             EC.element_to_be_clickable((By.XPATH, opt_xpath))
         ).click()
-        print(f"{GREEN}[filter] Selected {filter_key}{RESET}")
+        _dbg(f"[filter] Selected {filter_key}")
         return True
     except TimeoutException:
-        print(f"{YELLOW}[filter] Option {filter_key} not found/clickable; continuing without filter{RESET}")
+        scrape_log.warn(f"[filter] Option {filter_key} not found/clickable; continuing without filter")
         return False
 
 
@@ -241,12 +249,18 @@ def select_prior_or_earliest(versions):
     return chosen
 
 
-def scrape_vheader_for_row(driver, place_details_link: str | None, place_id: str | None, filter_key: str | None = None) -> str:
+def scrape_vheader_for_row(
+    driver,
+    place_details_link: str | None,
+    place_id: str | None,
+    filter_key: str | None = None,
+    fingerprints: FingerprintStore | None = None,
+) -> str:
     # 1) Navigate by link (preferred) or place_id
     if place_details_link and place_details_link.strip():
-        driver.get(place_details_link.strip())
+        limited_get(driver, place_details_link.strip())
     elif place_id and place_id.strip():
-        driver.get(PATH + place_id.strip())
+        limited_get(driver, PATH + place_id.strip())
     else:
         return ""
 
@@ -260,11 +274,23 @@ def scrape_vheader_for_row(driver, place_details_link: str | None, place_id: str
     if filter_key:
         _dbg(f"applying filter_key after Versions: {filter_key}")
         try:
+            unfiltered = probe_versions(driver)
             if not choose_field(driver, filter_key):
-                print(f"{YELLOW}[filter] continuing without filter{RESET}")
+                _dbg("[filter] continuing without filter")
+            else:
+                wait_versions_settled(driver, unfiltered)  # probe the filtered list, not the old one
         except Exception as e:
             _dbe(f"filter apply failed for key={filter_key}", e)
-    
+
+    # Incremental: same Versions list as last run → reuse the stored header
+    fp_key = fingerprint_key(place_id or place_details_link, filter_key, THRESHOLD)
+    fp = probe_versions(driver) if fingerprints is not None else None
+    if fingerprints is not None:
+        cached = fingerprints.get(fp_key, fp)
+        if cached is not None:
+            _dbg(f"fingerprint unchanged {fp} → skipping version walk")
+            return cached
+
     versions = collect_versions(driver)
 
     if not versions:
@@ -277,7 +303,10 @@ def scrape_vheader_for_row(driver, place_details_link: str | None, place_id: str
 
     # 3) Extract Version Header
     vheader = extract_brand_applier_vheader(driver)
-    return " | ".join(vheader) if isinstance(vheader, list) else (vheader or "")
+    result = " | ".join(vheader) if isinstance(vheader, list) else (vheader or "")
+    if fingerprints is not None:
+        fingerprints.put(fp_key, fp, result)
+    return result
 
 
 # =============================================================================
@@ -296,6 +325,7 @@ if __name__ == "__main__":
             if val in ("hours", "show"):
                 field_arg = "hours_period" if val == "hours" else "presence_period"
             break
+    fingerprints = FingerprintStore(FINGERPRINTS_JSON) if "--incremental" in sys.argv else None
 
     driver = start_driver()
     try:
@@ -314,23 +344,35 @@ if __name__ == "__main__":
                 reader = csv.DictReader(in_f)
                 # normalize headers
                 reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
-                for row in reader:
-                    pid = (row.get("Place ID", "") or "").strip()
-                    link = (row.get("Place Details Link", "") or "").strip()
-
-                    try:
-                        vheader = scrape_vheader_for_row(driver, link, pid, field_arg)
-                    except Exception as e:
-                        _dbe(f"row error (Place ID={pid!r})", e)
-                        vheader = ""
-
-                    writer.writerow(
-                        {
-                            "Place ID": pid,
-                            "Place Details Link": link,
-                            "What Applied Brand (Version Header)": vheader,
-                        }
-                    )
+                rows = list(reader)
+
+            # One live status line on the terminal; per-row detail → <output>.log.jsonl
+            progress = ProgressLine(total=len(rows), row_log=RowLog(row_log_path(out_csv)))
+            for row in rows:
+                pid = (row.get("Place ID", "") or "").strip()
+                link = (row.get("Place Details Link", "") or "").strip()
+
+                t0 = time.perf_counter()
+                try:
+                    vheader = scrape_vheader_for_row(driver, link, pid, field_arg, fingerprints)
+                except Exception as e:
+                    _dbe(f"row error (Place ID={pid!r})", e)
+                    progress.failed(pid, time.perf_counter() - t0, error=type(e).__name__, final=True)
+                    vheader = ""
+                else:
+                    progress.done(pid, time.perf_counter() - t0, vheader=vheader)
+
+                writer.writerow(
+                    {
+                        "Place ID": pid,
+                        "Place Details Link": link,
+                        "What Applied Brand (Version Header)": vheader,
+                    }
+                )
+            progress.finish()
         print(f"{GREEN}✔ VHeader scrape complete → {out_csv}{RESET}")
     finally:
+        if fingerprints is not None:
+            fingerprints.save()
+            scrape_log.info(fingerprints.report())
         driver.quit()
\ No newline at end of file
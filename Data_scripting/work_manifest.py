@@ -0,0 +1,333 @@
+"""
+work_manifest.py
+
+Purpose
+-------
+Preprocess a scraper input sheet ONCE into a deduplicated work manifest.
+
+Every scraper used to clean Place IDs row by row (`html.unescape`, tag
+stripping, `re.search(r"\\d+")`, `_clean_place_id`, `extract_url` for
+HYPERLINK cells) and would scrape a repeated Place ID once per row. The
+manifest builder does that cleanup with vectorized pandas string ops,
+validates IDs/URLs, deduplicates, assigns shards and keeps a row → job
+mapping so results can be fanned back out to every original row.
+
+Files
+-----
+    <manifest>.csv       one row per job:
+                         job_id, place_id, url, shard, n_rows, <key columns...>
+    <manifest>.rows.csv  one row per source row:
+                         row_index, job_id, place_id, status
+
+Usage
+-----
+    # 1) build (optionally keyed by extra columns, split into 4 shards)
+    python work_manifest.py build BC_Hours_and_Closures_Edit_Contests.csv jobs.csv \\
+        --id-col "Place ID" --key "Contested Field" --shards 4
+
+    # 2) run a scraper against the manifest
+    python BC_hours_and_closures_Edit_Contests.py --manifest jobs.csv
+
+    # 3) fan results back out to every source row
+    python work_manifest.py fan-out jobs.csv "BC_hours_&_closures_output.csv" fanned.csv \\
+        --source BC_Hours_and_Closures_Edit_Contests.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import html
+import os
+import re
+import sys
+import zlib
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+RED = "\033[91m"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+DETAILS_PATH = "https://apollo.geo.apple.com/p/release/"
+MIN_ID_DIGITS = 1  # the legacy row loops accept any digit run; raise with --min-digits
+
+_ENTITY_PAT = r"&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z]+);"
+_TAG_PAT = r"<[^>]*>"
+_HYPERLINK_PAT = r"""(?i)HYPERLINK\(["']([^"']+)["']"""
+
+JOB_COLUMNS = ("job_id", "place_id", "url", "shard", "shards", "n_rows")
+
+
+# ---------- Scalar helpers (shared by the scrapers' legacy row loops) ----------
+
+def clean_place_id(raw, keep_raw: bool = False) -> str:
+    """Strip BOM/entities/tags and return the first digit run ('' if none, or the
+    cleaned text with `keep_raw`, as place_name.py always did)."""
+    s = html.unescape(str(raw or "").replace("\ufeff", "").strip())
+    s = re.sub(_TAG_PAT, "", s)
+    m = re.search(r"\d+", s)
+    return m.group(0) if m else (s if keep_raw else "")
+
+
+def shard_of(place_id: str, shards: int) -> int:
+    """Stable shard number (0-based) for a normalized Place ID."""
+    if shards <= 1:
+        return 0
+    return zlib.crc32(str(place_id).encode("utf-8")) % shards
+
+
+def parse_shard(spec: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a `--shard i/N` value (0 <= i < N). Returns None when not sharding."""
+    if not spec:
+        return None
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec)
+    if not m:
+        raise ValueError(f"--shard expects i/N (e.g. 0/4), got {spec!r}")
+    i, n = int(m.group(1)), int(m.group(2))
+    if n < 1 or not 0 <= i < n:
+        raise ValueError(f"--shard {spec}: need 0 <= i < N")
+    return i, n
+
+
+# ---------- Vectorized normalization ----------
+
+def _unescape_and_strip(series: pd.Series) -> pd.Series:
+    s = series.fillna("").astype(str).str.replace("\ufeff", "", regex=False).str.strip()
+    s = s.str.replace(_ENTITY_PAT, lambda m: html.unescape(m.group(0)), regex=True)
+    return s.str.replace(_TAG_PAT, "", regex=True)
+
+
+def normalize_place_ids(series: pd.Series, pick: str = "first") -> pd.Series:
+    """
+    Vectorized Place ID cleanup. `pick="first"` mirrors the scrapers'
+    `re.search(r"\\d+")`; `pick="longest"` mirrors `clean_ticket_id`.
+    """
+    s = _unescape_and_strip(series)
+    if pick == "longest":
+        return s.str.findall(r"\d+").map(lambda runs: max(runs, key=len) if runs else "")
+    return s.str.extract(r"(\d+)", expand=False).fillna("")
+
+
+def normalize_urls(series: pd.Series) -> pd.Series:
+    """Vectorized `extract_url`: HYPERLINK("url","text") / http(s) URL / bare domain → URL or ''."""
+    s = _unescape_and_strip(series)
+    link = s.str.extract(_HYPERLINK_PAT, expand=False)
+    out = pd.Series("", index=s.index, dtype=object)
+    bare = s.str.contains(".", regex=False) & ~s.str.contains(" ", regex=False)
+    out = out.mask(bare, "https://" + s)
+    out = out.mask(s.str.match(r"(?i)https?://"), s)
+    return out.mask(link.notna(), link).fillna("")
+
+
+# ---------- Build / read ----------
+
+def build_manifest(
+    df: pd.DataFrame,
+    id_column: str = "Place ID",
+    url_column: Optional[str] = None,
+    key_columns: Sequence[str] = (),
+    shards: int = 1,
+    pick: str = "first",
+    min_digits: int = MIN_ID_DIGITS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (jobs, row_map) for a source DataFrame read with dtype=str."""
+    df = df.rename(columns=lambda c: str(c).lstrip("\ufeff").strip())
+    if id_column not in df.columns:
+        raise ValueError(f"Column '{id_column}' not found. Available headers: {', '.join(df.columns)}")
+    missing = [c for c in key_columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Key column(s) not found: {', '.join(missing)}")
+
+    work = pd.DataFrame({"row_index": range(len(df)), "place_id": normalize_place_ids(df[id_column], pick).values})
+    work["url"] = normalize_urls(df[url_column]).values if url_column and url_column in df.columns else ""
+    for c in key_columns:
+        work[c] = df[c].fillna("").astype(str).str.strip().values
+
+    work["status"] = "ok"
+    work.loc[work["place_id"] == "", "status"] = "missing_id"
+    work.loc[(work["status"] == "ok") & (work["place_id"].str.len() < min_digits), "status"] = "invalid_id"
+    has_url = work["url"] != ""
+    work.loc[has_url & ~work["url"].str.match(r"https?://[^\s/]+\.[^\s]+"), "url"] = ""
+
+    valid = work[work["status"] == "ok"]
+    subset = ["place_id", *key_columns]
+    job_ids = valid.groupby(subset, sort=False).ngroup()
+    work["job_id"] = -1
+    work.loc[valid.index, "job_id"] = job_ids
+
+    jobs = valid.assign(job_id=job_ids).drop_duplicates("job_id", keep="first")
+    jobs = jobs.assign(n_rows=jobs["job_id"].map(job_ids.value_counts()).astype(int))
+    # Prefer any URL seen for the job; otherwise the canonical details page
+    first_url = valid.assign(job_id=job_ids).loc[lambda d: d["url"] != ""].groupby("job_id")["url"].first()
+    jobs["url"] = jobs["job_id"].map(first_url).fillna(DETAILS_PATH + jobs["place_id"])
+    jobs["shard"] = jobs["place_id"].map(lambda p: shard_of(p, shards))
+    jobs = jobs[["job_id", "place_id", "url", "shard", "n_rows", *key_columns]].reset_index(drop=True)
+
+    row_map = work[["row_index", "job_id", "place_id", "status"]].reset_index(drop=True)
+    return jobs, row_map
+
+
+def rows_path(manifest_path: str) -> str:
+    root, ext = os.path.splitext(manifest_path)
+    return f"{root}.rows{ext or '.csv'}"
+
+
+def write_manifest(jobs: pd.DataFrame, row_map: pd.DataFrame, manifest_path: str) -> None:
+    jobs.to_csv(manifest_path, index=False)
+    row_map.to_csv(rows_path(manifest_path), index=False)
+
+
+def read_jobs(manifest_path: str) -> pd.DataFrame:
+    return pd.read_csv(manifest_path, dtype=str, keep_default_na=False)
+
+
+def iter_place_ids(
+    input_csv: str,
+    id_column: str = "Place ID",
+    manifest: Optional[str] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    keep_raw: bool = False,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (place_id, row) pairs for a scraper main loop.
+
+    With `manifest`, rows are deduplicated jobs (key columns keep their original
+    names, so `row.get("Contested Field")` still works). Without it, the source
+    CSV is read row by row with the same cleanup the scrapers used inline.
+    With `shard=(i, N)`, only Place IDs hashing to shard i are yielded; a manifest
+    balanced by `scheduler.py assign` (a `shards` column equal to N) uses its
+    `shard` column instead. `keep_raw` is passed to clean_place_id.
+    """
+    if manifest:
+        for job in read_jobs(manifest).to_dict("records"):
+            if shard:
+                if str(job.get("shards", "")) == str(shard[1]):
+                    job_shard = int(job["shard"])
+                else:
+                    job_shard = shard_of(job["place_id"], shard[1])
+                if job_shard != shard[0]:
+                    continue
+            yield job["place_id"], job
+        return
+    with open(input_csv, newline="", encoding="utf-8") as in_f:
+        reader = csv.DictReader(in_f)
+        # Normalize BOM + whitespace in headers
+        reader.fieldnames = [fn.lstrip("\ufeff").strip() for fn in reader.fieldnames]
+        for row in reader:
+            pid = clean_place_id(row.get(id_column, ""), keep_raw)
+            if not pid:
+                print("❗ Missing Place ID; skipping.")
+                continue
+            if shard and shard_of(pid, shard[1]) != shard[0]:
+                continue
+            yield pid, row
+
+
+def cli_option(name: str, default: Optional[str] = None, argv: Optional[List[str]] = None) -> Optional[str]:
+    """Return the value following `name` in argv (scrapers parse sys.argv by hand)."""
+    argv = sys.argv if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == name and len(argv) > i + 1:
+            return argv[i + 1]
+    return default
+
+
+# ---------- Fan-out ----------
+
+def column_key(name: str) -> str:
+    """Column name for matching across files: "Contested Field" ↔ "contested_field"."""
+    return re.sub(r"[\s_]+", "_", str(name).strip().lower())
+
+
+def fan_out(
+    manifest_path: str,
+    results_csv: str,
+    out_csv: str,
+    result_id_column: str = "place_id",
+    source_csv: Optional[str] = None,
+) -> int:
+    """
+    Expand per-job results back onto every source row (original order). Returns rows written.
+
+    Results are matched to jobs on `job_id` when the output has one, otherwise on
+    place_id plus the manifest's key columns (matched case/space/underscore-
+    insensitively, e.g. "Contested Field" ↔ "contested_field"), so a keyed
+    manifest gives each job its own result instead of the Place ID's first one.
+    """
+    row_map = pd.read_csv(rows_path(manifest_path), dtype=str, keep_default_na=False)
+    jobs = read_jobs(manifest_path)
+    results = pd.read_csv(results_csv, dtype=str, keep_default_na=False)
+    if result_id_column not in results.columns:
+        raise ValueError(f"Results have no '{result_id_column}' column")
+    results = results.assign(**{result_id_column: normalize_place_ids(results[result_id_column])})
+    results = results.rename(columns={result_id_column: "place_id"})
+    results = results[results["place_id"] != ""]
+
+    key_columns = [c for c in jobs.columns if c not in JOB_COLUMNS]
+    if "job_id" in results.columns:
+        on = ["job_id"]
+        results = results.drop(columns=["place_id"])
+    else:
+        by_key = {column_key(c): c for c in results.columns}
+        missing = [c for c in key_columns if column_key(c) not in by_key]
+        if missing:
+            raise ValueError(f"Manifest is keyed by {', '.join(missing)} but the results have no such "
+                             f"column (or job_id); cannot tell the jobs of one Place ID apart")
+        results = results.rename(columns={by_key[column_key(c)]: c for c in key_columns})
+        results[key_columns] = results[key_columns].apply(lambda col: col.str.strip())
+        row_map = row_map.merge(jobs[["job_id", *key_columns]], on="job_id", how="left", sort=False)
+        on = ["place_id", *key_columns]
+    results = results.drop_duplicates(on, keep="first")
+    out = row_map.merge(results, on=on, how="left", sort=False).fillna("")
+    if source_csv:
+        src = pd.read_csv(source_csv, dtype=str, keep_default_na=False)
+        src.columns = [str(c).lstrip("\ufeff").strip() for c in src.columns]
+        out = out.drop(columns=[c for c in key_columns if c in out.columns])  # already in the source
+        out = pd.concat([src.reset_index(drop=True), out.drop(columns=["row_index"])], axis=1)
+    out.to_csv(out_csv, index=False)
+    return len(out)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(description="Build / fan out scraper work manifests.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Normalize, validate, dedupe and shard a source CSV")
+    b.add_argument("input_csv")
+    b.add_argument("manifest_csv")
+    b.add_argument("--id-col", default="Place ID")
+    b.add_argument("--url-col", default=None, help="e.g. 'Place Details Link' or 'Hyperlink'")
+    b.add_argument("--key", action="append", default=[], help="Extra column(s) that make a job distinct")
+    b.add_argument("--shards", type=int, default=1)
+    b.add_argument("--longest", action="store_true", help="Use the longest digit run (ticket IDs)")
+    b.add_argument("--min-digits", type=int, default=MIN_ID_DIGITS,
+                   help="Flag shorter digit runs as invalid_id (default: accept any, like the scrapers)")
+
+    f = sub.add_parser("fan-out", help="Expand scraper output back to every source row")
+    f.add_argument("manifest_csv")
+    f.add_argument("results_csv")
+    f.add_argument("out_csv")
+    f.add_argument("--result-id-col", default="place_id")
+    f.add_argument("--source", default=None, help="Source CSV to prepend original columns from")
+
+    args = p.parse_args(argv)
+    if args.cmd == "build":
+        df = pd.read_csv(args.input_csv, dtype=str, keep_default_na=False)
+        jobs, row_map = build_manifest(
+            df, args.id_col, args.url_col, args.key, args.shards, "longest" if args.longest else "first",
+            args.min_digits,
+        )
+        write_manifest(jobs, row_map, args.manifest_csv)
+        bad = row_map[row_map["status"] != "ok"]
+        print(f"{GREEN}✔ {len(row_map)} rows → {len(jobs)} jobs across {max(1, args.shards)} shard(s) → {args.manifest_csv}{RESET}")
+        if len(bad):
+            print(f"{YELLOW}{len(bad)} row(s) skipped: {bad['status'].value_counts().to_dict()}{RESET}")
+    else:
+        n = fan_out(args.manifest_csv, args.results_csv, args.out_csv, args.result_id_col, args.source)
+        print(f"{GREEN}✔ Fanned out {n} rows → {args.out_csv}{RESET}")
+
+
+if __name__ == "__main__":
+    main()